@@ -0,0 +1,76 @@
+import heapq
+
+
+# ----- Agenda de Quadros de Animação -----
+class AnimationScheduler:
+    """
+    Avança os quadros de animação só dos avatares cujo quadro venceu.
+
+    Em vez de cada FuzzyAvatar.update() comparar o relógio com last_update a
+    cada tick, cada avatar registrado (add) fica num heap pelo instante do
+    próximo quadro (FuzzyAvatar.next_frame_time, com a velocidade da
+    animação atual, ver animation_speeds). advance(), chamado uma vez por
+    tick depois dos update(), tira do heap só os avatares vencidos, avança
+    os quadros (vários de uma vez se o passo de tempo pulou mais de um) e
+    agenda o próximo. Com um relógio de passo fixo, os quadros avançam
+    exatamente nos mesmos ticks que no update() sem agenda.
+
+    Quem muda a animação ou last_update de fora (início de ataque, troca
+    idle/corrida, snapshot) não precisa avisar: um quadro agendado cedo
+    demais é reagendado ao vencer, e update() reagenda quando a animação
+    atual muda. Só um last_update que volta no tempo pede reschedule().
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.frames_advanced = 0
+        self._heap = []  # (instante do próximo quadro, ordem, avatar)
+        self._seq = 0
+        self._avatars = {}  # id(avatar) -> avatar
+
+    def __len__(self):
+        return len(self._avatars)
+
+    def __contains__(self, avatar):
+        return id(avatar) in self._avatars
+
+    def add(self, avatar):
+        self._avatars[id(avatar)] = avatar
+        avatar.animation_scheduler = self
+        avatar.frame_due = None
+        self.reschedule(avatar)
+
+    def remove(self, avatar):
+        # As entradas do avatar no heap ficam inválidas (frame_due = None) e são descartadas
+        self._avatars.pop(id(avatar), None)
+        avatar.animation_scheduler = None
+        avatar.scheduled_frames = None
+        avatar.frame_due = None
+
+    def reschedule(self, avatar):
+        """Reagenda o próximo quadro a partir do estado atual do avatar."""
+        avatar.scheduled_frames = avatar.current_frames
+        due = avatar.next_frame_time()
+        if due != avatar.frame_due:
+            avatar.frame_due = due
+            heapq.heappush(self._heap, (due, self._seq, avatar))
+            self._seq += 1
+
+    def advance(self):
+        """Avança os avatares com quadro vencido; retorna quantos foram processados."""
+        heap = self._heap
+        if not heap or heap[0][0] > self.clock.now():
+            return 0
+        now = self.clock.now()
+        processed = 0
+        while heap and heap[0][0] <= now:
+            due, _, avatar = heapq.heappop(heap)
+            if avatar.frame_due != due:
+                continue  # Entrada antiga (reagendada ou removida)
+            avatar.frame_due = None
+            if avatar.next_frame_time() <= now:
+                avatar.advance_frames(now)
+                self.frames_advanced += 1
+            self.reschedule(avatar)
+            processed += 1
+        return processed
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import struct
+
+import pygame
+
+from sprite_cache import SpriteFrameCache
+
+SPRITES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "sprites")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", ".cache")
+
+# Largura máxima de uma linha do atlas (px)
+ATLAS_MAX_WIDTH = 2048
+CACHE_FORMAT_VERSION = 1
+
+
+def _size_key(scale, size):
+    # Identifica o redimensionamento: tamanho fixo (w, h) ou fator de escala
+    if size is not None:
+        return f"size{size[0]}x{size[1]}"
+    return f"scale{scale:g}"
+
+
+def _scale_frame(frame, scale, size):
+    if size is not None:
+        return pygame.transform.scale(frame, size)
+    return pygame.transform.scale_by(frame, scale)
+
+
+def _pack_shelves(sizes, max_width=ATLAS_MAX_WIDTH):
+    """Empacota retângulos em prateleiras; retorna posições e tamanho do atlas."""
+    positions = [None] * len(sizes)
+    x = y = shelf_height = atlas_width = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        width, height = sizes[i]
+        if x > 0 and x + width > max_width:
+            y += shelf_height
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += width
+        shelf_height = max(shelf_height, height)
+        atlas_width = max(atlas_width, x)
+    return positions, (max(atlas_width, 1), max(y + shelf_height, 1))
+
+
+# ----- Conjunto de Sprites em Atlas -----
+class SpriteSet:
+    """
+    Todas as animações de um conjunto de sprites (ex.: avatarA) num único
+    atlas de textura. Cada quadro é uma subsuperfície do atlas, então os
+    avatares que usam o mesmo conjunto e tamanho compartilham os pixels,
+    as listas de quadros e o cache de variações (SpriteFrameCache).
+    """
+
+    def __init__(self, atlas, animations):
+        self.atlas = atlas
+        self.animations = {folder: [atlas.subsurface(rect) for rect in rects]
+                           for folder, rects in animations.items()}
+        self.rects = animations
+        self._frame_cache = None
+
+    @property
+    def frame_cache(self):
+        if self._frame_cache is None:
+            self._frame_cache = SpriteFrameCache(self.animations.values())
+        return self._frame_cache
+
+    def animation(self, folder):
+        return self.animations[folder]
+
+
+# ----- Gerenciador de Recursos -----
+class AssetManager:
+    """
+    Carrega cada combinação (conjunto de sprites, escala/tamanho) uma única
+    vez por processo e guarda em disco o atlas já redimensionado como pixels
+    RGBA crus, para que as próximas execuções pulem a decodificação dos PNGs
+    e o redimensionamento. O cache é invalidado quando algum PNG muda.
+    """
+
+    def __init__(self, sprites_dir=SPRITES_DIR, cache_dir=CACHE_DIR, use_disk_cache=True):
+        self.sprites_dir = sprites_dir
+        self.cache_dir = cache_dir
+        self.use_disk_cache = use_disk_cache
+        self._sprite_sets = {}
+
+    def get_sprite_set(self, name, scale=1.0, size=None):
+        key = (name, _size_key(scale, size))
+        sprite_set = self._sprite_sets.get(key)
+        if sprite_set is None:
+            sprite_set = self._sprite_sets[key] = self._load_sprite_set(name, scale, size)
+        return sprite_set
+
+    def load_animation(self, name, folder, scale=1.0, size=None):
+        return self.get_sprite_set(name, scale, size).animation(folder)
+
+    def _source_files(self, name):
+        # {pasta: [caminhos dos PNGs em ordem]} do conjunto de sprites
+        root = os.path.join(self.sprites_dir, name)
+        sources = {}
+        for folder in sorted(os.listdir(root)):
+            folder_path = os.path.join(root, folder)
+            if os.path.isdir(folder_path):
+                files = [os.path.join(folder_path, file_name) for file_name in sorted(os.listdir(folder_path))
+                         if file_name.lower().endswith('.png')]
+                if files:
+                    sources[folder] = files
+        return sources
+
+    def _cache_path(self, name, scale, size, sources):
+        digest = hashlib.sha1(str(CACHE_FORMAT_VERSION).encode())
+        for folder, files in sources.items():
+            for path in files:
+                stat = os.stat(path)
+                digest.update(f"{folder}/{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return os.path.join(self.cache_dir, f"{name}-{_size_key(scale, size)}-{digest.hexdigest()[:16]}.atlas")
+
+    def _load_sprite_set(self, name, scale, size):
+        sources = self._source_files(name)
+        cache_path = self._cache_path(name, scale, size, sources) if self.use_disk_cache else None
+
+        loaded = self._read_cache(cache_path) if cache_path else None
+        if loaded is None:
+            loaded = self._build_atlas(sources, scale, size)
+            if cache_path:
+                self._write_cache(cache_path, *loaded)
+
+        atlas, animations = loaded
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        return SpriteSet(atlas, animations)
+
+    def _build_atlas(self, sources, scale, size):
+        frames = []
+        owners = []
+        for folder, files in sources.items():
+            for path in files:
+                frame = pygame.image.load(path)
+                if pygame.display.get_surface() is not None:
+                    frame = frame.convert_alpha()
+                frames.append(_scale_frame(frame, scale, size))
+                owners.append(folder)
+
+        positions, atlas_size = _pack_shelves([frame.get_size() for frame in frames])
+        atlas = pygame.Surface(atlas_size, pygame.SRCALPHA)
+        animations = {folder: [] for folder in sources}
+        for frame, position, folder in zip(frames, positions, owners):
+            # BLEND_RGBA_MAX sobre o atlas transparente copia os pixels sem mistura
+            atlas.blit(frame, position, special_flags=pygame.BLEND_RGBA_MAX)
+            animations[folder].append(pygame.Rect(position, frame.get_size()))
+        return atlas, animations
+
+    def _read_cache(self, path):
+        try:
+            with open(path, 'rb') as cache_file:
+                header_size, = struct.unpack('<I', cache_file.read(4))
+                header = json.loads(cache_file.read(header_size))
+                pixels = cache_file.read()
+        except (OSError, ValueError, struct.error):
+            return None
+
+        width, height = header['size']
+        if len(pixels) != width * height * 4:
+            return None
+        atlas = pygame.image.frombytes(pixels, (width, height), 'RGBA')
+        animations = {folder: [pygame.Rect(rect) for rect in rects]
+                      for folder, rects in header['animations'].items()}
+        return atlas, animations
+
+    def _write_cache(self, path, atlas, animations):
+        header = json.dumps({
+            'size': atlas.get_size(),
+            'animations': {folder: [tuple(rect) for rect in rects] for folder, rects in animations.items()},
+        }).encode()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, 'wb') as cache_file:
+                cache_file.write(struct.pack('<I', len(header)))
+                cache_file.write(header)
+                cache_file.write(pygame.image.tobytes(atlas, 'RGBA'))
+            os.replace(temp_path, path)
+        except OSError:
+            pass  # Sem cache em disco (ex.: diretório somente leitura)
+
+
+_asset_manager = None
+
+
+def get_asset_manager():
+    """Gerenciador de recursos compartilhado pelo processo."""
+    global _asset_manager
+    if _asset_manager is None:
+        _asset_manager = AssetManager()
+    return _asset_manager
@@ -0,0 +1,155 @@
+import numpy as np
+
+from fuzzy_avatar import ANGER_PARAMETERS, MAX_ANGER
+
+
+# ----- População de Avatares (estrutura de arrays) -----
+class AvatarPopulation:
+    """
+    Estado emocional de muitos avatares guardado em arrays NumPy contíguos.
+
+    Cada campo de FuzzyAvatar usado por update_anger()/update_berserk_mode()
+    vira um array indexado pelo avatar, e as regras de raiva e berserk são
+    aplicadas a todos de uma vez, com os mesmos resultados dos métodos
+    escalares (mesma ordem de operações, em float64). Os ganhos de raiva e
+    os limiares do berserk (ANGER_PARAMETERS, com 'anger_params' por cima)
+    também são arrays por avatar, então avatares ajustados (tuning.py)
+    convivem na mesma população.
+    """
+
+    def __init__(self, size, max_hp=500, anger_params=None):
+        self.size = size
+        self.max_hp = np.full(size, max_hp, dtype=np.int64)
+        self.hp = np.full(size, max_hp, dtype=np.int64)
+        self.anger = np.zeros(size, dtype=np.float64)
+        self.berserk_mode = np.zeros(size, dtype=bool)
+        self.times_hit = np.zeros(size, dtype=np.int64)
+        self.successful_attacks = np.zeros(size, dtype=np.int64)
+        self.consecutive_hits = np.zeros(size, dtype=np.int64)
+        self.consecutive_misses = np.zeros(size, dtype=np.int64)
+        self.last_damage_received = np.zeros(size, dtype=np.float64)
+        for parameter, value in {**ANGER_PARAMETERS, **(anger_params or {})}.items():
+            if parameter not in ANGER_PARAMETERS:
+                raise ValueError(f"Parâmetro de raiva desconhecido: {parameter}")
+            setattr(self, parameter, np.full(size, value, dtype=np.float64))
+
+    @classmethod
+    def from_avatars(cls, avatars):
+        """Copia o estado de uma lista de FuzzyAvatar."""
+        population = cls(len(avatars))
+        for i, avatar in enumerate(avatars):
+            population.max_hp[i] = avatar.max_hp
+            population.hp[i] = avatar.hp
+            population.anger[i] = avatar.anger
+            population.berserk_mode[i] = avatar.berserk_mode
+            population.times_hit[i] = avatar.times_hit
+            population.successful_attacks[i] = avatar.successful_attacks
+            population.consecutive_hits[i] = avatar.consecutive_hits
+            population.consecutive_misses[i] = avatar.consecutive_misses
+            population.last_damage_received[i] = avatar.last_damage_received
+            for parameter in ANGER_PARAMETERS:
+                getattr(population, parameter)[i] = getattr(avatar, parameter)
+        return population
+
+    def apply_to_avatars(self, avatars):
+        """Copia o estado de volta para os FuzzyAvatar correspondentes."""
+        for i, avatar in enumerate(avatars):
+            avatar.hp = int(self.hp[i])
+            avatar.anger = float(self.anger[i])
+            avatar.berserk_mode = bool(self.berserk_mode[i])
+            avatar.times_hit = int(self.times_hit[i])
+            avatar.successful_attacks = int(self.successful_attacks[i])
+            avatar.consecutive_hits = int(self.consecutive_hits[i])
+            avatar.consecutive_misses = int(self.consecutive_misses[i])
+            avatar.last_damage_received = float(self.last_damage_received[i])
+
+    @property
+    def hp_percentage(self):
+        return (self.hp / self.max_hp) * 100
+
+    def update_anger(self):
+        """Equivalente vetorizado de FuzzyAvatar.update_anger()."""
+        anger = self.anger
+
+        # Fator 1: HP baixo aumenta a raiva
+        hp_percentage = self.hp_percentage
+        critical = hp_percentage < 30
+        low = ~critical & (hp_percentage < 50)
+        anger = np.where(critical, np.minimum(MAX_ANGER, anger + self.critical_hp_anger_gain), anger)
+        anger = np.where(low, np.minimum(MAX_ANGER, anger + self.low_hp_anger_gain), anger)
+
+        # Fator 2: Sofrer dano recentemente aumenta a raiva
+        damaged = self.last_damage_received > 0
+        anger_increase = (self.last_damage_received / self.max_hp) * self.damage_anger_gain
+        anger = np.where(damaged, np.minimum(MAX_ANGER, anger + anger_increase), anger)
+        self.last_damage_received = np.where(damaged, np.maximum(0, self.last_damage_received - 0.2),
+                                             self.last_damage_received)
+
+        # Fator 3: Ataques sucessivos aumentam a raiva (adrenalina)
+        anger = np.where(self.consecutive_hits > 2,
+                         np.minimum(MAX_ANGER, anger + self.hit_streak_anger_gain * self.consecutive_hits), anger)
+
+        # Fator 4: Tempo sem acertar ataques aumenta a frustração
+        anger = np.where(self.consecutive_misses > 3,
+                         np.minimum(MAX_ANGER, anger + self.miss_streak_anger_gain * self.consecutive_misses),
+                         anger)
+
+        # Decaimento natural da raiva ao longo do tempo
+        self.anger = np.maximum(0, anger - self.anger_decay)
+
+    def update_berserk_mode(self):
+        """
+        Equivalente vetorizado de FuzzyAvatar.update_berserk_mode():
+        entra com raiva >= berserk_enter_anger e só sai com raiva < berserk_exit_anger.
+        Retorna os índices dos avatares que entraram e que saíram do modo.
+        """
+        previous = self.berserk_mode
+        self.berserk_mode = ((self.anger >= self.berserk_enter_anger)
+                             | (previous & ~(self.anger < self.berserk_exit_anger)))
+        entered = np.flatnonzero(self.berserk_mode & ~previous)
+        exited = np.flatnonzero(previous & ~self.berserk_mode)
+        return entered, exited
+
+    def update_emotions(self):
+        """Passo emocional de um tick (raiva e depois berserk), como em FuzzyAvatar.update()."""
+        self.update_anger()
+        return self.update_berserk_mode()
+
+    def receive_damage(self, indices, damage_amounts):
+        """
+        Equivalente vetorizado de FuzzyAvatar.receive_damage().
+        Os índices devem ser únicos em cada chamada.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        damage_amounts = np.asarray(damage_amounts)
+        self.hp[indices] = np.maximum(0, self.hp[indices] - damage_amounts)
+        self.times_hit[indices] += 1
+        self.consecutive_misses[indices] = 0
+        self.last_damage_received[indices] = damage_amounts
+
+        # Aumento significativo de raiva ao receber muito dano
+        bonus = np.where(damage_amounts > 50, self.heavy_hit_anger[indices],
+                         np.where(damage_amounts > 30, self.medium_hit_anger[indices], self.light_hit_anger[indices]))
+        self.anger[indices] = np.minimum(MAX_ANGER, self.anger[indices] + bonus)
+
+    def successful_attack(self, indices):
+        """Equivalente vetorizado de FuzzyAvatar.successful_attack() (índices únicos)."""
+        indices = np.asarray(indices, dtype=np.intp)
+        self.successful_attacks[indices] += 1
+        self.consecutive_hits[indices] += 1
+        self.consecutive_misses[indices] = 0
+
+        # Aumento de raiva/confiança ao acertar golpes sucessivos
+        streak = indices[self.consecutive_hits[indices] > 2]
+        self.anger[streak] = np.minimum(MAX_ANGER, self.anger[streak] + self.hit_streak_bonus_anger[streak])
+
+    def missed_attack(self, indices):
+        """Equivalente vetorizado de FuzzyAvatar.missed_attack() (índices únicos)."""
+        indices = np.asarray(indices, dtype=np.intp)
+        self.consecutive_hits[indices] = 0
+        self.consecutive_misses[indices] += 1
+
+        # Aumento de frustração/raiva ao errar
+        frustrated = indices[self.consecutive_misses[indices] > 2]
+        self.anger[frustrated] = np.minimum(MAX_ANGER,
+                                            self.anger[frustrated] + self.miss_streak_bonus_anger[frustrated])
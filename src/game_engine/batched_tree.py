@@ -0,0 +1,323 @@
+import abc
+
+import numpy as np
+import py_trees
+
+from compiled_tree import (TreeStructure, LEAF, SEQUENCE, SELECTOR, INVALID, SUCCESS, FAILURE, RUNNING,
+                           STATUSES, NO_CHILD)
+from fuzzy_ai_tree import approach_target, face_target, start_attack, land_attack
+
+
+# ----- Agentes do Lote -----
+class BatchedAgents:
+    """
+    Os avatares controlados por uma árvore em lote, cada um com seu alvo e
+    seus parâmetros (distância de ataque e passo de aproximação).
+    Os parâmetros podem ser um valor único ou um por agente.
+    """
+
+    def __init__(self, controlled, targets, attack_threshold=40, approach_step=1):
+        self.controlled = list(controlled)
+        self.targets = list(targets)
+        if len(self.controlled) != len(self.targets):
+            raise ValueError("É preciso um alvo para cada avatar controlado")
+        size = len(self.controlled)
+        self.attack_threshold = np.broadcast_to(np.asarray(attack_threshold), size).copy()
+        self.approach_step = np.broadcast_to(np.asarray(approach_step), size).copy()
+
+    def __len__(self):
+        return len(self.controlled)
+
+    def distances(self, indices):
+        """Distância horizontal (px) entre cada agente de 'indices' e seu alvo."""
+        controlled, targets = self.controlled, self.targets
+        controlled_x = np.fromiter((controlled[i].rect.centerx for i in indices), dtype=np.int64, count=len(indices))
+        target_x = np.fromiter((targets[i].rect.centerx for i in indices), dtype=np.int64, count=len(indices))
+        return np.abs(target_x - controlled_x)
+
+    def berserk(self, indices):
+        controlled = self.controlled
+        return np.fromiter((controlled[i].berserk_mode for i in indices), dtype=bool, count=len(indices))
+
+
+# ----- Nós Folha em Lote -----
+class BatchedBehaviour(py_trees.behaviour.Behaviour):
+    """
+    Folha de uma árvore compartilhada por todos os agentes do lote.
+
+    update_batch() recebe os índices dos agentes que chegaram a este nó no
+    tick e retorna um array com o status (código inteiro) de cada um.
+    O estado por agente fica nos arrays criados por create_state().
+    """
+
+    def create_state(self, size):
+        return None
+
+    def update(self):
+        raise TypeError(f"{self.name}: nó em lote, deve ser ticado por BatchedTree")
+
+    @abc.abstractmethod
+    def update_batch(self, agents, indices, state):
+        """Status (array de códigos) de cada agente em 'indices'."""
+
+
+class BatchCheckDistanceGreaterThan(BatchedBehaviour):
+    def __init__(self):
+        super().__init__("CheckDist > threshold")
+
+    def update_batch(self, agents, indices, state):
+        far = agents.distances(indices) > agents.attack_threshold[indices]
+        return np.where(far, SUCCESS, FAILURE).astype(np.int8)
+
+
+class BatchCheckDistanceLessOrEqual(BatchedBehaviour):
+    def __init__(self):
+        super().__init__("CheckDist <= threshold")
+
+    def update_batch(self, agents, indices, state):
+        near = agents.distances(indices) <= agents.attack_threshold[indices]
+        return np.where(near, SUCCESS, FAILURE).astype(np.int8)
+
+
+class BatchCheckBerserkMode(BatchedBehaviour):
+    def __init__(self):
+        super().__init__("CheckBerserk")
+
+    def update_batch(self, agents, indices, state):
+        return np.where(agents.berserk(indices), SUCCESS, FAILURE).astype(np.int8)
+
+
+class BatchApproach(BatchedBehaviour):
+    def __init__(self):
+        super().__init__("AIApproach")
+
+    def update_batch(self, agents, indices, state):
+        for i in indices:
+            approach_target(agents.targets[i], agents.controlled[i], agents.approach_step[i].item())
+        return np.full(len(indices), SUCCESS, dtype=np.int8)
+
+
+class BatchAttack(BatchedBehaviour):
+    """AIAttack para o lote; attack_in_progress fica num array por agente."""
+
+    def __init__(self):
+        super().__init__("AIAttack")
+
+    def create_state(self, size):
+        return {'attack_in_progress': np.zeros(size, dtype=bool)}
+
+    def update_batch(self, agents, indices, state):
+        attack_in_progress = state['attack_in_progress']
+        result = np.full(len(indices), RUNNING, dtype=np.int8)
+        for position, i in enumerate(indices):
+            target, controlled = agents.targets[i], agents.controlled[i]
+            face_target(target, controlled)
+
+            if not controlled.is_attacking and not attack_in_progress[i]:
+                start_attack(target, controlled)
+                attack_in_progress[i] = True
+            elif (not controlled.is_attacking and attack_in_progress[i]
+                  and controlled.attack_finished and not controlled.has_dealt_damage):
+                attack_in_progress[i] = False
+                land_attack(target, controlled)
+                result[position] = SUCCESS
+        return result
+
+
+class BatchBerserkAttack(BatchedBehaviour):
+    """AIBerserkAttack para o lote; attack_in_progress e attack_count por agente."""
+
+    def __init__(self, max_attacks=3):
+        super().__init__("AIBerserkAttack")
+        self.max_attacks = max_attacks  # Número de ataques consecutivos em modo berserk
+
+    def create_state(self, size):
+        return {
+            'attack_in_progress': np.zeros(size, dtype=bool),
+            'attack_count': np.zeros(size, dtype=np.int64),
+        }
+
+    def update_batch(self, agents, indices, state):
+        attack_in_progress = state['attack_in_progress']
+        attack_count = state['attack_count']
+        result = np.full(len(indices), RUNNING, dtype=np.int8)
+        for position, i in enumerate(indices):
+            target, controlled = agents.targets[i], agents.controlled[i]
+            face_target(target, controlled)
+
+            if not controlled.is_attacking and not attack_in_progress[i]:
+                start_attack(target, controlled, berserk=True)
+                attack_in_progress[i] = True
+            elif (not controlled.is_attacking and attack_in_progress[i]
+                  and controlled.attack_finished and not controlled.has_dealt_damage):
+                attack_in_progress[i] = False
+                land_attack(target, controlled, berserk=True)
+                attack_count[i] += 1
+                if attack_count[i] >= self.max_attacks:
+                    attack_count[i] = 0
+                    result[position] = SUCCESS
+        return result
+
+
+def create_batched_fuzzy_ai_tree():
+    """
+    Definição única da árvore de create_fuzzy_ai_tree para uso com BatchedTree.
+    Alvos, distância de ataque e passo vêm de BatchedAgents.
+    """
+    root = py_trees.composites.Selector("AI Root", memory=False)
+
+    approach_seq = py_trees.composites.Sequence("ApproachSeq", memory=False)
+    approach_seq.add_children([BatchCheckDistanceGreaterThan(), BatchApproach()])
+
+    attack_selector = py_trees.composites.Selector("AttackSelector", memory=False)
+
+    # Ramo de ataque berserk
+    berserk_seq = py_trees.composites.Sequence("BerserkSeq", memory=False)
+    berserk_seq.add_children([BatchCheckBerserkMode(), BatchBerserkAttack()])
+
+    # Ramo de ataque normal
+    normal_attack_seq = py_trees.composites.Sequence("NormalAttackSeq", memory=False)
+    normal_attack_seq.add_children([BatchCheckDistanceLessOrEqual(), BatchAttack()])
+
+    attack_selector.add_children([berserk_seq, normal_attack_seq])
+
+    root.add_children([approach_seq, attack_selector])
+    return root
+
+
+# ----- Executor em Lote -----
+class BatchedTree:
+    """
+    Uma definição de árvore compartilhada por todos os agentes do lote.
+
+    O estado de cada nó (status e filho atual) é uma linha de um array
+    (nós x agentes), e cada nó é ticado uma única vez por tick para todos os
+    agentes que chegam a ele, como em CompiledTree mas com índices de
+    agentes em vez de um único agente. Suporta Selector e Sequence sem
+    memória e folhas BatchedBehaviour (sem initialise/terminate).
+
+    Os agentes de uma mesma chamada de tick() avançam juntos, nó a nó; para
+    reproduzir a ordem de árvores independentes (ex.: todos os avatares A e
+    depois todos os B), chame tick() com cada grupo de índices.
+    """
+
+    def __init__(self, root, agents):
+        self.structure = TreeStructure(root)
+        self.agents = agents
+        structure = self.structure
+        for name, kind, memory, behaviour in zip(structure.names, structure.kinds,
+                                                 structure.memory, structure.behaviours):
+            if kind not in (LEAF, SEQUENCE, SELECTOR) or memory:
+                raise TypeError(f"Nó não suportado pela árvore em lote: {name}")
+            if kind == LEAF and not isinstance(behaviour, BatchedBehaviour):
+                raise TypeError(f"Folha sem versão em lote: {name} ({type(behaviour).__name__})")
+
+        size = len(agents)
+        self.status = np.full((len(structure), size), INVALID, dtype=np.int8)
+        self.current_child = np.full((len(structure), size), NO_CHILD, dtype=np.int32)
+        self.leaf_state = [behaviour.create_state(size) if kind == LEAF else None
+                           for kind, behaviour in zip(structure.kinds, structure.behaviours)]
+        self._subtrees = [np.array(self._subtree(index)) for index in range(len(structure))]
+        self._tickers = [(self._tick_leaf, self._tick_sequence, self._tick_selector)[kind]
+                         for kind in structure.kinds]
+
+    def _subtree(self, index):
+        nodes = [index]
+        for child in self.structure.children[index]:
+            nodes.extend(self._subtree(child))
+        return nodes
+
+    def tick(self, indices=None):
+        """Tica os agentes 'indices' (todos, por padrão); retorna o status (código) da raiz de cada um."""
+        if indices is None:
+            indices = np.arange(len(self.agents))
+        indices = np.asarray(indices, dtype=np.intp)
+        if not indices.size:
+            return np.zeros(0, dtype=np.int8)
+        return self._tickers[0](0, indices)
+
+    def node_status(self, name, agent):
+        """Status atual do nó 'name' para o agente de índice 'agent'."""
+        return STATUSES[self.status[self.structure.names.index(name), agent]]
+
+    def _invalidate(self, index, indices):
+        # Equivale a stop(INVALID) na subárvore: sem folhas com terminate(), só zera o estado
+        if indices.size:
+            nodes = self._subtrees[index]
+            self.status[np.ix_(nodes, indices)] = INVALID
+            self.current_child[np.ix_(nodes, indices)] = NO_CHILD
+
+    # ----- Tick por tipo de nó -----
+    def _tick_leaf(self, index, indices):
+        result = self.structure.behaviours[index].update_batch(self.agents, indices, self.leaf_state[index])
+        self.status[index, indices] = result
+        return result
+
+    def _tick_sequence(self, index, indices):
+        children = self.structure.children[index]
+        status = self.status
+        current_child = self.current_child
+
+        restarting = indices[status[index, indices] != RUNNING]
+        for child in children:
+            self._invalidate(child, restarting)
+
+        result = np.full(len(indices), SUCCESS, dtype=np.int8)
+        if not children:
+            current_child[index, indices] = NO_CHILD
+            status[index, indices] = result
+            return result
+
+        current_child[index, indices] = children[0]
+        pending = np.arange(len(indices))
+        for position, child in enumerate(children):
+            child_status = self._tickers[child](child, indices[pending])
+            stopped = child_status != SUCCESS
+            if stopped.any():
+                # Invalida o restante da sequência (filhos pendentes)
+                result[pending[stopped]] = child_status[stopped]
+                for later in children[position + 1:]:
+                    self._invalidate(later, indices[pending[stopped]])
+                pending = pending[~stopped]
+            if not pending.size:
+                break
+            if position + 1 < len(children):
+                current_child[index, indices[pending]] = children[position + 1]
+
+        status[index, indices] = result
+        return result
+
+    def _tick_selector(self, index, indices):
+        children = self.structure.children[index]
+        status = self.status
+        current_child = self.current_child
+
+        restarting = indices[status[index, indices] != RUNNING]
+        current_child[index, restarting] = children[0] if children else NO_CHILD
+
+        result = np.full(len(indices), FAILURE, dtype=np.int8)
+        if not children:
+            current_child[index, indices] = NO_CHILD
+            status[index, indices] = result
+            return result
+
+        previous = current_child[index, indices].copy()
+        pending = np.arange(len(indices))
+        for position, child in enumerate(children):
+            child_status = self._tickers[child](child, indices[pending])
+            chosen = (child_status == RUNNING) | (child_status == SUCCESS)
+            if chosen.any():
+                chosen_positions = pending[chosen]
+                result[chosen_positions] = child_status[chosen]
+                current_child[index, indices[chosen_positions]] = child
+                # Interrupção: invalida os filhos de menor prioridade
+                switched = indices[chosen_positions[previous[chosen_positions] != child]]
+                for lower in children[position + 1:]:
+                    self._invalidate(lower, switched)
+                pending = pending[~chosen]
+            if not pending.size:
+                break
+
+        current_child[index, indices[pending]] = children[-1]
+        status[index, indices] = result
+        return result
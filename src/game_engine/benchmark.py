@@ -0,0 +1,468 @@
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+# Versão do formato do relatório JSON
+REPORT_VERSION = 1
+
+# Desvio relativo (tempo por operação) a partir do qual compare() acusa regressão
+REGRESSION_THRESHOLD = 0.10
+
+
+# ----- Medição -----
+def measure(function, repeat=5, min_time=0.2, number=None):
+    """
+    Mede function() com timeit: cada uma das 'repeat' rodadas chama a função
+    'number' vezes (por padrão, o suficiente para durar 'min_time' segundos)
+    e o resultado é o tempo por chamada de cada rodada.
+    Retorna um dict com o melhor tempo, a mediana, a média e o desvio (s).
+    """
+    timer = timeit.Timer(function)
+    if number is None:
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= min_time:
+                break
+            number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    times = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'best_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.fmean(times),
+        'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+# ----- Casos de Benchmark -----
+# Cada caso prepara o que precisa e retorna (função medida, itens por chamada,
+# opções para measure()); 'itens' é a unidade do throughput (golpes, ticks, partidas...)
+def _damage_inputs(count=1024, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 15, count).tolist(), rng.uniform(1, 500, count).round().tolist()
+
+
+def bench_fuzzy_damage():
+    """FuzzyAvatar.calculate_fuzzy_damage() com o controlador compartilhado, entradas variadas."""
+    from fuzzy_avatar import create_avatar
+    avatar = create_avatar("avatarA", 0, headless=True)
+    angers, hps = _damage_inputs()
+
+    def run():
+        for anger, hp in zip(angers, hps):
+            avatar.anger = anger
+            avatar.hp = hp
+            avatar.calculate_fuzzy_damage()
+    return run, len(angers), {}
+
+
+def bench_fuzzy_damage_compiled():
+    """calculate_fuzzy_damage() com a tabela pré-compilada (CompiledFuzzyDamage)."""
+    from fuzzy_avatar import create_avatar
+    from fuzzy_damage import CompiledFuzzyDamage
+    avatar = create_avatar("avatarA", 0, damage_table=CompiledFuzzyDamage(), headless=True)
+    angers, hps = _damage_inputs()
+
+    def run():
+        for anger, hp in zip(angers, hps):
+            avatar.anger = anger
+            avatar.hp = hp
+            avatar.calculate_fuzzy_damage()
+    return run, len(angers), {}
+
+
+def bench_fuzzy_damage_memoized():
+    """calculate_fuzzy_damage() com o cache de entradas quantizadas (MemoizedFuzzyDamage), aquecido."""
+    from fuzzy_avatar import create_avatar
+    from fuzzy_damage import MemoizedFuzzyDamage
+    avatar = create_avatar("avatarA", 0, damage_table=MemoizedFuzzyDamage(), headless=True)
+    angers, hps = _damage_inputs()
+
+    def run():
+        for anger, hp in zip(angers, hps):
+            avatar.anger = anger
+            avatar.hp = hp
+            avatar.calculate_fuzzy_damage()
+    run()
+    return run, len(angers), {}
+
+
+def bench_fuzzy_damage_batch():
+    """FuzzyDamageController.compute_many() vetorizado (approximate=True) para 1024 entradas de uma vez."""
+    from fuzzy_damage import FuzzyDamageController
+    controller = FuzzyDamageController(approximate=True)
+    angers, hps = _damage_inputs()
+    angers = np.array(angers)
+    hp_percentage = np.array(hps) / 5
+
+    return (lambda: controller.compute_many(angers, hp_percentage)), len(angers), {}
+
+
+def bench_create_damage_system():
+    """Construção do sistema skfuzzy (create_fuzzy_damage_system)."""
+    from fuzzy_damage import create_fuzzy_damage_system
+    return create_fuzzy_damage_system, 1, {'number': 1, 'repeat': 5}
+
+
+def bench_create_damage_controller():
+    """Construção do controlador compartilhado (FuzzyDamageController)."""
+    from fuzzy_damage import FuzzyDamageController
+    return FuzzyDamageController, 1, {'number': 1, 'repeat': 5}
+
+
+def _duel_trees(compiled, distance):
+    # Avatares parados a 'distance' px um do outro; os avatares não são
+    # atualizados, então a árvore repete sempre o mesmo caminho
+    from fuzzy_avatar import create_avatar
+    from fuzzy_ai_tree import create_fuzzy_ai_tree
+    from compiled_tree import compile_tree
+    avatarA = create_avatar("avatarA", 300, headless=True)
+    avatarB = create_avatar("avatarB", 300 + distance, headless=True)
+    trees = [create_fuzzy_ai_tree(avatarB, avatarA, attack_threshold=100, approach_step=0),
+             create_fuzzy_ai_tree(avatarA, avatarB, attack_threshold=100, approach_step=0)]
+    if compiled:
+        trees = [compile_tree(tree) for tree in trees]
+    tick_a, tick_b = (tree.tick_once for tree in trees)
+
+    def run():
+        tick_a()
+        tick_b()
+    return run, 2, {}
+
+
+def bench_tree_approach():
+    """tick_once() (py_trees) no ramo de aproximação."""
+    return _duel_trees(compiled=False, distance=600)
+
+
+def bench_tree_attack():
+    """tick_once() (py_trees) com um ataque em andamento (RUNNING)."""
+    return _duel_trees(compiled=False, distance=50)
+
+
+def bench_compiled_tree_approach():
+    """tick_once() da CompiledTree no ramo de aproximação."""
+    return _duel_trees(compiled=True, distance=600)
+
+
+def bench_compiled_tree_attack():
+    """tick_once() da CompiledTree com um ataque em andamento (RUNNING)."""
+    return _duel_trees(compiled=True, distance=50)
+
+
+def bench_avatar_update():
+    """FuzzyAvatar.update() (animação, raiva e berserk) com passo fixo."""
+    from fuzzy_avatar import create_duel_avatars
+    from sim_clock import FastClock
+    clock = FastClock()
+    avatarA, avatarB = create_duel_avatars(headless=True, clock=clock)
+    avatarA.is_moving = True
+    avatarB.last_damage_received = 40
+
+    def run():
+        avatarA.update(None)
+        avatarB.update(None)
+        clock.tick()
+    return run, 2, {}
+
+
+def _avatar_roster(scheduled, count=200):
+    # 'count' avatares parados, todos com update() a cada tick
+    from fuzzy_avatar import create_avatar
+    from sim_clock import FastClock
+    from animation_scheduler import AnimationScheduler
+    clock = FastClock()
+    animations = AnimationScheduler(clock)
+    avatars = [create_avatar(("avatarA", "avatarB")[i % 2], 100 + i * 4, headless=True, clock=clock)
+               for i in range(count)]
+    if scheduled:
+        for avatar in avatars:
+            animations.add(avatar)
+
+    def run():
+        for avatar in avatars:
+            avatar.update(None)
+        animations.advance()
+        clock.tick()
+    return run, count, {}
+
+
+def bench_avatar_roster():
+    """update() de 200 avatares por tick, quadros verificados em cada update()."""
+    return _avatar_roster(scheduled=False)
+
+
+def bench_avatar_roster_scheduled():
+    """update() de 200 avatares por tick, quadros avançados pelo AnimationScheduler."""
+    return _avatar_roster(scheduled=True)
+
+
+def bench_avatar_draw():
+    """FuzzyAvatar.draw() (sprite, nome, barra de vida e textos) numa superfície fora da tela."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from fuzzy_avatar import create_duel_avatars, SCREEN_WIDTH, SCREEN_HEIGHT
+    pygame.init()
+    # Janela oculta só para que sprites e superfície usem o formato do display, como no jogo
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    avatarA, avatarB = create_duel_avatars()
+    avatarB.berserk_mode = True
+    avatarB.anger = 12.5
+
+    def run():
+        avatarA.draw(surface)
+        avatarB.draw(surface)
+    return run, 2, {}
+
+
+def bench_headless_match():
+    """Partida headless completa (py_trees), semente fixa."""
+    from headless import run_headless_match
+    return (lambda: run_headless_match(seed=1, record_stats=False)), 1, {'repeat': 3}
+
+
+def bench_headless_match_compiled():
+    """Partida headless completa com CompiledTree, semente fixa."""
+    from headless import run_headless_match
+    return (lambda: run_headless_match(seed=1, record_stats=False, compiled_trees=True)), 1, {'repeat': 3}
+
+
+def bench_headless_match_event_driven():
+    """Partida headless com golpes agendados (EventScheduler) e árvores que dormem, semente fixa."""
+    from headless import run_headless_match
+    return (lambda: run_headless_match(seed=1, record_stats=False, event_driven=True)), 1, {'repeat': 3}
+
+
+def bench_headless_battle(event_driven=False):
+    from headless import run_headless_battle
+    from fuzzy_damage import CompiledFuzzyDamage
+    damage_table = CompiledFuzzyDamage()
+    return (lambda: run_headless_battle((20, 20), damage_table=damage_table, event_driven=event_driven)), 1, \
+        {'repeat': 3}
+
+
+def bench_headless_battle_polling():
+    """Batalha headless 20x20 (árvores compiladas, dano pré-compilado), ataques por consulta."""
+    return bench_headless_battle(event_driven=False)
+
+
+def bench_headless_battle_event_driven():
+    """Batalha headless 20x20 com golpes agendados e árvores que dormem."""
+    return bench_headless_battle(event_driven=True)
+
+
+def bench_telemetry_record_tick():
+    """Telemetry.record_tick() (amostra de um duelo com caminho de decisão), entregue a um RingBufferSink."""
+    from fuzzy_avatar import create_duel_avatars
+    from fuzzy_ai_tree import create_fuzzy_ai_tree
+    from telemetry import Telemetry
+    avatarA, avatarB = create_duel_avatars(headless=True)
+    trees = [create_fuzzy_ai_tree(avatarB, avatarA, attack_threshold=100, approach_step=0),
+             create_fuzzy_ai_tree(avatarA, avatarB, attack_threshold=100, approach_step=0)]
+    for tree in trees:
+        tree.tick_once()
+    telemetry = Telemetry((avatarA, avatarB), trees)
+    return telemetry.record_tick, 1, {}
+
+
+def _cold_start(code):
+    # Novo interpretador a cada chamada: mede importações e inicialização do zero
+    command = [sys.executable, '-c', code]
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    return (lambda: subprocess.run(command, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)), 1, \
+        {'number': 1, 'repeat': 5}
+
+
+def bench_startup_interpreter():
+    """Partida do interpretador sem nada (referência para os outros casos de startup)."""
+    return _cold_start("pass")
+
+
+def bench_startup_damage_model():
+    """Processo novo que só usa o modelo de dano (get_damage_controller + um cálculo)."""
+    return _cold_start("from fuzzy_damage import get_damage_controller; get_damage_controller().compute(5, 50)")
+
+
+def bench_startup_import_main():
+    """Processo novo que só importa main.py (sem janela nem recursos)."""
+    return _cold_start("import main")
+
+
+def bench_startup_first_frame():
+    """Processo novo até o primeiro quadro do jogo (main.main(max_frames=1), vídeo 'dummy')."""
+    return _cold_start("import main; main.EVENT_LOG_LEVEL = main.INFO; main.main(max_frames=1)")
+
+
+# Nome do caso -> (função de preparo, unidade dos itens)
+BENCHMARKS = {
+    'fuzzy_damage.calculate': (bench_fuzzy_damage, 'hits'),
+    'fuzzy_damage.calculate_compiled': (bench_fuzzy_damage_compiled, 'hits'),
+    'fuzzy_damage.calculate_memoized': (bench_fuzzy_damage_memoized, 'hits'),
+    'fuzzy_damage.compute_many': (bench_fuzzy_damage_batch, 'hits'),
+    'fuzzy_damage.create_system': (bench_create_damage_system, 'systems'),
+    'fuzzy_damage.create_controller': (bench_create_damage_controller, 'controllers'),
+    'tree.tick_once.approach': (bench_tree_approach, 'tree ticks'),
+    'tree.tick_once.attack': (bench_tree_attack, 'tree ticks'),
+    'compiled_tree.tick_once.approach': (bench_compiled_tree_approach, 'tree ticks'),
+    'compiled_tree.tick_once.attack': (bench_compiled_tree_attack, 'tree ticks'),
+    'avatar.update': (bench_avatar_update, 'updates'),
+    'avatar.roster': (bench_avatar_roster, 'updates'),
+    'avatar.roster_scheduled': (bench_avatar_roster_scheduled, 'updates'),
+    'avatar.draw': (bench_avatar_draw, 'draws'),
+    'headless.match': (bench_headless_match, 'matches'),
+    'headless.match_compiled': (bench_headless_match_compiled, 'matches'),
+    'headless.match_event_driven': (bench_headless_match_event_driven, 'matches'),
+    'headless.battle': (bench_headless_battle_polling, 'battles'),
+    'headless.battle_event_driven': (bench_headless_battle_event_driven, 'battles'),
+    'telemetry.record_tick': (bench_telemetry_record_tick, 'samples'),
+    'startup.interpreter': (bench_startup_interpreter, 'processes'),
+    'startup.damage_model': (bench_startup_damage_model, 'processes'),
+    'startup.import_main': (bench_startup_import_main, 'processes'),
+    'startup.first_frame': (bench_startup_first_frame, 'processes'),
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _package_version(name):
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': _package_version('numpy'),
+        'pygame': _package_version('pygame'),
+        'py_trees': _package_version('py_trees'),
+        'skfuzzy': _package_version('scikit-fuzzy'),
+        'commit': _git_commit(),
+    }
+
+
+def run_benchmarks(names=None, repeat=5, min_time=0.2, on_result=None):
+    """
+    Executa os casos de BENCHMARKS (todos ou os de 'names') e retorna o
+    relatório: ambiente (versões, commit) e, por caso, o tempo por chamada,
+    o tempo por item e o throughput (itens/s, a partir da mediana).
+    on_result(nome, resultado) é chamado ao fim de cada caso.
+    """
+    report = {
+        'version': REPORT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': _environment(),
+        'benchmarks': {},
+    }
+    for name in (names if names is not None else BENCHMARKS):
+        setup, unit = BENCHMARKS[name]
+        function, items, options = setup()
+        options = {'repeat': repeat, 'min_time': min_time, **options}
+        result = measure(function, **options)
+        result.update({
+            'description': setup.__doc__,
+            'unit': unit,
+            'items_per_call': items,
+            'per_item_s': result['median_s'] / items,
+            'throughput_per_s': items / result['median_s'],
+        })
+        report['benchmarks'][name] = result
+        if on_result is not None:
+            on_result(name, result)
+    return report
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compara dois relatórios caso a caso (mediana por item).
+    Retorna [(nome, razão atual/base, situação)], com situação 'regression',
+    'improvement' ou 'same' conforme o limiar relativo 'threshold'.
+    """
+    rows = []
+    for name, result in report['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            continue
+        ratio = result['per_item_s'] / base['per_item_s']
+        if ratio > 1 + threshold:
+            verdict = 'regression'
+        elif ratio < 1 - threshold:
+            verdict = 'improvement'
+        else:
+            verdict = 'same'
+        rows.append((name, ratio, verdict))
+    return rows
+
+
+def _format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmarks do motor do duelo (saída em JSON).")
+    parser.add_argument('names', nargs='*', help="casos a executar (prefixos; padrão: todos)")
+    parser.add_argument('-o', '--output', help="arquivo JSON do relatório (padrão: stdout)")
+    parser.add_argument('--baseline', help="relatório anterior para comparar")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help="duração mínima de cada rodada (s)")
+    parser.add_argument('--list', action='store_true', help="lista os casos e sai")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (setup, unit) in BENCHMARKS.items():
+            print(f"{name:36} {setup.__doc__}")
+        return 0
+
+    names = [name for name in BENCHMARKS
+             if not args.names or any(name.startswith(prefix) for prefix in args.names)]
+
+    def progress(name, result):
+        print(f"{name:36} {_format_time(result['per_item_s']):>10}/{result['unit']:<12} "
+              f"{result['throughput_per_s']:>14,.1f} {result['unit']}/s", file=sys.stderr)
+
+    report = run_benchmarks(names, repeat=args.repeat, min_time=args.min_time, on_result=progress)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            rows = compare(report, json.load(baseline_file))
+        for name, ratio, verdict in rows:
+            print(f"{name:36} {ratio:6.2f}x  {verdict}", file=sys.stderr)
+        return 1 if any(verdict == 'regression' for _, _, verdict in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
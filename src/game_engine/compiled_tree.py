@@ -0,0 +1,295 @@
+import py_trees
+from py_trees.common import Status
+
+# Tipos de nó da árvore compilada
+LEAF = 0
+SEQUENCE = 1
+SELECTOR = 2
+PARALLEL = 3
+
+# Estados como inteiros (índices em STATUSES)
+INVALID = 0
+SUCCESS = 1
+FAILURE = 2
+RUNNING = 3
+STATUSES = (Status.INVALID, Status.SUCCESS, Status.FAILURE, Status.RUNNING)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Políticas do Parallel
+SUCCESS_ON_ALL = 0
+SUCCESS_ON_ONE = 1
+SUCCESS_ON_SELECTED = 2
+
+NO_CHILD = -1
+
+
+# ----- Estrutura Plana da Árvore -----
+class TreeStructure:
+    """
+    Definição de uma árvore de comportamento em arrays planos.
+
+    Os nós ficam em pré-ordem (a raiz é o nó 0) e cada composto guarda os
+    índices inteiros dos filhos. Os comportamentos folha continuam sendo os
+    objetos py_trees originais: só o update() (e initialise()/terminate())
+    de cada um é chamado.
+    """
+
+    def __init__(self, root):
+        self.names = []
+        self.kinds = []
+        self.children = []
+        self.memory = []
+        self.policies = []
+        self.synchronise = []
+        self.selected = []  # Filhos exigidos pela política SuccessOnSelected
+        self.behaviours = []
+        self._add(root)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def _add(self, node):
+        index = len(self.kinds)
+        self.names.append(node.name)
+        self.behaviours.append(node)
+        self.children.append(())
+        self.memory.append(getattr(node, 'memory', False))
+        self.policies.append(None)
+        self.synchronise.append(False)
+        self.selected.append(())
+
+        if isinstance(node, py_trees.composites.Sequence):
+            self.kinds.append(SEQUENCE)
+        elif isinstance(node, py_trees.composites.Selector):
+            self.kinds.append(SELECTOR)
+        elif isinstance(node, py_trees.composites.Parallel):
+            self.kinds.append(PARALLEL)
+            policy = node.policy
+            self.synchronise[index] = policy.synchronise
+            if isinstance(policy, py_trees.common.ParallelPolicy.SuccessOnAll):
+                self.policies[index] = SUCCESS_ON_ALL
+            elif isinstance(policy, py_trees.common.ParallelPolicy.SuccessOnOne):
+                self.policies[index] = SUCCESS_ON_ONE
+            elif isinstance(policy, py_trees.common.ParallelPolicy.SuccessOnSelected):
+                self.policies[index] = SUCCESS_ON_SELECTED
+            else:
+                raise TypeError(f"Política de Parallel não suportada: {type(policy).__name__}")
+        elif isinstance(node, (py_trees.composites.Composite, py_trees.decorators.Decorator)):
+            raise TypeError(f"Nó não suportado pela árvore compilada: {type(node).__name__}")
+        else:
+            self.kinds.append(LEAF)
+
+        if self.kinds[index] != LEAF:
+            self.children[index] = tuple(self._add(child) for child in node.children)
+            if self.policies[index] == SUCCESS_ON_SELECTED:
+                positions = {id(child): child_index
+                             for child, child_index in zip(node.children, self.children[index])}
+                self.selected[index] = tuple(positions[id(child)] for child in node.policy.children)
+        return index
+
+
+# ----- Executor Compilado -----
+class CompiledTree:
+    """
+    Executor leve para árvores py_trees (Selector, Sequence, Parallel).
+
+    Mantém a mesma semântica do py_trees - SUCCESS/FAILURE/RUNNING, compostos
+    com e sem memória, interrupção por prioridade e a invalidação de filhos
+    pendentes - mas o tick percorre os arrays de TreeStructure com chamadas
+    de função diretas, sem criar geradores a cada tick.
+    O estado (status e filho atual de cada nó) fica em listas deste objeto;
+    o atributo .status dos comportamentos py_trees não é atualizado.
+    """
+
+    def __init__(self, root):
+        self.structure = TreeStructure(root)
+        self.status = [INVALID] * len(self.structure)
+        self.current_child = [NO_CHILD] * len(self.structure)
+
+        structure = self.structure
+        self._updates = [behaviour.update for behaviour in structure.behaviours]
+        self._tickers = [(self._tick_leaf, self._tick_sequence, self._tick_selector, self._tick_parallel)[kind]
+                         for kind in structure.kinds]
+
+    @property
+    def root_status(self):
+        return STATUSES[self.status[0]]
+
+    def tick_once(self):
+        """Tica a árvore a partir da raiz e retorna o Status da raiz."""
+        return STATUSES[self._tickers[0](0)]
+
+    def node_status(self, name):
+        """Status atual do primeiro nó com o nome dado."""
+        return STATUSES[self.status[self.structure.names.index(name)]]
+
+    # ----- Parada / invalidação -----
+    def _stop(self, index, new_status):
+        structure = self.structure
+        kind = structure.kinds[index]
+        status = self.status
+        if kind == PARALLEL:
+            # Parallel: encerra os filhos ainda em execução
+            for child in structure.children[index]:
+                if status[child] == RUNNING:
+                    self._stop(child, INVALID)
+        if kind != LEAF and new_status == INVALID:
+            # Composto interrompido: esquece o filho atual e invalida os filhos
+            self.current_child[index] = NO_CHILD
+            for child in structure.children[index]:
+                if status[child] != INVALID:
+                    self._stop(child, INVALID)
+        structure.behaviours[index].terminate(STATUSES[new_status])
+        status[index] = new_status
+
+    # ----- Tick por tipo de nó -----
+    def _tick_leaf(self, index):
+        if self.status[index] != RUNNING:
+            self.structure.behaviours[index].initialise()
+        new_status = STATUS_CODES.get(self._updates[index](), INVALID)
+        if new_status != RUNNING:
+            self._stop(index, new_status)
+        self.status[index] = new_status
+        return new_status
+
+    def _tick_selector(self, index):
+        structure = self.structure
+        children = structure.children[index]
+        status = self.status
+        current_child = self.current_child
+
+        if status[index] != RUNNING:
+            current_child[index] = children[0] if children else NO_CHILD
+            structure.behaviours[index].initialise()
+
+        if not children:
+            current_child[index] = NO_CHILD
+            self._stop(index, FAILURE)
+            return FAILURE
+
+        if structure.memory[index]:
+            start = children.index(current_child[index])
+            for child in children[:start]:
+                if status[child] != INVALID:
+                    self._stop(child, INVALID)
+        else:
+            start = 0
+
+        previous = current_child[index]
+        for child in children[start:]:
+            child_status = self._tickers[child](child)
+            if child_status == RUNNING or child_status == SUCCESS:
+                current_child[index] = child
+                if previous != child:
+                    # Interrupção: invalida os filhos de menor prioridade
+                    for lower in children[children.index(child) + 1:]:
+                        if status[lower] != INVALID:
+                            self._stop(lower, INVALID)
+                if child_status == SUCCESS:
+                    self._stop(index, SUCCESS)
+                else:
+                    status[index] = RUNNING
+                return child_status
+
+        self._stop(index, FAILURE)
+        current_child[index] = children[-1]
+        return FAILURE
+
+    def _tick_sequence(self, index):
+        structure = self.structure
+        children = structure.children[index]
+        status = self.status
+        current_child = self.current_child
+
+        position = 0
+        if status[index] != RUNNING:
+            current_child[index] = children[0] if children else NO_CHILD
+            for child in children:
+                if status[child] != INVALID:
+                    self._stop(child, INVALID)
+            structure.behaviours[index].initialise()
+        elif structure.memory[index] and current_child[index] != NO_CHILD:
+            position = children.index(current_child[index])
+        else:
+            current_child[index] = children[0] if children else NO_CHILD
+
+        if not children:
+            current_child[index] = NO_CHILD
+            self._stop(index, SUCCESS)
+            return SUCCESS
+
+        while position < len(children):
+            child = children[position]
+            child_status = self._tickers[child](child)
+            if child_status != SUCCESS:
+                if not structure.memory[index]:
+                    # Invalida o restante da sequência (filhos pendentes)
+                    for later in children[position + 1:]:
+                        if status[later] != INVALID:
+                            self._stop(later, INVALID)
+                if child_status != RUNNING:
+                    self._stop(index, child_status)
+                else:
+                    status[index] = RUNNING
+                return child_status
+            if position + 1 < len(children):
+                current_child[index] = children[position + 1]
+            position += 1
+
+        self._stop(index, SUCCESS)
+        return SUCCESS
+
+    def _tick_parallel(self, index):
+        structure = self.structure
+        children = structure.children[index]
+        status = self.status
+        current_child = self.current_child
+
+        if status[index] != RUNNING:
+            for child in children:
+                if status[child] != INVALID:
+                    self._stop(child, INVALID)
+            current_child[index] = NO_CHILD
+            structure.behaviours[index].initialise()
+
+        if not children:
+            current_child[index] = NO_CHILD
+            self._stop(index, SUCCESS)
+            return SUCCESS
+
+        synchronise = structure.synchronise[index]
+        for child in children:
+            if synchronise and status[child] == SUCCESS:
+                continue
+            self._tickers[child](child)
+
+        new_status = RUNNING
+        current_child[index] = children[-1]
+        failed = next((child for child in children if status[child] == FAILURE), NO_CHILD)
+        if failed != NO_CHILD:
+            current_child[index] = failed
+            new_status = FAILURE
+        else:
+            policy = structure.policies[index]
+            if policy == SUCCESS_ON_ALL:
+                if all(status[child] == SUCCESS for child in children):
+                    new_status = SUCCESS
+            elif policy == SUCCESS_ON_ONE:
+                for child in reversed(children):
+                    if status[child] == SUCCESS:
+                        new_status = SUCCESS
+                        current_child[index] = child
+                        break
+            elif all(status[child] == SUCCESS for child in structure.selected[index]):
+                new_status = SUCCESS
+                current_child[index] = structure.selected[index][-1]
+
+        if new_status != RUNNING:
+            self._stop(index, new_status)
+        status[index] = new_status
+        return new_status
+
+
+def compile_tree(root):
+    """Compila uma árvore py_trees (ex.: create_fuzzy_ai_tree) para o executor leve."""
+    return CompiledTree(root)
@@ -0,0 +1,214 @@
+import atexit
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+# Níveis (mesmos valores do módulo logging)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+# Tipos de evento emitidos pelo jogo
+APPROACH = 'approach'
+ATTACK_STARTED = 'attack_started'
+ATTACK_FINISHED = 'attack_finished'
+DAMAGE_APPLIED = 'damage_applied'
+DAMAGE_RECEIVED = 'damage_received'
+BERSERK_ENTERED = 'berserk_entered'
+BERSERK_EXITED = 'berserk_exited'
+GAME_OVER = 'game_over'
+TREE_PROFILE = 'tree_profile'
+TICK_SAMPLE = 'tick_sample'
+
+# Um evento: instante (time.monotonic), nível, tipo e campos
+Event = namedtuple('Event', ['time', 'level', 'kind', 'fields'])
+
+
+def _number(value):
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def _format_approach(fields):
+    if 'step' in fields:
+        return f"{fields['avatar']} moveu {fields['step']} pixels"
+    return f"Jogadores se aproximando (Distância: {_number(fields['distance'])})"
+
+
+def _format_damage_applied(fields):
+    kind = "de dano BERSERK" if fields.get('berserk') else "de dano"
+    return (f"{fields['attacker']} causou {_number(fields['damage'])} {kind} em {fields['target']} "
+            f"(HP: {_number(fields['old_hp'])} -> {_number(fields['hp'])})")
+
+
+def _format_tick_sample(fields):
+    avatars = ", ".join(f"{avatar['name']} HP {avatar['hp']} raiva {_number(avatar['anger'])}"
+                        f"{' BERSERK' if avatar['berserk'] else ''}" for avatar in fields['avatars'])
+    return f"Tick {fields['tick']}: distância {fields['distance']}, {avatars}"
+
+
+# Mensagem legível de cada tipo de evento (saída de texto)
+EVENT_FORMATTERS = {
+    APPROACH: _format_approach,
+    ATTACK_STARTED: lambda fields: (f"{fields['attacker']} iniciou "
+                                    f"{'ataque BERSERK' if fields.get('berserk') else 'ataque'} "
+                                    f"contra {fields['target']}"),
+    ATTACK_FINISHED: lambda fields: f"{fields['avatar']} finalizou ataque",
+    DAMAGE_APPLIED: _format_damage_applied,
+    DAMAGE_RECEIVED: lambda fields: (f"{fields['avatar']} recebeu {_number(fields['damage'])} de dano. "
+                                     f"HP: {_number(fields['old_hp'])} -> {_number(fields['hp'])}"),
+    BERSERK_ENTERED: lambda fields: f"{fields['avatar']} ENTROU EM MODO BERSERK!!!",
+    BERSERK_EXITED: lambda fields: f"{fields['avatar']} saiu do modo berserk",
+    GAME_OVER: lambda fields: f"Jogo terminado! {fields['winner']} venceu!",
+    TREE_PROFILE: lambda fields: fields['report'],
+    TICK_SAMPLE: _format_tick_sample,
+}
+
+
+def format_event(event):
+    formatter = EVENT_FORMATTERS.get(event.kind)
+    message = formatter(event.fields) if formatter else f"{event.kind} {event.fields}"
+    return f"[{LEVEL_NAMES.get(event.level, event.level)}] {message}"
+
+
+# ----- Destinos dos Eventos -----
+class TextSink:
+    """Escreve cada evento como uma linha de texto (padrão: sys.stdout)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write_events(self, events):
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("".join(format_event(event) + "\n" for event in events))
+        stream.flush()
+
+
+# ----- Registro de Eventos -----
+class EventLog:
+    """
+    Registro estruturado de eventos, no lugar dos print() de depuração.
+
+    emit() só guarda o evento num buffer circular (deque com 'capacity'
+    posições; os mais antigos são descartados se o buffer encher) e uma
+    thread em segundo plano entrega os eventos aos destinos ('sinks') a cada
+    'flush_interval' segundos, então o loop do jogo nunca espera pela escrita.
+    Com o nível acima do evento (padrão: OFF), emit() retorna logo na
+    primeira comparação e nenhuma thread é criada.
+    Ouvintes (add_listener) recebem cada evento na hora, no próprio tick,
+    independentemente do nível dos destinos (ex.: gravação de replays).
+    """
+
+    def __init__(self, level=OFF, capacity=8192, flush_interval=0.25, sinks=None):
+        self._listeners = []
+        self.level = level
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.sinks = [TextSink()] if sinks is None else list(sinks)
+        self.dropped = 0
+        self._buffer = deque(maxlen=capacity)
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._close_at_exit = False
+
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        self._level = level
+        self._update_threshold()
+
+    def _update_threshold(self):
+        # Menor nível que alguém (destinos ou ouvintes) ainda quer receber
+        self._threshold = min([self._level] + [level for level, _ in self._listeners])
+
+    def enabled_for(self, level):
+        return level >= self._threshold
+
+    def emit(self, level, kind, **fields):
+        if level < self._threshold:
+            return
+        event = Event(time.monotonic(), level, kind, fields)
+        for listener_level, listener in self._listeners:
+            if level >= listener_level:
+                listener(event)
+        if level < self._level:
+            return
+        if len(self._buffer) == self.capacity:
+            self.dropped += 1
+        self._buffer.append(event)
+        if self._thread is None:
+            self._start()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def add_listener(self, listener, level=DEBUG):
+        """Chama listener(event) no momento da emissão para eventos de nível >= level."""
+        self._listeners.append((level, listener))
+        self._update_threshold()
+
+    def remove_listener(self, listener):
+        self._listeners = [(level, other) for level, other in self._listeners if other is not listener]
+        self._update_threshold()
+
+    def flush(self):
+        """Entrega aos destinos todos os eventos do buffer."""
+        with self._flush_lock:
+            buffer = self._buffer
+            events = [buffer.popleft() for _ in range(len(buffer))]
+            if events:
+                for sink in self.sinks:
+                    sink.write_events(events)
+
+    def drain(self):
+        """Retira e retorna os eventos do buffer sem entregá-los aos destinos."""
+        with self._flush_lock:
+            buffer = self._buffer
+            return [buffer.popleft() for _ in range(len(buffer))]
+
+    def close(self):
+        """Para a thread de escrita e entrega os eventos pendentes."""
+        thread = self._thread
+        if thread is not None:
+            self._thread = None
+            self._wake.set()
+            thread.join()
+            self._wake.clear()
+        self.flush()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+        if not self._close_at_exit:
+            atexit.register(self.close)
+            self._close_at_exit = True
+
+    def _run(self):
+        while self._thread is not None:
+            self._wake.wait(self.flush_interval)
+            self.flush()
+
+
+# Registro compartilhado pelo jogo
+event_log = EventLog()
+
+
+def configure(level=None, sinks=None, capacity=None, flush_interval=None):
+    """Ajusta o registro compartilhado (ex.: configure(DEBUG) para ver os eventos)."""
+    if capacity is not None:
+        event_log.flush()
+        event_log.capacity = capacity
+        event_log._buffer = deque(maxlen=capacity)
+    if flush_interval is not None:
+        event_log.flush_interval = flush_interval
+    if sinks is not None:
+        event_log.sinks = list(sinks)
+    if level is not None:
+        event_log.level = level
+    return event_log
@@ -0,0 +1,132 @@
+import heapq
+
+from py_trees.common import Status
+
+from compiled_tree import CompiledTree
+
+
+# ----- Eventos Agendados -----
+class ScheduledEvent:
+    """Evento na fila do EventScheduler: callback(*args) no instante 'time' (ms da simulação)."""
+
+    __slots__ = ('time', 'seq', 'callback', 'args', 'cancelled')
+
+    def __init__(self, time, seq, callback, args):
+        self.time = time
+        self.seq = seq  # Desempate: eventos do mesmo instante saem na ordem de agendamento
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.time, self.seq) < (other.time, other.seq)
+
+
+class EventScheduler:
+    """
+    Fila de eventos futuros ordenada pelo tempo da simulação (heap).
+
+    Em vez de cada objeto consultar flags a cada tick para descobrir se algo
+    já aconteceu, quem sabe de antemão quando a coisa acontece agenda um
+    evento (schedule_at / schedule_in) e run_due(), chamado uma vez por tick
+    pelo loop, dispara só os eventos vencidos, na ordem (instante,
+    agendamento). O custo por tick é O(1) quando nada vence.
+    O tempo vem de clock.now(), o mesmo relógio dos avatares; com um relógio
+    de passo fixo os eventos disparam exatamente no tick previsto.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return sum(1 for event in self._heap if not event.cancelled)
+
+    def schedule_at(self, time_ms, callback, *args):
+        """Agenda callback(*args) para o instante time_ms; retorna o ScheduledEvent."""
+        event = ScheduledEvent(time_ms, self._seq, callback, args)
+        self._seq += 1
+        heapq.heappush(self._heap, event)
+        return event
+
+    def schedule_in(self, delay_ms, callback, *args):
+        return self.schedule_at(self.clock.now() + delay_ms, callback, *args)
+
+    def cancel(self, event):
+        # Remoção preguiçosa: o evento fica no heap e é descartado ao sair
+        event.cancelled = True
+
+    @property
+    def next_time(self):
+        """Instante do próximo evento pendente (None se a fila estiver vazia)."""
+        heap = self._heap
+        while heap and heap[0].cancelled:
+            heapq.heappop(heap)
+        return heap[0].time if heap else None
+
+    def run_due(self):
+        """Dispara os eventos com instante <= clock.now(); retorna quantos dispararam."""
+        heap = self._heap
+        if not heap:
+            return 0
+        now = self.clock.now()
+        fired = 0
+        while heap and heap[0].time <= now:
+            event = heapq.heappop(heap)
+            if not event.cancelled:
+                event.callback(*event.args)
+                fired += 1
+        return fired
+
+    def clear(self):
+        self._heap = []
+
+    # ----- Snapshot -----
+    def capture(self):
+        """Eventos pendentes (os próprios objetos, para preservar as referências dos nós)."""
+        return self._seq, tuple(event for event in self._heap if not event.cancelled)
+
+    def restore(self, state):
+        self._seq, events = state
+        for event in events:
+            event.cancelled = False
+        self._heap = list(events)
+        heapq.heapify(self._heap)
+
+
+# ----- Árvores que Dormem -----
+def _preorder(node):
+    nodes = [node]
+    for child in getattr(node, 'children', ()):
+        nodes.extend(_preorder(child))
+    return nodes
+
+
+class SleepingTree:
+    """
+    Tica uma árvore (py_trees ou CompiledTree) só quando ela tem algo a
+    decidir: enquanto algum nó com a propriedade 'sleeping' (ex.:
+    AIScheduledAttack com um golpe agendado) estiver dormindo, tick_once()
+    retorna RUNNING sem percorrer a árvore. O nó acorda quando o seu evento
+    dispara no EventScheduler e a árvore volta a ser ticada no mesmo tick.
+    Durante o sono as condições acima do nó não são reavaliadas: o ataque
+    em andamento não é interrompido.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        behaviours = tree.structure.behaviours if isinstance(tree, CompiledTree) else _preorder(tree)
+        self.sleepers = [behaviour for behaviour in behaviours if hasattr(type(behaviour), 'sleeping')]
+        self.skipped = 0
+
+    @property
+    def sleeping(self):
+        return any(sleeper.sleeping for sleeper in self.sleepers)
+
+    def tick_once(self):
+        for sleeper in self.sleepers:
+            if sleeper.sleeping:
+                self.skipped += 1
+                return Status.RUNNING
+        return self.tree.tick_once()
@@ -1,6 +1,6 @@
 import py_trees
 from py_trees.common import Status
-import pygame
+from event_log import event_log, DEBUG, APPROACH, ATTACK_STARTED, DAMAGE_APPLIED
 
 
 class AICheckDistanceGreaterThan(py_trees.behaviour.Behaviour):
@@ -44,7 +44,7 @@ class AIApproach(py_trees.behaviour.Behaviour):
             self.avatar_b.rect.x -= self.step_pixels
         else:
             self.avatar_b.rect.x += self.step_pixels
-        print(f"AIApproach: avatarB moveu {self.step_pixels} pixels")
+        event_log.emit(DEBUG, APPROACH, avatar=self.avatar_b.name, step=self.step_pixels)
         return Status.SUCCESS
 
 
@@ -61,16 +61,18 @@ class AIAttack(py_trees.behaviour.Behaviour):
             self.avatar_b.is_attacking = True
             self.avatar_b.current_frames = self.avatar_b.attack_frames
             self.avatar_b.current_frame = 0
-            self.avatar_b.last_update = pygame.time.get_ticks()
+            self.avatar_b.last_update = self.avatar_b.clock.now()
             self.avatar_b.has_dealt_damage = False
             self.avatar_b.attack_finished = False
-            print("AIAttack: avatarB iniciou ataque")
+            event_log.emit(DEBUG, ATTACK_STARTED, attacker=self.avatar_b.name, target=self.avatar_a.name)
 
         # Aplica o dano assim que a animação de ataque terminar
         if self.avatar_b.attack_finished and not self.avatar_b.has_dealt_damage:
+            old_hp = self.avatar_a.hp
             self.avatar_a.hp = max(0, self.avatar_a.hp - self.damage)
             self.avatar_b.has_dealt_damage = True
-            print(f"AIAttack: avatarB aplicou {self.damage} de dano em avatarA (HP A: {self.avatar_a.hp})")
+            event_log.emit(DEBUG, DAMAGE_APPLIED, attacker=self.avatar_b.name, target=self.avatar_a.name,
+                           damage=self.damage, old_hp=old_hp, hp=self.avatar_a.hp)
         return Status.SUCCESS
 
 
@@ -81,17 +83,17 @@ def create_ai_tree(avatar_a, avatar_b, threshold_pixels=50, approach_step=50, at
         avatarB se aproxima.
       - Se estiverem próximos (<= threshold), avatarB ataca avatarA.
     """
-    root = py_trees.composites.Selector("AI Root")
+    root = py_trees.composites.Selector("AI Root", memory=False)
 
     # Sequência de aproximação
-    approach_seq = py_trees.composites.Sequence("ApproachSeq")
+    approach_seq = py_trees.composites.Sequence("ApproachSeq", memory=True)
     approach_seq.add_children([
         AICheckDistanceGreaterThan(avatar_a, avatar_b, threshold_pixels),
         AIApproach(avatar_a, avatar_b, approach_step)
     ])
 
     # Sequência de ataque
-    attack_seq = py_trees.composites.Sequence("AttackSeq")
+    attack_seq = py_trees.composites.Sequence("AttackSeq", memory=True)
     attack_seq.add_children([
         AICheckDistanceLessOrEqual(avatar_a, avatar_b, threshold_pixels),
         AIAttack(avatar_a, avatar_b, attack_damage)
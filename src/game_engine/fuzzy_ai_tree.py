@@ -0,0 +1,353 @@
+import py_trees
+from py_trees.common import Status
+from fuzzy_avatar import SCREEN_WIDTH, MAX_ANGER
+from event_log import event_log, DEBUG, ATTACK_STARTED, DAMAGE_APPLIED
+
+
+# ----- Ações compartilhadas pelos nós (individuais e em lote) -----
+def approach_target(target, controlled, step_pixels):
+    """Move 'controlled' um passo em direção a 'target' (passo dobrado em berserk)."""
+    controlled.is_attacking = False
+    controlled.current_frames = controlled.run_frames
+
+    # Em modo berserk, aproximação mais rápida
+    actual_step = step_pixels * 2 if controlled.berserk_mode else step_pixels
+
+    if controlled.rect.centerx > target.rect.centerx:
+        controlled.rect.x -= actual_step
+        controlled.facing_right = False
+    else:
+        controlled.rect.x += actual_step
+        controlled.facing_right = True
+
+    controlled.is_moving = True
+    controlled.rect.left = max(0, controlled.rect.left)
+    controlled.rect.right = min(SCREEN_WIDTH, controlled.rect.right)
+    if controlled.spatial_index is not None:
+        controlled.spatial_index.update(controlled)
+
+
+def face_target(target, controlled):
+    controlled.facing_right = controlled.rect.centerx <= target.rect.centerx
+
+
+def start_attack(target, controlled, berserk=False):
+    """Inicia a animação de ataque de 'controlled'."""
+    controlled.is_attacking = True
+    controlled.current_frames = controlled.attack_frames
+    controlled.current_frame = 0
+    controlled.last_update = controlled.clock.now()
+    controlled.has_dealt_damage = False
+    event_log.emit(DEBUG, ATTACK_STARTED, attacker=controlled.name, target=target.name, berserk=berserk)
+
+
+def land_attack(target, controlled, berserk=False):
+    """Aplica em 'target' o dano fuzzy do ataque que 'controlled' acabou de concluir."""
+    if berserk:
+        # Calcula dano berserk (sempre o maior possível)
+        controlled.anger = MAX_ANGER  # Força anger máximo para o cálculo
+    damage_amount = controlled.calculate_fuzzy_damage()
+
+    # Aplica o dano
+    old_hp = target.hp
+    target.receive_damage(damage_amount)
+    controlled.has_dealt_damage = True
+    if target.hp <= 0 and target.spatial_index is not None:
+        # Derrotado: sai do índice para não ser escolhido como alvo por mais ninguém
+        target.spatial_index.remove(target)
+
+    # Registra ataque bem-sucedido
+    controlled.successful_attack()
+
+    event_log.emit(DEBUG, DAMAGE_APPLIED, attacker=controlled.name, target=target.name,
+                   damage=damage_amount, old_hp=old_hp, hp=target.hp, berserk=berserk)
+    return damage_amount
+
+
+# ----- Nós de Comportamento para a IA com Lógica Fuzzy -----
+class AITargetBehaviour(py_trees.behaviour.Behaviour):
+    """
+    Nó que age sobre um alvo: o avatar fixo 'target' ou, com target=None,
+    o controlled.target escolhido a cada tick por AIAcquireTarget.
+    """
+
+    def __init__(self, name, target, controlled):
+        super().__init__(name)
+        self.fixed_target = target
+        self.controlled = controlled
+
+    @property
+    def target(self):
+        return self.fixed_target if self.fixed_target is not None else self.controlled.target
+
+
+class AIAcquireTarget(py_trees.behaviour.Behaviour):
+    """Escolhe o inimigo mais próximo (SpatialIndex); falha se não houver nenhum."""
+
+    def __init__(self, controlled, spatial_index):
+        super().__init__(f"AcquireTarget {controlled.name}")
+        self.controlled = controlled
+        self.spatial_index = spatial_index
+
+    def update(self):
+        self.controlled.target = self.spatial_index.nearest_enemy(self.controlled)
+        if self.controlled.target is None:
+            return Status.FAILURE
+        return Status.SUCCESS
+
+
+class AICheckDistanceGreaterThan(AITargetBehaviour):
+    def __init__(self, target, controlled, attack_threshold):
+        super().__init__(f"CheckDist > {attack_threshold}", target, controlled)
+        self.attack_threshold = attack_threshold
+
+    def update(self):
+        pixel_distance = abs(self.target.rect.centerx - self.controlled.rect.centerx)
+        if pixel_distance > self.attack_threshold:
+            return Status.SUCCESS
+        return Status.FAILURE
+
+
+class AICheckDistanceLessOrEqual(AITargetBehaviour):
+    def __init__(self, target, controlled, attack_threshold):
+        super().__init__(f"CheckDist <= {attack_threshold}", target, controlled)
+        self.attack_threshold = attack_threshold
+
+    def update(self):
+        pixel_distance = abs(self.target.rect.centerx - self.controlled.rect.centerx)
+        if pixel_distance <= self.attack_threshold:
+            return Status.SUCCESS
+        return Status.FAILURE
+
+
+class AICheckBerserkMode(py_trees.behaviour.Behaviour):
+    def __init__(self, avatar):
+        super().__init__(f"CheckBerserk {avatar.name}")
+        self.avatar = avatar
+
+    def update(self):
+        if self.avatar.berserk_mode:
+            return Status.SUCCESS
+        return Status.FAILURE
+
+
+class AIApproach(AITargetBehaviour):
+    def __init__(self, target, controlled, step_pixels):
+        super().__init__("AIApproach", target, controlled)
+        self.step_pixels = step_pixels
+
+    def update(self):
+        approach_target(self.target, self.controlled, self.step_pixels)
+        return Status.SUCCESS
+
+
+class AIAttack(AITargetBehaviour):
+    state_fields = ('attack_in_progress',)  # Estado salvo por snapshot.SimulationState
+
+    def __init__(self, target, controlled):
+        super().__init__("AIAttack", target, controlled)
+        self.attack_in_progress = False
+
+    def update(self):
+        face_target(self.target, self.controlled)
+
+        # Iniciando um novo ataque
+        if not self.controlled.is_attacking and not self.attack_in_progress:
+            start_attack(self.target, self.controlled)
+            self.attack_in_progress = True
+            return Status.RUNNING
+
+        # Durante o ataque
+        if self.controlled.is_attacking:
+            return Status.RUNNING
+
+        # Quando o ataque terminar (animation update vai definir attack_finished como True)
+        if self.attack_in_progress and self.controlled.attack_finished and not self.controlled.has_dealt_damage:
+            self.attack_in_progress = False
+            land_attack(self.target, self.controlled)
+            return Status.SUCCESS
+
+        return Status.RUNNING
+
+
+class AIBerserkAttack(AITargetBehaviour):
+    state_fields = ('attack_in_progress', 'attack_count')
+
+    def __init__(self, target, controlled):
+        super().__init__("AIBerserkAttack", target, controlled)
+        self.attack_in_progress = False
+        self.attack_count = 0
+        self.max_attacks = 3  # Número de ataques consecutivos em modo berserk
+
+    def update(self):
+        face_target(self.target, self.controlled)
+
+        # Iniciando um novo ataque
+        if not self.controlled.is_attacking and not self.attack_in_progress:
+            start_attack(self.target, self.controlled, berserk=True)
+            self.attack_in_progress = True
+            return Status.RUNNING
+
+        # Durante o ataque
+        if self.controlled.is_attacking:
+            return Status.RUNNING
+
+        # Quando o ataque terminar
+        if self.attack_in_progress and self.controlled.attack_finished and not self.controlled.has_dealt_damage:
+            self.attack_in_progress = False
+            land_attack(self.target, self.controlled, berserk=True)
+
+            # Incrementa o contador de ataques
+            self.attack_count += 1
+
+            if self.attack_count >= self.max_attacks:
+                self.attack_count = 0
+                return Status.SUCCESS
+            else:
+                # Reinicia o ataque para o próximo golpe na sequência berserk
+                return Status.RUNNING
+
+        return Status.RUNNING
+
+
+class AIScheduledAttack(AITargetBehaviour):
+    """
+    Ataque orientado a eventos, no lugar de AIAttack / AIBerserkAttack.
+
+    Ao iniciar o ataque o golpe é agendado no EventScheduler para o instante
+    em que a animação termina (FuzzyAvatar.attack_end_time) e o dano é
+    resolvido quando o evento dispara, sem consultar is_attacking,
+    attack_finished e has_dealt_damage a cada tick. Com o golpe pendente o
+    nó está dormindo ('sleeping'): só responde RUNNING, e SleepingTree nem
+    tica a árvore. Com berserk=True dá max_attacks golpes seguidos.
+    Se a árvore interromper o nó (ex.: entrou em berserk no meio do golpe),
+    o golpe pendente é cancelado, como no ataque por consulta, em que ele
+    nunca chega a causar dano; o golpe de um atacante derrotado não acerta.
+    Se o alvo for derrotado por outro golpe, o nó acorda e cancela o golpe
+    pendente; o resto desse golpe é acompanhado por consulta, como em
+    AIAttack, e ao fim da animação ele acerta o alvo atual (ex.: o escolhido
+    por AIAcquireTarget). Um golpe nunca acerta um alvo já derrotado.
+    """
+
+    state_fields = ('pending_hit', 'hit_landed', 'attack_count', 'retargeting')
+
+    def __init__(self, target, controlled, scheduler, berserk=False, max_attacks=None):
+        super().__init__("AIBerserkAttack" if berserk else "AIAttack", target, controlled)
+        self.scheduler = scheduler
+        self.berserk = berserk
+        self.max_attacks = max_attacks if max_attacks is not None else (3 if berserk else 1)
+        self.pending_hit = None  # ScheduledEvent do golpe em andamento
+        self.hit_landed = False
+        self.attack_count = 0
+        self.retargeting = False  # Golpe cujo alvo foi derrotado, terminado por consulta
+
+    @property
+    def sleeping(self):
+        # Acorda quando o alvo do golpe pendente é derrotado
+        return self.pending_hit is not None and self.pending_hit.args[0].hp > 0
+
+    def update(self):
+        face_target(self.target, self.controlled)
+        if self.pending_hit is not None:
+            if self.pending_hit.args[0].hp > 0:
+                return Status.RUNNING
+            # Alvo derrotado no meio do golpe: cancela e termina o golpe por consulta
+            self.scheduler.cancel(self.pending_hit)
+            self.pending_hit = None
+            self.retargeting = True
+
+        if self.retargeting:
+            if self.controlled.is_attacking:
+                return Status.RUNNING
+            self.retargeting = False
+            if self.controlled.attack_finished and not self.controlled.has_dealt_damage:
+                self._resolve_hit(self.target)
+
+        # O golpe acertou (evento disparado neste tick)
+        if self.hit_landed:
+            self.hit_landed = False
+            self.attack_count += 1
+            if self.attack_count >= self.max_attacks:
+                self.attack_count = 0
+                return Status.SUCCESS
+            return Status.RUNNING
+
+        # Inicia um novo ataque assim que a animação anterior terminar
+        if not self.controlled.is_attacking:
+            target = self.target
+            start_attack(target, self.controlled, berserk=self.berserk)
+            self.pending_hit = self.scheduler.schedule_at(self.controlled.attack_end_time(),
+                                                          self._resolve_hit, target)
+        return Status.RUNNING
+
+    def terminate(self, new_status):
+        if new_status == Status.INVALID:
+            if self.pending_hit is not None:
+                self.scheduler.cancel(self.pending_hit)
+                self.pending_hit = None
+            self.hit_landed = False
+            self.attack_count = 0
+            self.retargeting = False
+
+    def _resolve_hit(self, target):
+        self.pending_hit = None
+        if self.controlled.hp <= 0 or target.hp <= 0:
+            return
+        land_attack(target, self.controlled, berserk=self.berserk)
+        self.hit_landed = True
+
+
+def create_fuzzy_ai_tree(target, controlled, attack_threshold=40, approach_step=1, scheduler=None):
+    """
+    Árvore do duelo; com target=None os nós usam controlled.target (ver
+    create_melee_ai_tree). Com um EventScheduler os ataques são
+    AIScheduledAttack (golpes por evento) em vez de consultar a animação.
+    """
+    if scheduler is not None:
+        berserk_attack = AIScheduledAttack(target, controlled, scheduler, berserk=True)
+        normal_attack = AIScheduledAttack(target, controlled, scheduler)
+    else:
+        berserk_attack = AIBerserkAttack(target, controlled)
+        normal_attack = AIAttack(target, controlled)
+
+    root = py_trees.composites.Selector("AI Root", memory=False)
+
+    approach_seq = py_trees.composites.Sequence("ApproachSeq", memory=False)
+    approach_seq.add_children([
+        AICheckDistanceGreaterThan(target, controlled, attack_threshold),
+        AIApproach(target, controlled, approach_step)
+    ])
+
+    attack_selector = py_trees.composites.Selector("AttackSelector", memory=False)
+
+    # Ramo de ataque berserk
+    berserk_seq = py_trees.composites.Sequence("BerserkSeq", memory=False)
+    berserk_seq.add_children([
+        AICheckBerserkMode(controlled),
+        berserk_attack
+    ])
+
+    # Ramo de ataque normal
+    normal_attack_seq = py_trees.composites.Sequence("NormalAttackSeq", memory=False)
+    normal_attack_seq.add_children([
+        AICheckDistanceLessOrEqual(target, controlled, attack_threshold),
+        normal_attack
+    ])
+
+    attack_selector.add_children([berserk_seq, normal_attack_seq])
+
+    root.add_children([approach_seq, attack_selector])
+    return root
+
+
+def create_melee_ai_tree(controlled, spatial_index, attack_threshold=40, approach_step=1, scheduler=None):
+    """
+    Árvore para batalhas com várias equipes: a cada tick escolhe o inimigo
+    mais próximo pelo índice espacial e segue a árvore do duelo contra ele.
+    """
+    root = py_trees.composites.Sequence("Melee Root", memory=False)
+    root.add_children([
+        AIAcquireTarget(controlled, spatial_index),
+        create_fuzzy_ai_tree(None, controlled, attack_threshold, approach_step, scheduler)
+    ])
+    return root
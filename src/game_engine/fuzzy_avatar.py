@@ -0,0 +1,457 @@
+import math
+import os
+import struct
+import pygame
+from fuzzy_damage import get_damage_controller
+from sim_clock import RealTimeClock
+from assets import get_asset_manager, SPRITES_DIR
+from text_cache import render_text
+from event_log import (event_log, DEBUG, ATTACK_FINISHED, BERSERK_ENTERED, BERSERK_EXITED,
+                       DAMAGE_RECEIVED)
+
+SCREEN_WIDTH = 1020
+SCREEN_HEIGHT = 680
+text_color = (255, 255, 255)
+
+_png_size_cache = {}
+
+# Teto da raiva (fim do universo de raiva do sistema fuzzy)
+MAX_ANGER = 15
+
+# Ganhos de raiva e limiares do modo berserk (valores originais do jogo).
+# Cada avatar pode receber outros valores em 'anger_params' (ver tuning.py)
+ANGER_PARAMETERS = {
+    'critical_hp_anger_gain': 0.02,  # Por tick com HP < 30%
+    'low_hp_anger_gain': 0.01,  # Por tick com HP < 50%
+    'damage_anger_gain': 2,  # Multiplica a fração do HP máximo perdida no último golpe
+    'hit_streak_anger_gain': 0.05,  # Por acerto consecutivo (a partir de 3)
+    'miss_streak_anger_gain': 0.02,  # Por erro consecutivo (a partir de 4)
+    'anger_decay': 0.005,  # Decaimento natural por tick
+    'heavy_hit_anger': 1.5,  # Ao receber mais de 50 de dano
+    'medium_hit_anger': 0.8,  # Ao receber mais de 30 de dano
+    'light_hit_anger': 0.4,  # Ao receber até 30 de dano
+    'hit_streak_bonus_anger': 0.3,  # Ao acertar o 3º golpe seguido em diante
+    'miss_streak_bonus_anger': 0.5,  # Ao errar o 3º golpe seguido em diante
+    'berserk_enter_anger': 10,  # Entra em berserk com raiva >= este valor
+    'berserk_exit_anger': 5,  # Sai do berserk com raiva < este valor
+}
+
+
+def _png_sizes(folder_path):
+    # Lê apenas o cabeçalho IHDR de cada PNG (largura/altura), sem decodificar
+    if folder_path not in _png_size_cache:
+        sizes = []
+        for file_name in sorted(os.listdir(folder_path)):
+            if file_name.lower().endswith('.png'):
+                with open(os.path.join(folder_path, file_name), 'rb') as png:
+                    sizes.append(struct.unpack('>II', png.read(24)[16:24]))
+        _png_size_cache[folder_path] = sizes
+    return _png_size_cache[folder_path]
+
+
+class HeadlessFrame:
+    """Substituto de pygame.Surface para avatares sem renderização."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def get_size(self):
+        return self.width, self.height
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        for attribute, value in kwargs.items():
+            setattr(rect, attribute, value)
+        return rect
+
+
+# ----- Classe Avatar Estendida com Lógica Fuzzy -----
+class FuzzyAvatar:
+    def __init__(self, name, x, y, left_key, right_key, attack_key=None,
+                 idle_folder="Idle", run_folder="Run",
+                 scale=1.0, width=None, height=None, text_offset=-20,
+                 health_bar_offset=-10, damage_table=None, headless=False,
+                 clock=None, anger_params=None):
+        self.name = name
+        self.headless = headless  # Sem sprites/fontes: apenas a lógica do avatar
+        # Relógio da simulação (tempo real do pygame por padrão)
+        self.clock = clock if clock is not None else RealTimeClock()
+        self.scale = scale
+        self.custom_width = width
+        self.custom_height = height
+        self.text_offset = text_offset
+        self.health_bar_offset = health_bar_offset
+
+        # Barra de vida
+        self.max_hp = 500
+        self.hp = 500
+
+        # Define o dano de ataque padrão do avatar
+        self.attack_damage = 10
+
+        # Estado emocional para lógica fuzzy
+        self.anger = 0  # Nível de raiva (0-15)
+        self.berserk_mode = False
+        self.damage_controller = get_damage_controller()  # Compartilhado entre avatares
+        self.damage_table = damage_table  # CompiledFuzzyDamage opcional
+        # Ganhos de raiva e limiares do berserk (ANGER_PARAMETERS, com 'anger_params' por cima)
+        for parameter, value in ANGER_PARAMETERS.items():
+            setattr(self, parameter, value)
+        for parameter, value in (anger_params or {}).items():
+            if parameter not in ANGER_PARAMETERS:
+                raise ValueError(f"Parâmetro de raiva desconhecido: {parameter}")
+            setattr(self, parameter, value)
+
+        # Contadores de estados emocionais
+        self.times_hit = 0
+        self.successful_attacks = 0
+        self.consecutive_hits = 0
+        self.consecutive_misses = 0
+        self.last_damage_received = 0
+
+        self.attack_key = attack_key
+        self.idle_frames = self.load_animation_frames(idle_folder)
+        self.run_frames = self.load_animation_frames(run_folder)
+        self.attack_frames = self.load_animation_frames("Attack")
+        # Variações espelhadas/berserk de todos os quadros, criadas uma vez e
+        # compartilhadas por avatares com o mesmo conjunto de sprites
+        self.frame_cache = None if headless else self.sprite_set().frame_cache
+
+        # Estado e animação
+        self.current_frames = self.idle_frames
+        self.current_frame = 0
+        self.facing_right = True  # Ajusta o flip da imagem
+        self.is_attacking = False
+        self.is_moving = False
+        self.rect = self.idle_frames[0].get_rect(center=(x, y))
+        self.animation_speed = 120  # ms entre frames
+        self.animation_speeds = {}  # Velocidade própria por animação, ex.: {'run_frames': 90}
+        self.animation_scheduler = None  # AnimationScheduler que avança os quadros (None = update())
+        self.scheduled_frames = None  # Animação para a qual o próximo quadro foi agendado
+        self.frame_due = None  # Instante do quadro agendado
+        self.last_update = self.clock.now()
+        self.left_key = left_key
+        self.right_key = right_key
+        self.text_surface = None if headless else render_text(self.name, text_color)
+        self.has_dealt_damage = False
+        self.attack_finished = False
+
+        # Combate com várias equipes (ver spatial_index.SpatialIndex)
+        self.team = None
+        self.target = None  # Inimigo atual, escolhido por AIAcquireTarget
+        self.spatial_index = None
+
+    def load_animation_frames(self, folder):
+        folder_path = os.path.join(SPRITES_DIR, self.name, folder)
+        if self.headless:
+            return self.load_headless_frames(folder_path)
+
+        return self.sprite_set().animation(folder)
+
+    def sprite_set(self):
+        # Atlas compartilhado do conjunto de sprites no tamanho deste avatar
+        size = (self.custom_width, self.custom_height) if self.custom_width and self.custom_height else None
+        return get_asset_manager().get_sprite_set(self.name, self.scale, size)
+
+    def load_headless_frames(self, folder_path):
+        # Mesma quantidade e tamanho de quadros, sem decodificar as imagens
+        if self.custom_width and self.custom_height:
+            return [HeadlessFrame(self.custom_width, self.custom_height)
+                    for _ in range(len(_png_sizes(folder_path)))]
+        return [HeadlessFrame(int(width * self.scale), int(height * self.scale))
+                for width, height in _png_sizes(folder_path)]
+
+    def update(self, keys):
+        # Controle manual (não é o caso aqui)
+        if self.left_key is not None and self.right_key is not None:
+            now = self.clock.now()
+            if not self.is_attacking and self.attack_key is not None and keys[self.attack_key]:
+                self.is_attacking = True
+                self.current_frames = self.attack_frames
+                self.current_frame = 0
+                self.last_update = now
+                self.has_dealt_damage = False
+                self.attack_finished = False
+
+            if self.is_attacking:
+                if now - self.last_update > self.animation_speed:
+                    self.current_frame += 1
+                    self.last_update = now
+                    if self.current_frame >= len(self.attack_frames):
+                        self.is_attacking = False
+                        self.current_frames = self.idle_frames
+                        self.current_frame = 0
+                        self.attack_finished = True
+            else:
+                move_x = 0
+                if keys[self.left_key]:
+                    move_x = -2
+                    self.facing_right = False
+                    new_frames = self.run_frames
+                elif keys[self.right_key]:
+                    move_x = 2
+                    self.facing_right = True
+                    new_frames = self.run_frames
+                else:
+                    new_frames = self.idle_frames
+
+                self.rect.x += move_x
+                self.rect.left = max(0, self.rect.left)
+                self.rect.right = min(SCREEN_WIDTH, self.rect.right)
+
+                if new_frames != self.current_frames:
+                    self.current_frames = new_frames
+                    self.current_frame = 0
+
+                if now - self.last_update > self.animation_speed:
+                    self.current_frame = (self.current_frame + 1) % len(self.current_frames)
+                    self.last_update = now
+        else:
+            # Controle autônomo (IA)
+            if not self.is_attacking:
+                new_frames = self.run_frames if self.is_moving else self.idle_frames
+                if new_frames is not self.current_frames:
+                    self.current_frames = new_frames
+                    self.current_frame = 0
+
+            if self.animation_scheduler is None:
+                now = self.clock.now()
+                if now - self.last_update > self.frame_time():
+                    self.advance_frames(now)
+            elif self.current_frames is not self.scheduled_frames:
+                # Troca de animação: o próximo quadro pode vencer em outro instante
+                self.animation_scheduler.reschedule(self)
+
+            self.is_moving = False
+
+            # Atualização dos estados emocionais
+            self.update_anger()
+            self.update_berserk_mode()
+
+    def frame_time(self, frames=None):
+        """Duração (ms) de cada quadro da animação 'frames' (padrão: a atual)."""
+        if self.animation_speeds:
+            frames = self.current_frames if frames is None else frames
+            for name, speed in self.animation_speeds.items():
+                if getattr(self, name) is frames:
+                    return speed
+        return self.animation_speed
+
+    def next_frame_time(self):
+        """Instante (ms) em que vence o próximo quadro da animação atual."""
+        return self.last_update + self.frame_time() + 1
+
+    def advance_frames(self, now):
+        """
+        Avança a animação atual se o quadro venceu (mais de frame_time() ms
+        desde o último avanço). Se o passo de tempo pulou vários quadros,
+        avança todos de uma vez; um ataque que chega ao fim volta ao idle.
+        """
+        frames = (now - self.last_update) // (self.frame_time() + 1)
+        if frames <= 0:
+            return
+        self.last_update = now
+        if self.is_attacking:
+            self.current_frame += frames
+            if self.current_frame >= len(self.attack_frames):
+                self.is_attacking = False
+                self.current_frames = self.idle_frames
+                self.current_frame = 0
+                self.attack_finished = True
+                event_log.emit(DEBUG, ATTACK_FINISHED, avatar=self.name)
+        else:
+            self.current_frame = (self.current_frame + frames) % len(self.current_frames)
+
+    def attack_end_time(self, start=None):
+        """
+        Instante (ms) em que termina a animação de ataque iniciada em 'start'
+        (padrão: agora): os quadros avançam no primeiro tick em que vencem,
+        como em advance_frames().
+        """
+        time_ms = self.clock.now() if start is None else start
+        frame_time = self.frame_time(self.attack_frames) + 1
+        remaining = len(self.attack_frames)
+        while remaining > 0:
+            next_time = self.clock.align(time_ms + frame_time)
+            remaining -= (next_time - time_ms) // frame_time
+            time_ms = next_time
+        return time_ms
+
+    def update_anger(self):
+        # A raiva aumenta com base em vários fatores
+
+        # Fator 1: HP baixo aumenta a raiva
+        hp_percentage = (self.hp / self.max_hp) * 100
+        if hp_percentage < 30:
+            self.anger = min(MAX_ANGER, self.anger + self.critical_hp_anger_gain)  # Aumento gradual quando HP está crítico
+        elif hp_percentage < 50:
+            self.anger = min(MAX_ANGER, self.anger + self.low_hp_anger_gain)  # Aumento menor quando HP está baixo
+
+        # Fator 2: Sofrer dano recentemente aumenta a raiva
+        if self.last_damage_received > 0:
+            anger_increase = (self.last_damage_received / self.max_hp) * self.damage_anger_gain  # Dano proporcional
+            self.anger = min(MAX_ANGER, self.anger + anger_increase)
+            self.last_damage_received = max(0, self.last_damage_received - 0.2)  # Decai com o tempo
+
+        # Fator 3: Ataques sucessivos aumentam a raiva (adrenalina)
+        if self.consecutive_hits > 2:
+            self.anger = min(MAX_ANGER, self.anger + self.hit_streak_anger_gain * self.consecutive_hits)
+
+        # Fator 4: Tempo sem acertar ataques aumenta a frustração
+        if self.consecutive_misses > 3:
+            self.anger = min(MAX_ANGER, self.anger + self.miss_streak_anger_gain * self.consecutive_misses)
+
+        # Decaimento natural da raiva ao longo do tempo
+        self.anger = max(0, self.anger - self.anger_decay)
+
+    def update_berserk_mode(self):
+        # Entra em modo berserk se a raiva for alta
+        if self.anger >= self.berserk_enter_anger:
+            if not self.berserk_mode:
+                event_log.emit(DEBUG, BERSERK_ENTERED, avatar=self.name, anger=self.anger)
+                self.berserk_mode = True
+        # Sai do modo berserk se a raiva diminuir significativamente
+        elif self.anger < self.berserk_exit_anger and self.berserk_mode:
+            event_log.emit(DEBUG, BERSERK_EXITED, avatar=self.name, anger=self.anger)
+            self.berserk_mode = False
+
+    def calculate_fuzzy_damage(self, base_damage=None):
+        # Retorna dano calculado com lógica fuzzy
+        hp_percentage = (self.hp / self.max_hp) * 100
+
+        # Modo compilado: consulta a tabela pré-amostrada
+        if self.damage_table is not None:
+            return int(self.damage_table.compute(self.anger, hp_percentage))
+
+        # Computar o resultado fuzzy
+        try:
+            damage = self.damage_controller.compute(self.anger, hp_percentage)
+
+            # Converte para inteiro para facilitar a exibição
+            return int(damage)
+        except:
+            # Fallback se o sistema fuzzy falhar
+            if self.berserk_mode:
+                return 60 if base_damage is None else base_damage * 2
+            else:
+                return 20 if base_damage is None else base_damage
+
+    def receive_damage(self, damage_amount):
+        """Quando o avatar recebe dano"""
+        old_hp = self.hp
+        self.hp = max(0, self.hp - damage_amount)
+        self.times_hit += 1
+        self.consecutive_misses = 0
+        self.last_damage_received = damage_amount
+        event_log.emit(DEBUG, DAMAGE_RECEIVED, avatar=self.name, damage=damage_amount, old_hp=old_hp, hp=self.hp)
+
+        # Aumento significativo de raiva ao receber muito dano
+        if damage_amount > 50:
+            self.anger = min(MAX_ANGER, self.anger + self.heavy_hit_anger)
+        elif damage_amount > 30:
+            self.anger = min(MAX_ANGER, self.anger + self.medium_hit_anger)
+        else:
+            self.anger = min(MAX_ANGER, self.anger + self.light_hit_anger)
+
+    def successful_attack(self):
+        """Quando o avatar acerta um ataque"""
+        self.successful_attacks += 1
+        self.consecutive_hits += 1
+        self.consecutive_misses = 0
+
+        # Aumento de raiva/confiança ao acertar golpes sucessivos
+        if self.consecutive_hits > 2:
+            self.anger = min(MAX_ANGER, self.anger + self.hit_streak_bonus_anger)
+
+    def missed_attack(self):
+        """Quando o avatar erra um ataque"""
+        self.consecutive_hits = 0
+        self.consecutive_misses += 1
+
+        # Aumento de frustração/raiva ao errar
+        if self.consecutive_misses > 2:
+            self.anger = min(MAX_ANGER, self.anger + self.miss_streak_bonus_anger)
+
+    def draw_health_bar(self, screen):
+        """Desenha barra de vida, HP e raiva; retorna os retângulos desenhados."""
+        bar_width = 60
+        bar_height = 10 / math.pi
+        fill = (self.hp / self.max_hp) * bar_width
+        bar_x = self.rect.centerx - bar_width // 2
+        bar_y = self.rect.top + self.health_bar_offset
+
+        background_bar = pygame.Rect(bar_x, bar_y, bar_width, bar_height)
+        rects = [pygame.draw.rect(screen, (60, 60, 60), background_bar)]
+        health_bar = pygame.Rect(bar_x, bar_y, fill, bar_height)
+        rects.append(pygame.draw.rect(screen, (255, 0, 0), health_bar))
+        # Textos vêm do cache: só são rasterizados quando o valor exibido muda
+        hp_text = render_text(f"HP: {self.hp}", text_color)
+        text_rect = hp_text.get_rect(center=(self.rect.centerx, bar_y - 10))
+        rects.append(screen.blit(hp_text, text_rect))
+
+        # Desenhar indicador de raiva
+        anger_text = render_text(f"Raiva: {self.anger:.1f}",
+                                 (255, 165, 0) if not self.berserk_mode else (255, 0, 0))
+        anger_rect = anger_text.get_rect(center=(self.rect.centerx, bar_y - 30))
+        rects.append(screen.blit(anger_text, anger_rect))
+
+        # Indicador visual de modo berserk
+        if self.berserk_mode:
+            berserk_text = render_text("BERSERK!", (255, 0, 0))
+            berserk_rect = berserk_text.get_rect(center=(self.rect.centerx, bar_y - 50))
+            rects.append(screen.blit(berserk_text, berserk_rect))
+        return rects
+
+    def draw(self, screen):
+        """Desenha o avatar com nome e barra de vida; retorna os retângulos desenhados."""
+        # Ajuste de flip para que cada avatar use seu lado padrão:
+        flipped = False
+        if self.name == "avatarA":
+            flipped = not self.facing_right
+        elif self.name == "avatarB":
+            flipped = self.facing_right
+
+        # Quadro já espelhado e, em modo berserk, com o brilho vermelho
+        current_image = self.frame_cache.get(self.current_frames, self.current_frame,
+                                             flipped, self.berserk_mode)
+        rects = [screen.blit(current_image, self.rect)]
+
+        text_position = (self.rect.centerx - (self.text_surface.get_width() // 2),
+                         self.rect.top + self.text_offset)
+        rects.append(screen.blit(self.text_surface, text_position))
+        rects.extend(self.draw_health_bar(screen))
+        return rects
+
+
+# ----- Criação dos Avatares do Duelo -----
+# Parâmetros de cada conjunto de sprites
+AVATAR_CONFIGS = {
+    "avatarA": dict(y=SCREEN_HEIGHT // 2.2, idle_folder="Idle", run_folder="Run", scale=2.0,
+                    text_offset=70, health_bar_offset=50),
+    "avatarB": dict(y=SCREEN_HEIGHT // 2, idle_folder="Idle", run_folder="walk", scale=2.0,
+                    width=260, height=160, text_offset=10, health_bar_offset=-10),
+}
+
+
+def create_avatar(name, x, damage_table=None, headless=False, clock=None, anger_params=None):
+    """Cria um avatar controlado pela IA com o conjunto de sprites 'name' (avatarA ou avatarB)."""
+    return FuzzyAvatar(
+        name=name,
+        x=x,
+        left_key=None,
+        right_key=None,
+        attack_key=None,
+        damage_table=damage_table,
+        headless=headless,
+        clock=clock,
+        anger_params=anger_params,
+        **AVATAR_CONFIGS[name]
+    )
+
+
+def create_duel_avatars(damage_table=None, headless=False, clock=None, anger_params=None):
+    """Cria o par de avatares do duelo (avatarA à esquerda, avatarB à direita)."""
+    avatarA = create_avatar("avatarA", SCREEN_WIDTH // 2 - 300, damage_table, headless, clock, anger_params)
+    avatarB = create_avatar("avatarB", SCREEN_WIDTH // 2 + 300, damage_table, headless, clock, anger_params)
+    return avatarA, avatarB
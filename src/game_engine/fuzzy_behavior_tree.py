@@ -1,8 +1,9 @@
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
 import py_trees
 from py_trees.common import Status
+from fuzzy_vectorized import MamdaniEvaluator, trimf
+from fuzzy_damage import QuantizedLRUCache
+from event_log import event_log, DEBUG, APPROACH, DAMAGE_APPLIED
 
 
 ##############################################################################
@@ -20,28 +21,86 @@ class GameState:
 ##############################################################################
 #                          SISTEMA FUZZY PARA DANOS                          #
 ##############################################################################
-# Definindo as variáveis fuzzy
-anger = ctrl.Antecedent(np.arange(0, 16, 0.5), 'anger')
-damage = ctrl.Consequent(np.arange(10, 41, 1), 'damage')
+# Universos e funções de pertinência (triângulos [a, b, c])
+ANGER_UNIVERSE = np.arange(0, 16, 0.5)
+DAMAGE_UNIVERSE = np.arange(10, 41, 1)
+ANGER_TERMS = {'low': [0, 0, 5], 'medium': [0, 5, 10], 'high': [5, 10, 10]}
+DAMAGE_TERMS = {'low': [10, 10, 25], 'medium': [10, 25, 40], 'high': [25, 40, 40]}
 
-# Funções de pertinência para a raiva
-anger['low'] = fuzz.trimf(anger.universe, [0, 0, 5])
-anger['medium'] = fuzz.trimf(anger.universe, [0, 5, 10])
-anger['high'] = fuzz.trimf(anger.universe, [5, 10, 10])
+# Tabela de regras: raiva -> dano
+DAMAGE_RULES = [('low', 'low'), ('medium', 'medium'), ('high', 'high')]
 
-# Funções de pertinência para o dano
-damage['low'] = fuzz.trimf(damage.universe, [10, 10, 25])
-damage['medium'] = fuzz.trimf(damage.universe, [10, 25, 40])
-damage['high'] = fuzz.trimf(damage.universe, [25, 40, 40])
 
-# Regras fuzzy
-rule1 = ctrl.Rule(anger['low'], damage['low'])
-rule2 = ctrl.Rule(anger['medium'], damage['medium'])
-rule3 = ctrl.Rule(anger['high'], damage['high'])
+def create_berserk_damage_system():
+    """Sistema skfuzzy (raiva -> dano) do ataque berserk; o skfuzzy só é importado aqui."""
+    from skfuzzy import control as ctrl
 
-# Sistema de controle e simulação
-damage_ctrl = ctrl.ControlSystem([rule1, rule2, rule3])
-damage_sim = ctrl.ControlSystemSimulation(damage_ctrl)
+    # Definindo as variáveis fuzzy
+    anger = ctrl.Antecedent(ANGER_UNIVERSE, 'anger')
+    damage = ctrl.Consequent(DAMAGE_UNIVERSE, 'damage')
+
+    # Funções de pertinência para a raiva
+    for label, abc in ANGER_TERMS.items():
+        anger[label] = trimf(anger.universe, abc)
+
+    # Funções de pertinência para o dano
+    for label, abc in DAMAGE_TERMS.items():
+        damage[label] = trimf(damage.universe, abc)
+
+    # Regras fuzzy
+    rules = [ctrl.Rule(anger[anger_term], damage[damage_term]) for anger_term, damage_term in DAMAGE_RULES]
+
+    # Sistema de controle e simulação
+    return ctrl.ControlSystemSimulation(ctrl.ControlSystem(rules))
+
+
+def create_berserk_damage_evaluator():
+    """Avaliador vetorizado equivalente, para lotes de valores de raiva."""
+    return MamdaniEvaluator(
+        inputs=[(ANGER_UNIVERSE, ANGER_TERMS)],
+        output=(DAMAGE_UNIVERSE, DAMAGE_TERMS),
+        rules=DAMAGE_RULES,
+    )
+
+
+# Sistema e avaliador compartilhados, criados no primeiro uso
+_damage_sim = None
+_damage_evaluator = None
+
+
+def get_damage_sim():
+    global _damage_sim
+    if _damage_sim is None:
+        _damage_sim = create_berserk_damage_system()
+    return _damage_sim
+
+
+def get_damage_evaluator():
+    global _damage_evaluator
+    if _damage_evaluator is None:
+        _damage_evaluator = create_berserk_damage_evaluator()
+    return _damage_evaluator
+
+
+def __getattr__(name):
+    # Compatibilidade: fuzzy_behavior_tree.damage_sim / .damage_evaluator
+    if name == 'damage_sim':
+        return get_damage_sim()
+    if name == 'damage_evaluator':
+        return get_damage_evaluator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def compute_berserk_damage(anger):
+    """Dano fuzzy (skfuzzy) para um valor de raiva."""
+    damage_sim = get_damage_sim()
+    damage_sim.input['anger'] = anger
+    damage_sim.compute()
+    return damage_sim.output['damage']
+
+
+# Cache compartilhado do dano berserk (raiva quantizada em passos de 0.1)
+berserk_damage_cache = QuantizedLRUCache(compute_berserk_damage, steps=(0.1,), max_entries=256)
 
 
 ##############################################################################
@@ -94,7 +153,7 @@ class Approach(py_trees.behaviour.Behaviour):
     def update(self):
         # Reduz a distância, mas não deixa ficar negativa
         self.game_state.distance = max(0, self.game_state.distance - self.step)
-        print(f"Jogadores se aproximando (Distância: {self.game_state.distance})")
+        event_log.emit(DEBUG, APPROACH, distance=self.game_state.distance)
         return Status.SUCCESS
 
 
@@ -117,7 +176,9 @@ class Attack(py_trees.behaviour.Behaviour):
             self.game_state.player_b_hp -= damage
             remaining = self.game_state.player_b_hp
 
-        print(f"Ataque normal em {self.target} (HP restante: {remaining})")
+        attacker = 'B' if self.target == 'A' else 'A'
+        event_log.emit(DEBUG, DAMAGE_APPLIED, attacker=attacker, target=self.target,
+                       damage=damage, old_hp=remaining + damage, hp=remaining)
         return Status.SUCCESS
 
 
@@ -138,32 +199,37 @@ class BerserkAttackFuzzy(py_trees.behaviour.Behaviour):
     """
     Ataque Berserk do jogador B utilizando lógica fuzzy para definir o dano.
     O dano varia de acordo com o valor de 'anger' no game_state.
+    Com damage_cache (ex.: berserk_damage_cache) o dano vem do cache.
     """
 
-    def __init__(self, game_state):
+    def __init__(self, game_state, damage_cache=None):
         super().__init__("BerserkAttackFuzzy B")
         self.game_state = game_state
+        self.damage_cache = damage_cache
 
     def update(self):
         # Usa o valor de raiva para calcular o dano fuzzy
-        damage_sim.input['anger'] = self.game_state.anger
-        damage_sim.compute()
-        computed_damage = damage_sim.output['damage']
+        if self.damage_cache is not None:
+            computed_damage = self.damage_cache.get(self.game_state.anger)
+        else:
+            computed_damage = compute_berserk_damage(self.game_state.anger)
+        old_hp = self.game_state.player_b_hp
         self.game_state.player_b_hp -= computed_damage
-        print(
-            f"ATAQUE BERSERK Fuzzy em B! (Anger: {self.game_state.anger:.2f}, Dano: {computed_damage:.2f}, HP restante: {self.game_state.player_b_hp:.2f})")
+        event_log.emit(DEBUG, DAMAGE_APPLIED, attacker='B', target='B', damage=computed_damage,
+                       old_hp=old_hp, hp=self.game_state.player_b_hp, berserk=True, anger=self.game_state.anger)
         return Status.SUCCESS
 
 
 ##############################################################################
 #                              MONTAGEM DA ÁRVORE                            #
 ##############################################################################
-def create_tree(game_state):
+def create_tree(game_state, damage_cache=None):
     """
     Cria a árvore de comportamento:
       1) Se a distância for maior que 5, faz Approach (aproximação).
       2) Caso contrário (<= 5), faz ataque corpo a corpo em paralelo (A e B).
          - Jogador B faz um Selector: se berserk, ataca com BerserkAttackFuzzy; senão, Attack normal.
+    'damage_cache' é repassado ao BerserkAttackFuzzy.
     """
 
     # Raiz: Selector
@@ -200,7 +266,7 @@ def create_tree(game_state):
     berserk_seq = py_trees.composites.Sequence(name="BerserkSeq", memory=True)
     berserk_seq.add_children([
         CheckBerserk(game_state),
-        BerserkAttackFuzzy(game_state)
+        BerserkAttackFuzzy(game_state, damage_cache)
     ])
     attack_b = Attack(game_state, 'B')
     attack_b_selector.add_children([berserk_seq, attack_b])
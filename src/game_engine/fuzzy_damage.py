@@ -0,0 +1,359 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from fuzzy_vectorized import MamdaniEvaluator, trimf
+
+# Faixas das entradas do sistema de dano
+ANGER_RANGE = (0.0, 15.0)
+HP_PERCENTAGE_RANGE = (0.0, 100.0)
+
+
+# ----- Sistema Fuzzy para Danos -----
+# Universos das variáveis fuzzy
+ANGER_UNIVERSE = np.arange(0, 16, 0.5)
+HP_PERCENTAGE_UNIVERSE = np.arange(0, 101, 1)
+DAMAGE_UNIVERSE = np.arange(10, 101, 1)
+
+# Funções de pertinência (triângulos [a, b, c])
+ANGER_TERMS = {
+    'low': [0, 0, 5],
+    'medium': [0, 5, 10],
+    'high': [5, 10, 15],
+    'berserk': [10, 15, 15],
+}
+HP_PERCENTAGE_TERMS = {
+    'critical': [0, 0, 30],
+    'low': [0, 30, 60],
+    'medium': [30, 60, 90],
+    'high': [60, 100, 100],
+}
+DAMAGE_TERMS = {
+    'low': [10, 10, 35],
+    'medium': [20, 45, 70],
+    'high': [50, 75, 90],
+    'critical': [70, 100, 100],
+}
+
+# Tabela de regras: (raiva, HP%) -> dano
+DAMAGE_RULES = [
+    ('low', 'high', 'low'),
+    ('medium', 'high', 'medium'),
+    ('high', 'high', 'high'),
+    ('berserk', 'high', 'critical'),
+
+    ('low', 'medium', 'low'),
+    ('medium', 'medium', 'medium'),
+    ('high', 'medium', 'high'),
+    ('berserk', 'medium', 'critical'),
+
+    ('low', 'low', 'medium'),
+    ('medium', 'low', 'high'),
+    ('high', 'low', 'critical'),
+    ('berserk', 'low', 'critical'),
+
+    ('low', 'critical', 'high'),
+    ('medium', 'critical', 'high'),
+    ('high', 'critical', 'critical'),
+    ('berserk', 'critical', 'critical'),
+]
+
+
+def create_fuzzy_damage_system(anger_terms=None, hp_percentage_terms=None, damage_terms=None):
+    """
+    Sistema de dano original do skfuzzy (ControlSystemSimulation).
+    O skfuzzy (e o scipy) só é importado aqui: o jogo e os processos que só
+    usam o controlador vetorizado não pagam por essa importação.
+    Os triângulos de cada variável podem ser trocados (padrão: ANGER_TERMS,
+    HP_PERCENTAGE_TERMS e DAMAGE_TERMS), com os mesmos rótulos.
+    """
+    from skfuzzy import control as ctrl
+
+    # Definindo as variáveis fuzzy
+    anger = ctrl.Antecedent(ANGER_UNIVERSE, 'anger')
+    hp_percentage = ctrl.Antecedent(HP_PERCENTAGE_UNIVERSE, 'hp_percentage')
+    damage = ctrl.Consequent(DAMAGE_UNIVERSE, 'damage')
+
+    # Funções de pertinência
+    for label, abc in (anger_terms or ANGER_TERMS).items():
+        anger[label] = trimf(anger.universe, abc)
+    for label, abc in (hp_percentage_terms or HP_PERCENTAGE_TERMS).items():
+        hp_percentage[label] = trimf(hp_percentage.universe, abc)
+    for label, abc in (damage_terms or DAMAGE_TERMS).items():
+        damage[label] = trimf(damage.universe, abc)
+
+    # Regras fuzzy
+    rules = [ctrl.Rule(anger[anger_term] & hp_percentage[hp_term], damage[damage_term])
+             for anger_term, hp_term, damage_term in DAMAGE_RULES]
+
+    # Sistema de controle e simulação
+    damage_ctrl = ctrl.ControlSystem(rules)
+    damage_sim = ctrl.ControlSystemSimulation(damage_ctrl)
+
+    return damage_sim
+
+
+def create_damage_evaluator(upsample=4, anger_terms=None, hp_percentage_terms=None, damage_terms=None):
+    """Avaliador vetorizado (MamdaniEvaluator) com as mesmas definições do sistema de dano."""
+    return MamdaniEvaluator(
+        inputs=[(ANGER_UNIVERSE, anger_terms or ANGER_TERMS),
+                (HP_PERCENTAGE_UNIVERSE, hp_percentage_terms or HP_PERCENTAGE_TERMS)],
+        output=(DAMAGE_UNIVERSE, damage_terms or DAMAGE_TERMS),
+        rules=DAMAGE_RULES,
+        upsample=upsample,
+    )
+
+
+# ----- Controlador Compartilhado -----
+class FuzzyDamageController:
+    """
+    Controlador de dano sem estado, compartilhado por todos os avatares.
+
+    Diferente do ControlSystemSimulation, não guarda .input/.output: as
+    entradas vão em cada chamada e as tabelas internas são somente leitura,
+    então a mesma instância pode ser usada por várias threads.
+    O dano é o mesmo do skfuzzy (MamdaniEvaluator.compute_exact), sem
+    importar o skfuzzy. Com approximate=True usa o avaliador vetorizado
+    (compute), mais rápido e a menos de SKFUZZY_TOLERANCE do skfuzzy, mas
+    cerca de 0,2% dos danos inteiros diferem em 1 e algumas partidas mudam
+    (3 de 301 sementes em run_headless_match).
+    Com outros triângulos (ver create_fuzzy_damage_system) vira um modelo de
+    dano alternativo, usado como damage_table dos avatares (ver tuning.py).
+    """
+
+    def __init__(self, anger_terms=None, hp_percentage_terms=None, damage_terms=None, approximate=False):
+        self.approximate = approximate
+        self._evaluator = create_damage_evaluator(anger_terms=anger_terms, hp_percentage_terms=hp_percentage_terms,
+                                                  damage_terms=damage_terms)
+
+    def compute(self, anger, hp_percentage):
+        """Dano para uma única entrada (raiva, HP%)."""
+        if self.approximate:
+            return float(self._evaluator.compute(anger, hp_percentage))
+        return self._evaluator.compute_exact(anger, hp_percentage)
+
+    def compute_many(self, anger, hp_percentage):
+        """Dano para arrays de entradas."""
+        if self.approximate:
+            return self._evaluator.compute(anger, hp_percentage)
+        anger, hp_percentage = np.broadcast_arrays(np.asarray(anger, dtype=float),
+                                                   np.asarray(hp_percentage, dtype=float))
+        compute_exact = self._evaluator.compute_exact
+        damage = [compute_exact(a, h) for a, h in zip(anger.ravel().tolist(), hp_percentage.ravel().tolist())]
+        return np.array(damage, dtype=float).reshape(anger.shape)
+
+
+_shared_controller = None
+_shared_controller_lock = threading.Lock()
+
+
+def get_damage_controller():
+    """Retorna o controlador de dano do processo, criado na primeira chamada."""
+    global _shared_controller
+    if _shared_controller is None:
+        with _shared_controller_lock:
+            if _shared_controller is None:
+                _shared_controller = FuzzyDamageController()
+    return _shared_controller
+
+
+def compute_exact_damage(anger, hp_percentage, damage_sim=None):
+    """
+    Avalia o sistema fuzzy original (skfuzzy) para arrays de entradas.
+    Retorna um array de danos com o mesmo formato das entradas.
+    """
+    if damage_sim is None:
+        damage_sim = create_fuzzy_damage_system()
+    damage_sim.input['anger'] = np.asarray(anger, dtype=float)
+    damage_sim.input['hp_percentage'] = np.asarray(hp_percentage, dtype=float)
+    damage_sim.compute()
+    return np.asarray(damage_sim.output['damage'], dtype=float)
+
+
+# ----- Tabela Pré-compilada (raiva x HP%) -----
+class CompiledFuzzyDamage:
+    """
+    Versão pré-compilada do sistema fuzzy de dano.
+
+    O sistema de create_fuzzy_damage_system() é amostrado uma única vez numa
+    grade 2-D (raiva x HP%) e as consultas são respondidas por interpolação
+    bilinear, sem passar pelo skfuzzy a cada golpe.
+    """
+
+    def __init__(self, resolution=(31, 101)):
+        anger_points, hp_points = resolution
+        if anger_points < 2 or hp_points < 2:
+            raise ValueError("A resolução precisa de pelo menos 2 pontos por eixo.")
+
+        self.resolution = (anger_points, hp_points)
+        self.anger_axis = np.linspace(ANGER_RANGE[0], ANGER_RANGE[1], anger_points)
+        self.hp_axis = np.linspace(HP_PERCENTAGE_RANGE[0], HP_PERCENTAGE_RANGE[1], hp_points)
+        self._anger_step = self.anger_axis[1] - self.anger_axis[0]
+        self._hp_step = self.hp_axis[1] - self.hp_axis[0]
+
+        anger_grid, hp_grid = np.meshgrid(self.anger_axis, self.hp_axis, indexing='ij')
+        self.table = compute_exact_damage(anger_grid, hp_grid)
+
+    def compute(self, anger, hp_percentage):
+        """Dano interpolado para uma única entrada (raiva, HP%)."""
+        anger = min(max(anger, ANGER_RANGE[0]), ANGER_RANGE[1])
+        hp_percentage = min(max(hp_percentage, HP_PERCENTAGE_RANGE[0]), HP_PERCENTAGE_RANGE[1])
+
+        fa = (anger - ANGER_RANGE[0]) / self._anger_step
+        fh = (hp_percentage - HP_PERCENTAGE_RANGE[0]) / self._hp_step
+        i = min(int(fa), self.resolution[0] - 2)
+        j = min(int(fh), self.resolution[1] - 2)
+        ta = fa - i
+        th = fh - j
+
+        table = self.table
+        top = table[i, j] + (table[i, j + 1] - table[i, j]) * th
+        bottom = table[i + 1, j] + (table[i + 1, j + 1] - table[i + 1, j]) * th
+        return float(top + (bottom - top) * ta)
+
+    def compute_many(self, anger, hp_percentage):
+        """Versão vetorizada de compute() para arrays de entradas."""
+        anger = np.clip(np.asarray(anger, dtype=float), *ANGER_RANGE)
+        hp_percentage = np.clip(np.asarray(hp_percentage, dtype=float), *HP_PERCENTAGE_RANGE)
+
+        fa = (anger - ANGER_RANGE[0]) / self._anger_step
+        fh = (hp_percentage - HP_PERCENTAGE_RANGE[0]) / self._hp_step
+        i = np.minimum(fa.astype(int), self.resolution[0] - 2)
+        j = np.minimum(fh.astype(int), self.resolution[1] - 2)
+        ta = fa - i
+        th = fh - j
+
+        table = self.table
+        top = table[i, j] + (table[i, j + 1] - table[i, j]) * th
+        bottom = table[i + 1, j] + (table[i + 1, j + 1] - table[i + 1, j]) * th
+        return top + (bottom - top) * ta
+
+    def error_report(self, samples=2000, seed=0):
+        """
+        Compara a tabela com o sistema exato em pontos fora da grade
+        (centros das células + pontos aleatórios) e retorna o erro máximo.
+        """
+        rng = np.random.default_rng(seed)
+        anger_mid = (self.anger_axis[:-1] + self.anger_axis[1:]) / 2
+        hp_mid = (self.hp_axis[:-1] + self.hp_axis[1:]) / 2
+        anger_grid, hp_grid = np.meshgrid(anger_mid, hp_mid, indexing='ij')
+
+        anger = np.concatenate([anger_grid.ravel(), rng.uniform(*ANGER_RANGE, samples)])
+        hp_percentage = np.concatenate([hp_grid.ravel(), rng.uniform(*HP_PERCENTAGE_RANGE, samples)])
+
+        errors = np.abs(self.compute_many(anger, hp_percentage) - compute_exact_damage(anger, hp_percentage))
+        worst = int(np.argmax(errors))
+        return {
+            'resolution': self.resolution,
+            'points': int(errors.size),
+            'max_error': float(errors[worst]),
+            'mean_error': float(errors.mean()),
+            'worst_input': (float(anger[worst]), float(hp_percentage[worst])),
+        }
+
+
+# ----- Cache com Entradas Quantizadas -----
+class QuantizedLRUCache:
+    """
+    Memoização de uma função de entradas contínuas (ex.: raiva, HP%).
+
+    Cada entrada é arredondada para o múltiplo mais próximo do seu passo em
+    'steps' e a função é avaliada nesse ponto quantizado, então o resultado
+    depende só da chave, não da ordem das consultas. Guarda até
+    'max_entries' resultados, descartando o usado há mais tempo (LRU), e
+    conta acertos, falhas e descartes. Pode ser compartilhado entre avatares
+    e threads.
+    """
+
+    def __init__(self, function, steps, max_entries=4096):
+        if max_entries < 1:
+            raise ValueError("O cache precisa de pelo menos 1 entrada.")
+        self.function = function
+        self.steps = tuple(steps)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, *inputs):
+        """Índices quantizados das entradas."""
+        return tuple(round(value / step) for value, step in zip(inputs, self.steps))
+
+    def get(self, *inputs):
+        """Resultado da função no ponto quantizado mais próximo de 'inputs'."""
+        key = self.key(*inputs)
+        entries = self._entries
+        with self._lock:
+            if key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key]
+
+        value = self.function(*(index * step for index, step in zip(key, self.steps)))
+        with self._lock:
+            self.misses += 1
+            entries[key] = value
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def cache_info(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+class MemoizedFuzzyDamage:
+    """
+    Dano fuzzy com cache (QuantizedLRUCache) sobre o controlador compartilhado.
+
+    Alternativa mais leve à tabela pré-compilada: só os pontos realmente
+    consultados são avaliados, uma vez cada. Com os passos padrão (raiva 0.1,
+    HP% 1) as consultas repetidas - AIBerserkAttack sempre usa raiva 15 e o
+    HP% só muda quando o avatar recebe dano - viram acertos no cache.
+    Tem a mesma interface de CompiledFuzzyDamage (damage_table do FuzzyAvatar).
+    """
+
+    def __init__(self, anger_step=0.1, hp_step=1.0, max_entries=4096, controller=None):
+        controller = controller if controller is not None else get_damage_controller()
+        self.cache = QuantizedLRUCache(controller.compute, (anger_step, hp_step), max_entries)
+
+    def compute(self, anger, hp_percentage):
+        """Dano (do cache) para uma única entrada (raiva, HP%)."""
+        anger = min(max(anger, ANGER_RANGE[0]), ANGER_RANGE[1])
+        hp_percentage = min(max(hp_percentage, HP_PERCENTAGE_RANGE[0]), HP_PERCENTAGE_RANGE[1])
+        return self.cache.get(anger, hp_percentage)
+
+    def cache_info(self):
+        return self.cache.cache_info()
+
+
+_shared_memoized_damage = None
+_shared_memoized_damage_lock = threading.Lock()
+
+
+def get_memoized_damage():
+    """Retorna o MemoizedFuzzyDamage do processo (cache compartilhado por todos os avatares)."""
+    global _shared_memoized_damage
+    if _shared_memoized_damage is None:
+        with _shared_memoized_damage_lock:
+            if _shared_memoized_damage is None:
+                _shared_memoized_damage = MemoizedFuzzyDamage()
+    return _shared_memoized_damage
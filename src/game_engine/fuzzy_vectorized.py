@@ -0,0 +1,217 @@
+import numpy as np
+
+# Diferença máxima garantida em relação ao centroide do skfuzzy (upsample >= 4)
+SKFUZZY_TOLERANCE = 0.05
+
+
+def trimf(x, abc):
+    """
+    Função de pertinência triangular, com a mesma aritmética de skfuzzy.trimf
+    (valores idênticos), sem importar o skfuzzy/scipy.
+    """
+    a, b, c = abc
+    if not a <= b <= c:
+        raise ValueError("trimf requer a <= b <= c")
+    x = np.asarray(x)
+    y = np.zeros(len(x))
+    if a != b:
+        left = (a < x) & (x < b)
+        y[left] = (x[left] - a) / float(b - a)
+    if b != c:
+        right = (b < x) & (x < c)
+        y[right] = (c - x[right]) / float(c - b)
+    y[x == b] = 1
+    return y
+
+# ----- Avaliador Mamdani Vetorizado (NumPy) -----
+class MamdaniEvaluator:
+    """
+    Avaliador Mamdani equivalente ao ctrl.ControlSystemSimulation do skfuzzy,
+    mas que calcula N entradas de uma vez com arrays NumPy.
+
+    inputs: lista de (universo, {termo: [a, b, c]}) na ordem das entradas
+    output: (universo, {termo: [a, b, c]})
+    rules:  lista de tuplas (termo_entrada_1, ..., termo_entrada_k, termo_saida),
+            com as entradas combinadas por AND (mínimo)
+
+    Assim como no skfuzzy, a pertinência das entradas é interpolada a partir
+    das funções triangulares amostradas no universo, as entradas são limitadas
+    ao universo, a ativação é min/max e a defuzzificação é por centroide.
+    O universo de saída é reamostrado 'upsample' vezes para aproximar os
+    pontos de corte que o skfuzzy insere; com o padrão (4) o resultado fica
+    a menos de SKFUZZY_TOLERANCE do centroide do skfuzzy nos sistemas do jogo.
+    Para uma única entrada, compute_exact() reproduz o skfuzzy exatamente.
+    """
+
+    def __init__(self, inputs, output, rules, upsample=4, chunk_size=4096):
+        self.chunk_size = chunk_size
+
+        # Entradas: universo e pertinências amostradas (como no skfuzzy)
+        self.input_universes = []
+        self.input_terms = []
+        for universe, terms in inputs:
+            universe = np.asarray(universe, dtype=float)
+            self.input_universes.append(universe)
+            self.input_terms.append({label: trimf(universe, abc) for label, abc in terms.items()})
+
+        # Saída: universo reamostrado e matriz (termo x ponto) de pertinências
+        universe, terms = output
+        universe = np.asarray(universe, dtype=float)
+        self.output_labels = list(terms)
+        # Universo e pertinências originais, para compute_exact()
+        self.exact_universe = universe
+        self.exact_mfs = [trimf(universe, terms[label]) for label in self.output_labels]
+        fine = np.linspace(universe[0], universe[-1], (len(universe) - 1) * upsample + 1)
+        self.output_universe = fine
+        self.output_mfs = np.array([np.interp(fine, universe, trimf(universe, terms[label]))
+                                    for label in self.output_labels])
+
+        # Regras: índices dos termos de entrada e do termo de saída
+        self.rules = []
+        for rule in rules:
+            if len(rule) != len(inputs) + 1:
+                raise ValueError(f"Regra {rule!r} não corresponde a {len(inputs)} entradas.")
+            *antecedents, consequent = rule
+            self.rules.append((tuple(antecedents), self.output_labels.index(consequent)))
+
+        # Pesos do centroide exato para segmentos lineares entre pontos da saída
+        x1 = fine[:-1]
+        x2 = fine[1:]
+        dx = x2 - x1
+        self._area_w1 = dx / 2
+        self._area_w2 = dx / 2
+        self._moment_w1 = dx * (2 * x1 + x2) / 6
+        self._moment_w2 = dx * (x1 + 2 * x2) / 6
+
+        # Tabelas somente leitura: o avaliador não tem estado mutável
+        arrays = [self.output_universe, self.output_mfs, self._area_w1, self._area_w2,
+                  self._moment_w1, self._moment_w2, self.exact_universe, *self.exact_mfs, *self.input_universes]
+        arrays += [mf for terms in self.input_terms for mf in terms.values()]
+        for array in arrays:
+            array.flags.writeable = False
+
+    def compute(self, *columns):
+        """
+        Retorna o valor defuzzificado para cada linha das entradas.
+        Cada argumento é um escalar ou array (um por variável de entrada);
+        o resultado tem o formato das entradas após broadcast.
+        Linhas sem nenhuma regra ativa resultam em NaN.
+        """
+        if len(columns) != len(self.input_universes):
+            raise ValueError(f"Esperadas {len(self.input_universes)} entradas, recebidas {len(columns)}.")
+
+        columns = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in columns])
+        shape = columns[0].shape
+        flat = [c.ravel() for c in columns]
+        result = np.empty(flat[0].size, dtype=float)
+
+        for start in range(0, result.size, self.chunk_size):
+            stop = start + self.chunk_size
+            result[start:stop] = self._compute_chunk([c[start:stop] for c in flat])
+
+        return result.reshape(shape)
+
+    def _compute_chunk(self, columns):
+        # Fuzzificação: pertinência de cada termo de cada entrada
+        memberships = []
+        for values, universe, terms in zip(columns, self.input_universes, self.input_terms):
+            values = np.clip(values, universe[0], universe[-1])
+            memberships.append({label: np.interp(values, universe, mf) for label, mf in terms.items()})
+
+        # Ativação das regras (AND = mínimo) e acumulação por termo (máximo)
+        cuts = np.zeros((len(self.output_labels), columns[0].size))
+        for antecedents, consequent in self.rules:
+            strength = memberships[0][antecedents[0]]
+            for membership, label in zip(memberships[1:], antecedents[1:]):
+                strength = np.fmin(strength, membership[label])
+            np.fmax(cuts[consequent], strength, out=cuts[consequent])
+
+        # Agregação: máximo dos termos de saída cortados
+        aggregated = np.fmin(cuts[0][:, None], self.output_mfs[0])
+        for cut, mf in zip(cuts[1:], self.output_mfs[1:]):
+            np.fmax(aggregated, np.fmin(cut[:, None], mf), out=aggregated)
+
+        # Centroide exato da função linear por partes
+        y1 = aggregated[:, :-1]
+        y2 = aggregated[:, 1:]
+        area = y1 @ self._area_w1 + y2 @ self._area_w2
+        moment = y1 @ self._moment_w1 + y2 @ self._moment_w2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(area > 0, moment / area, np.nan)
+
+    def compute_exact(self, *values):
+        """
+        Valor defuzzificado de uma única entrada com a mesma aritmética do
+        ControlSystemSimulation do skfuzzy (resultado idêntico): o universo
+        de saída recebe os pontos em que cada termo cruza o seu corte e o
+        centroide é somado trecho a trecho, na mesma ordem. Mais lento que
+        compute() por entrada, mas sem a aproximação do 'upsample'.
+        Sem nenhuma regra ativa resulta em NaN.
+        """
+        if len(values) != len(self.input_universes):
+            raise ValueError(f"Esperadas {len(self.input_universes)} entradas, recebidas {len(values)}.")
+
+        # Fuzzificação com as entradas limitadas ao universo (clip_to_bounds)
+        memberships = []
+        for value, universe, terms in zip(values, self.input_universes, self.input_terms):
+            value = np.fmax(np.fmin(float(value), universe[-1]), universe[0])
+            memberships.append({label: np.interp(value, universe, mf) for label, mf in terms.items()})
+
+        # Ativação (AND = mínimo) e acumulação por termo (máximo); None = termo sem regra
+        cuts = [None] * len(self.output_labels)
+        for antecedents, consequent in self.rules:
+            strength = memberships[0][antecedents[0]]
+            for membership, label in zip(memberships[1:], antecedents[1:]):
+                strength = np.fmin(strength, membership[label])
+            cuts[consequent] = strength if cuts[consequent] is None else np.fmax(strength, cuts[consequent])
+        active = [(cut, mf) for cut, mf in zip(cuts, self.exact_mfs) if cut is not None]
+        if not active:
+            return float('nan')
+
+        # Universo com os pontos de corte e agregação (máximo dos termos cortados)
+        universe = self.exact_universe
+        crossings = []
+        for cut, mf in active:
+            crossings.extend(_cut_crossings(universe, mf, cut).tolist())
+        points = np.union1d(universe, crossings)
+        aggregated = np.zeros_like(points)
+        for cut, mf in active:
+            np.maximum(aggregated, np.minimum(cut, np.interp(points, universe, mf)), aggregated)
+        if aggregated.sum() == 0:
+            return float('nan')
+        return _centroid(points.tolist(), aggregated.tolist())
+
+
+def _cut_crossings(x, mf, level):
+    # Pontos do universo em que 'mf' vale 'level' (como _interp_universe_fast do skfuzzy)
+    if level == 0.:
+        idx = np.where(np.diff(mf > level))[0]
+    else:
+        idx = np.where(np.diff(mf >= level))[0]
+    return x[idx] + (level - mf[idx]) * (x[idx + 1] - x[idx]) / (mf[idx + 1] - mf[idx])
+
+
+def _centroid(x, mfx):
+    # Centroide exato da função linear por partes, somado na ordem do skfuzzy.defuzzify.centroid
+    sum_moment_area = 0.0
+    sum_area = 0.0
+    for i in range(1, len(x)):
+        x1, x2 = x[i - 1], x[i]
+        y1, y2 = mfx[i - 1], mfx[i]
+        if y1 == y2 == 0.0 or x1 == x2:
+            continue
+        if y1 == y2:
+            moment = 0.5 * (x1 + x2)
+            area = (x2 - x1) * y1
+        elif y1 == 0.0:
+            moment = 2.0 / 3.0 * (x2 - x1) + x1
+            area = 0.5 * (x2 - x1) * y2
+        elif y2 == 0.0:
+            moment = 1.0 / 3.0 * (x2 - x1) + x1
+            area = 0.5 * (x2 - x1) * y1
+        else:
+            moment = (2.0 / 3.0 * (x2 - x1) * (y2 + 0.5 * y1)) / (y1 + y2) + x1
+            area = 0.5 * (x2 - x1) * (y1 + y2)
+        sum_moment_area += moment * area
+        sum_area += area
+    return sum_moment_area / max(sum_area, np.finfo(float).eps)
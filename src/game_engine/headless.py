@@ -0,0 +1,324 @@
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from fuzzy_avatar import create_avatar, create_duel_avatars, SCREEN_WIDTH
+from fuzzy_ai_tree import create_fuzzy_ai_tree, create_melee_ai_tree
+from compiled_tree import compile_tree
+from batched_tree import BatchedAgents, BatchedTree, create_batched_fuzzy_ai_tree
+from sim_clock import FastClock, FIXED_TIMESTEP_MS
+from spatial_index import SpatialIndex
+from replay import ReplayRecorder
+from telemetry import Telemetry
+from event_scheduler import EventScheduler, SleepingTree
+from animation_scheduler import AnimationScheduler
+
+# Estatísticas registradas a cada tick da simulação
+TickStats = namedtuple('TickStats', [
+    'tick', 'time_ms', 'distance',
+    'hp_a', 'hp_b', 'anger_a', 'anger_b', 'berserk_a', 'berserk_b',
+])
+
+
+class MatchResult:
+    """Resultado de uma partida headless."""
+
+    def __init__(self, winner, ticks, simulated_ms, hp_a, hp_b, stats, hits):
+        self.winner = winner  # Nome do vencedor ou None se atingiu max_ticks
+        self.ticks = ticks
+        self.simulated_ms = simulated_ms
+        self.hp_a = hp_a
+        self.hp_b = hp_b
+        self.stats = stats  # Lista de TickStats (vazia se record_stats=False)
+        self.hits = hits  # Lista de (tick, nome do alvo, dano) para cada golpe
+
+    def __repr__(self):
+        return (f"MatchResult(winner={self.winner!r}, ticks={self.ticks}, "
+                f"simulated_ms={self.simulated_ms:.0f}, hp_a={self.hp_a}, hp_b={self.hp_b})")
+
+
+class BattleResult:
+    """Resultado de uma batalha headless entre várias equipes."""
+
+    def __init__(self, winner_team, ticks, simulated_ms, survivors):
+        self.winner_team = winner_team  # Índice da equipe vencedora ou None
+        self.ticks = ticks
+        self.simulated_ms = simulated_ms
+        self.survivors = survivors  # {equipe: avatares vivos}
+
+    def __repr__(self):
+        return (f"BattleResult(winner_team={self.winner_team!r}, ticks={self.ticks}, "
+                f"simulated_ms={self.simulated_ms:.0f}, survivors={self.survivors})")
+
+
+def _randomize_start(avatars, seed, position_jitter, max_initial_anger):
+    # Condições iniciais reproduzíveis a partir da semente
+    rng = random.Random(seed)
+    for avatar in avatars:
+        avatar.rect.x += rng.randint(-position_jitter, position_jitter)
+        avatar.anger = rng.uniform(0, max_initial_anger)
+
+
+def run_headless_match(timestep_ms=FIXED_TIMESTEP_MS, max_ticks=100000,
+                       attack_threshold=100, approach_step=1,
+                       damage_table=None, record_stats=True, clock=None,
+                       seed=None, position_jitter=40, max_initial_anger=3.0,
+                       compiled_trees=False, replay_path=None, telemetry_sinks=None,
+                       event_driven=False, scheduled_animations=False, anger_params=None):
+    """
+    Executa um duelo completo sem janela, fontes ou sprites.
+
+    Usa os mesmos FuzzyAvatar e create_fuzzy_ai_tree do jogo, na mesma ordem
+    do loop principal (atualiza avatares, tica as árvores, verifica vitória),
+    mas com o tempo avançando 'timestep_ms' por tick, sem esperar o relógio.
+    Um relógio de passo fixo diferente (ex.: FixedStepClock em tempo real)
+    pode ser passado em 'clock'.
+
+    A simulação é determinística; com 'seed' as condições iniciais variam de
+    forma reproduzível (posição inicial +-position_jitter px e raiva inicial
+    entre 0 e max_initial_anger).
+
+    Com 'compiled_trees' as árvores são ticadas pelo executor compilado
+    (compiled_tree.CompiledTree), com o mesmo resultado do py_trees.
+    Com 'replay_path' a partida é gravada para o visualizador de replay.py.
+    Com 'telemetry_sinks' cada tick vira uma amostra de telemetria
+    (telemetry.Telemetry) entregue a esses destinos.
+
+    Com 'event_driven' os golpes são eventos agendados num EventScheduler
+    (AIScheduledAttack) e as árvores dormem enquanto o golpe está pendente
+    (SleepingTree), em vez de consultar a animação a cada tick.
+    Com 'scheduled_animations' os quadros de animação avançam por um
+    AnimationScheduler, sem mudar o resultado.
+    'anger_params' troca os ganhos de raiva e os limiares do berserk dos dois
+    avatares (ver fuzzy_avatar.ANGER_PARAMETERS).
+    """
+    if clock is None:
+        clock = FastClock(timestep_ms)
+    scheduler = EventScheduler(clock) if event_driven else None
+    avatarA, avatarB = create_duel_avatars(damage_table=damage_table, headless=True, clock=clock,
+                                           anger_params=anger_params)
+    ai_tree_A = create_fuzzy_ai_tree(avatarB, avatarA, attack_threshold=attack_threshold,
+                                     approach_step=approach_step, scheduler=scheduler)
+    ai_tree_B = create_fuzzy_ai_tree(avatarA, avatarB, attack_threshold=attack_threshold,
+                                     approach_step=approach_step, scheduler=scheduler)
+    if compiled_trees:
+        ai_tree_A = compile_tree(ai_tree_A)
+        ai_tree_B = compile_tree(ai_tree_B)
+    tick_A, tick_B = ((SleepingTree(ai_tree_A).tick_once, SleepingTree(ai_tree_B).tick_once) if event_driven
+                      else (ai_tree_A.tick_once, ai_tree_B.tick_once))
+
+    if seed is not None:
+        _randomize_start((avatarA, avatarB), seed, position_jitter, max_initial_anger)
+    animations = AnimationScheduler(clock) if scheduled_animations else None
+    if animations is not None:
+        animations.add(avatarA)
+        animations.add(avatarB)
+
+    recorder = ReplayRecorder(replay_path, (avatarA, avatarB), timestep_ms) if replay_path else None
+    telemetry = (Telemetry((avatarA, avatarB), (ai_tree_A, ai_tree_B), telemetry_sinks)
+                 if telemetry_sinks is not None else None)
+
+    stats = []
+    hits = []
+    hp_a, hp_b = avatarA.hp, avatarB.hp
+    winner = None
+    tick = 0
+    try:
+        while tick < max_ticks:
+            avatarA.update(None)
+            avatarB.update(None)
+            if animations is not None:
+                animations.advance()
+            if scheduler is not None:
+                scheduler.run_due()
+            tick_A()
+            tick_B()
+            tick += 1
+            if recorder is not None:
+                recorder.record_tick()
+            if telemetry is not None:
+                telemetry.record_tick()
+
+            # Golpes do tick (queda de HP de cada avatar)
+            if avatarA.hp < hp_a:
+                hits.append((tick, avatarA.name, hp_a - avatarA.hp))
+            if avatarB.hp < hp_b:
+                hits.append((tick, avatarB.name, hp_b - avatarB.hp))
+            hp_a, hp_b = avatarA.hp, avatarB.hp
+
+            if record_stats:
+                stats.append(TickStats(
+                    tick, clock.now_ms, abs(avatarA.rect.centerx - avatarB.rect.centerx),
+                    avatarA.hp, avatarB.hp, avatarA.anger, avatarB.anger,
+                    avatarA.berserk_mode, avatarB.berserk_mode,
+                ))
+
+            if avatarA.hp <= 0:
+                winner = avatarB.name
+                break
+            elif avatarB.hp <= 0:
+                winner = avatarA.name
+                break
+
+            clock.tick()
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if telemetry is not None:
+            telemetry.close()
+
+    return MatchResult(winner, tick, clock.now_ms, avatarA.hp, avatarB.hp, stats, hits)
+
+
+def run_batched_matches(seeds, timestep_ms=FIXED_TIMESTEP_MS, max_ticks=100000,
+                        attack_threshold=100, approach_step=1,
+                        damage_table=None, record_stats=True,
+                        position_jitter=40, max_initial_anger=3.0):
+    """
+    Executa várias partidas headless ao mesmo tempo, uma por semente
+    (None = condições iniciais padrão), com uma única árvore em lote
+    (BatchedTree) para todos os avatares.
+
+    A cada tick todos os avatares A são ticados juntos e depois todos os B,
+    a mesma ordem de run_headless_match, então cada resultado é idêntico ao
+    da partida individual com a mesma semente.
+    """
+    clock = FastClock(timestep_ms)
+    duels = [create_duel_avatars(damage_table=damage_table, headless=True, clock=clock) for _ in seeds]
+    for (avatarA, avatarB), seed in zip(duels, seeds):
+        if seed is not None:
+            _randomize_start((avatarA, avatarB), seed, position_jitter, max_initial_anger)
+
+    # Agentes 0..n-1: avatares A (alvo B); n..2n-1: avatares B (alvo A)
+    count = len(duels)
+    agents = BatchedAgents([a for a, _ in duels] + [b for _, b in duels],
+                           [b for _, b in duels] + [a for a, _ in duels],
+                           attack_threshold=attack_threshold, approach_step=approach_step)
+    tree = BatchedTree(create_batched_fuzzy_ai_tree(), agents)
+
+    results = [None] * count
+    stats = [[] for _ in duels]
+    hits = [[] for _ in duels]
+    last_hp = [(a.hp, b.hp) for a, b in duels]
+    active = np.arange(count)
+    tick = 0
+    while active.size and tick < max_ticks:
+        for i in active:
+            duels[i][0].update(None)
+            duels[i][1].update(None)
+        tree.tick(active)
+        tree.tick(active + count)
+        tick += 1
+
+        finished = []
+        for i in active:
+            avatarA, avatarB = duels[i]
+            hp_a, hp_b = last_hp[i]
+            if avatarA.hp < hp_a:
+                hits[i].append((tick, avatarA.name, hp_a - avatarA.hp))
+            if avatarB.hp < hp_b:
+                hits[i].append((tick, avatarB.name, hp_b - avatarB.hp))
+            last_hp[i] = (avatarA.hp, avatarB.hp)
+
+            if record_stats:
+                stats[i].append(TickStats(
+                    tick, clock.now_ms, abs(avatarA.rect.centerx - avatarB.rect.centerx),
+                    avatarA.hp, avatarB.hp, avatarA.anger, avatarB.anger,
+                    avatarA.berserk_mode, avatarB.berserk_mode,
+                ))
+
+            winner = avatarB.name if avatarA.hp <= 0 else avatarA.name if avatarB.hp <= 0 else None
+            if winner is not None:
+                results[i] = MatchResult(winner, tick, clock.now_ms, avatarA.hp, avatarB.hp, stats[i], hits[i])
+                finished.append(i)
+
+        if finished:
+            active = np.setdiff1d(active, finished)
+        if active.size:
+            clock.tick()
+
+    # Partidas que atingiram max_ticks
+    for i in active:
+        avatarA, avatarB = duels[i]
+        results[i] = MatchResult(None, tick, clock.now_ms, avatarA.hp, avatarB.hp, stats[i], hits[i])
+    return results
+
+
+def run_headless_battle(team_sizes=(16, 16), timestep_ms=FIXED_TIMESTEP_MS, max_ticks=100000,
+                        attack_threshold=100, approach_step=1, damage_table=None,
+                        seed=0, max_initial_anger=3.0,
+                        compiled_trees=True, event_driven=False, scheduled_animations=False):
+    """
+    Batalha headless entre várias equipes (team_sizes[i] avatares na equipe i).
+
+    Cada equipe começa espalhada na sua faixa da tela e cada avatar usa
+    create_melee_ai_tree: a cada tick ataca o inimigo mais próximo, achado
+    pelo índice espacial (SpatialIndex) em vez de comparar todos os pares.
+    Avatares derrotados saem do índice assim que recebem o golpe final
+    (land_attack), inclusive nos golpes agendados. Termina quando sobra uma
+    equipe (ou nenhuma) ou ao atingir max_ticks.
+    Com 'event_driven' os golpes são eventos agendados e as árvores de
+    avatares no meio de um ataque não são ticadas (ver run_headless_match).
+    Com 'scheduled_animations' só os avatares com quadro vencido são
+    animados a cada tick (AnimationScheduler).
+    """
+    clock = FastClock(timestep_ms)
+    scheduler = EventScheduler(clock) if event_driven else None
+    animations = AnimationScheduler(clock) if scheduled_animations else None
+    rng = random.Random(seed)
+    spatial_index = SpatialIndex()
+    band = SCREEN_WIDTH / len(team_sizes)
+
+    fighters = []
+    for team, size in enumerate(team_sizes):
+        for _ in range(size):
+            x = rng.randint(int(team * band) + 40, int((team + 1) * band) - 40)
+            avatar = create_avatar(("avatarA", "avatarB")[team % 2], x, damage_table=damage_table,
+                                   headless=True, clock=clock)
+            avatar.anger = rng.uniform(0, max_initial_anger)
+            spatial_index.insert(avatar, team)
+            if animations is not None:
+                animations.add(avatar)
+            tree = create_melee_ai_tree(avatar, spatial_index, attack_threshold=attack_threshold,
+                                        approach_step=approach_step, scheduler=scheduler)
+            if compiled_trees:
+                tree = compile_tree(tree)
+            fighters.append((avatar, SleepingTree(tree) if event_driven else tree))
+
+    tick = 0
+    teams = set(range(len(team_sizes)))
+    while tick < max_ticks and len(teams) > 1:
+        for avatar, _ in fighters:
+            avatar.update(None)
+        if animations is not None:
+            animations.advance()
+        if scheduler is not None:
+            scheduler.run_due()
+        for avatar, tree in fighters:
+            if avatar.hp <= 0:
+                continue
+            tree.tick_once()
+        tick += 1
+
+        for avatar, _ in fighters:
+            if avatar.hp <= 0:
+                if avatar in spatial_index:
+                    spatial_index.remove(avatar)
+                if animations is not None:
+                    animations.remove(avatar)
+        fighters = [(avatar, tree) for avatar, tree in fighters if avatar.hp > 0]
+        teams = {avatar.team for avatar, _ in fighters}
+        if len(teams) > 1:
+            clock.tick()
+
+    survivors = {team: 0 for team in range(len(team_sizes))}
+    for avatar, _ in fighters:
+        survivors[avatar.team] += 1
+    winner_team = next(iter(teams)) if len(teams) == 1 else None
+    return BattleResult(winner_team, tick, clock.now_ms, survivors)
+
+
+if __name__ == "__main__":
+    result = run_headless_match()
+    print(result)
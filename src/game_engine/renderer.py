@@ -0,0 +1,71 @@
+import pygame
+
+
+def merge_rects(rects):
+    """Une os retângulos que se sobrepõem, para atualizar cada área uma única vez."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if not rect.width or not rect.height:
+            continue
+        overlapping = rect.collidelist(merged)
+        while overlapping != -1:
+            rect.union_ip(merged.pop(overlapping))
+            overlapping = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+# ----- Renderização por Retângulos Sujos -----
+class DirtyRectRenderer:
+    """
+    Redesenha e envia ao display só as áreas que mudaram no quadro.
+
+    A cada quadro, begin_frame() restaura o fundo apenas sob o que foi
+    desenhado no quadro anterior (sprites, barras e textos), as funções de
+    desenho passadas a draw() retornam os retângulos que tocaram, e
+    end_frame() envia ao display a união das áreas antigas e novas com
+    pygame.display.update(rects), em vez de copiar o fundo inteiro e chamar
+    flip(). Depois de invalidate() (ex.: tela de vitória, reinício) o
+    próximo quadro é redesenhado por inteiro.
+    Com dirty_rects=False o renderizador sempre redesenha a tela inteira.
+    """
+
+    def __init__(self, screen, background, dirty_rects=True):
+        self.screen = screen
+        self.background = background
+        self.dirty_rects = dirty_rects
+        self._previous_rects = []
+        self._frame_rects = []
+        self._full_redraw = True
+
+    def invalidate(self):
+        """Força o redesenho da tela inteira no próximo quadro."""
+        self._full_redraw = True
+
+    def begin_frame(self):
+        if self._full_redraw or not self.dirty_rects:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self._previous_rects:
+                self.screen.blit(self.background, rect, rect)
+        self._frame_rects = []
+
+    def draw(self, draw_function, *args):
+        """Chama draw_function(screen, *args), que retorna os retângulos desenhados."""
+        rects = draw_function(self.screen, *args)
+        self._frame_rects.extend(rects)
+        return rects
+
+    def end_frame(self):
+        """Envia o quadro ao display; retorna as áreas atualizadas (None = tela inteira)."""
+        frame_rects = merge_rects(self._frame_rects)
+        if self._full_redraw or not self.dirty_rects:
+            pygame.display.flip()
+            updated = None
+        else:
+            updated = merge_rects(self._previous_rects + frame_rects)
+            pygame.display.update(updated)
+        self._previous_rects = frame_rects
+        self._full_redraw = False
+        return updated
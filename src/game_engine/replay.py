@@ -0,0 +1,270 @@
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from event_log import event_log, DEBUG
+
+REPLAY_MAGIC = b"DUELRPL\x00"
+REPLAY_VERSION = 1
+
+# Cabeçalho: magic, versão, nº de avatares, nº de ticks, passo (ms, 0 = variável),
+# posição da seção de eventos e tamanho dos metadados (JSON) que vêm logo depois
+HEADER = struct.Struct('<8sHHIdQI')
+
+# Estado de um avatar em um tick (registro de tamanho fixo, little-endian)
+STATE_DTYPE = np.dtype([
+    ('x', '<i4'), ('y', '<i4'), ('hp', '<i4'), ('anger', '<f4'),
+    ('flags', 'u1'), ('animation', 'u1'), ('frame', '<u2'),
+])
+STATE_STRUCT = struct.Struct('<iiifBBH')
+
+# Bits de 'flags'
+BERSERK = 1
+FACING_RIGHT = 2
+ATTACKING = 4
+
+# Códigos de 'animation'
+IDLE, RUN, ATTACK = 0, 1, 2
+
+
+def _animation_code(avatar):
+    if avatar.current_frames is avatar.attack_frames:
+        return ATTACK
+    if avatar.current_frames is avatar.run_frames:
+        return RUN
+    return IDLE
+
+
+# ----- Gravação -----
+class ReplayRecorder:
+    """
+    Grava um duelo em arquivo binário, tick a tick.
+
+    Cada tick é um bloco de registros de tamanho fixo (STATE_DTYPE, um por
+    avatar) escrito direto no arquivo, então todo tick é um quadro-chave
+    completo e o tick t fica numa posição calculável. É uma adaptação
+    deliberada do esquema de quadros-chave periódicos com deltas entre eles:
+    o estado completo custa 20 bytes por avatar por tick (cerca de 2,4 KB/s
+    num duelo a 60 ticks/s, ~26 KB numa partida de 640 ticks), e deltas
+    economizariam parte disso ao preço de refazer os deltas desde o último
+    quadro-chave a cada busca, de registros de tamanho variável (sem memmap
+    direto) e de uma gravação interrompida mais difícil de recuperar. Os eventos do tick
+    (ataques, dano, berserk), capturados do event_log, vão para uma seção
+    separada com uma tabela de posições por tick, escrita em close().
+    Uma gravação interrompida antes de close() ainda pode ser reproduzida
+    (sem os eventos).
+    """
+
+    def __init__(self, path, avatars, timestep_ms=0.0):
+        self.path = path
+        self.avatars = list(avatars)
+        self.timestep_ms = float(timestep_ms)
+        self.ticks = 0
+        self._event_offsets = [0]
+        self._event_blob = bytearray()
+        self._pending_events = []
+
+        meta = json.dumps({
+            'avatars': [{'name': avatar.name, 'max_hp': avatar.max_hp} for avatar in self.avatars],
+        }).encode()
+        self._meta_size = len(meta)
+        self._file = open(path, 'wb')
+        self._write_header(ticks=0, events_offset=0)
+        self._file.write(meta)
+        event_log.add_listener(self._on_event, DEBUG)
+
+    def _on_event(self, event):
+        self._pending_events.append({'kind': event.kind, 'level': event.level, 'fields': event.fields})
+
+    def record_tick(self):
+        """Grava o estado atual dos avatares e os eventos emitidos desde o último tick."""
+        pack = STATE_STRUCT.pack
+        self._file.write(b"".join(
+            pack(avatar.rect.x, avatar.rect.y, avatar.hp, avatar.anger,
+                 (BERSERK if avatar.berserk_mode else 0) | (FACING_RIGHT if avatar.facing_right else 0)
+                 | (ATTACKING if avatar.is_attacking else 0),
+                 _animation_code(avatar), avatar.current_frame)
+            for avatar in self.avatars))
+        if self._pending_events:
+            self._event_blob += json.dumps(self._pending_events, default=str).encode()
+            self._pending_events = []
+        self._event_offsets.append(len(self._event_blob))
+        self.ticks += 1
+
+    def close(self):
+        """Escreve a seção de eventos e completa o cabeçalho."""
+        if self._file is None:
+            return
+        event_log.remove_listener(self._on_event)
+        events_offset = self._file.tell()
+        self._file.write(np.asarray(self._event_offsets, dtype='<u8').tobytes())
+        self._file.write(self._event_blob)
+
+        self._file.seek(0)
+        self._write_header(self.ticks, events_offset)
+        self._file.close()
+        self._file = None
+
+    def _write_header(self, ticks, events_offset):
+        self._file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, len(self.avatars), ticks,
+                                     self.timestep_ms, events_offset, self._meta_size))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ----- Reprodução -----
+class ReplayPlayer:
+    """
+    Lê uma gravação de ReplayRecorder com acesso direto a qualquer tick.
+
+    Os estados são mapeados em memória (np.memmap): state(t) e events(t)
+    são O(1) e não dependem de ticks anteriores. apply() copia o estado de
+    um tick para avatares FuzzyAvatar, que então são desenhados com o
+    FuzzyAvatar.draw de sempre, sem rodar a simulação.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as replay_file:
+            (magic, self.version, avatar_count, ticks, self.timestep_ms,
+             events_offset, meta_size) = HEADER.unpack(replay_file.read(HEADER.size))
+            if magic != REPLAY_MAGIC:
+                raise ValueError(f"Arquivo de replay inválido: {path}")
+            self.meta = json.loads(replay_file.read(meta_size))
+
+        states_offset = HEADER.size + meta_size
+        if events_offset == 0:
+            # Gravação interrompida: ticks completos até o fim do arquivo, sem eventos
+            ticks = (os.path.getsize(path) - states_offset) // (STATE_DTYPE.itemsize * avatar_count)
+        self.names = [avatar['name'] for avatar in self.meta['avatars']]
+        self.ticks = ticks
+        self.states = (np.memmap(path, dtype=STATE_DTYPE, mode='r', offset=states_offset,
+                                 shape=(ticks, avatar_count))
+                       if ticks else np.zeros((0, avatar_count), dtype=STATE_DTYPE))
+        self._event_offsets = None
+        if events_offset and ticks:
+            blob_offset = events_offset + 8 * (ticks + 1)
+            if os.path.getsize(path) > blob_offset:
+                self._event_offsets = np.memmap(path, dtype='<u8', mode='r', offset=events_offset,
+                                                shape=(ticks + 1,))
+                self._events = np.memmap(path, dtype='u1', mode='r', offset=blob_offset)
+
+    def __len__(self):
+        return self.ticks
+
+    def state(self, tick):
+        """Registros (STATE_DTYPE) de todos os avatares no tick."""
+        return self.states[tick]
+
+    def events(self, tick):
+        """Eventos (dicts com kind, level e fields) emitidos no tick."""
+        if self._event_offsets is None:
+            return []
+        start, end = int(self._event_offsets[tick]), int(self._event_offsets[tick + 1])
+        if start == end:
+            return []
+        return json.loads(self._events[start:end].tobytes())
+
+    def apply(self, tick, avatars):
+        """Coloca os avatares no estado gravado no tick."""
+        for avatar, state in zip(avatars, self.states[tick]):
+            avatar.rect.x = int(state['x'])
+            avatar.rect.y = int(state['y'])
+            avatar.hp = int(state['hp'])
+            avatar.anger = float(state['anger'])
+            flags = int(state['flags'])
+            avatar.berserk_mode = bool(flags & BERSERK)
+            avatar.facing_right = bool(flags & FACING_RIGHT)
+            avatar.is_attacking = bool(flags & ATTACKING)
+            avatar.current_frames = (avatar.idle_frames, avatar.run_frames,
+                                     avatar.attack_frames)[int(state['animation'])]
+            avatar.current_frame = min(int(state['frame']), len(avatar.current_frames) - 1)
+
+
+def view_replay(path, start_tick=0):
+    """
+    Visualizador: reproduz a gravação desenhando os avatares normalmente.
+    Espaço pausa; setas esquerda/direita avançam ou voltam 1 tick (10 com
+    Shift); setas cima/baixo pulam 10 s; Home/End vão ao início/fim.
+    """
+    import pygame
+    from fuzzy_avatar import create_avatar, SCREEN_WIDTH, SCREEN_HEIGHT, SPRITES_DIR, text_color
+    from renderer import DirtyRectRenderer
+    from sim_clock import RealTimeClock
+    from text_cache import preload_fonts, render_text
+
+    player = ReplayPlayer(path)
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"Replay - {os.path.basename(path)}")
+    preload_fonts()
+    background = pygame.transform.scale(pygame.image.load(os.path.join(SPRITES_DIR, "background.png")),
+                                        (SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    renderer = DirtyRectRenderer(screen, background)
+    avatars = [create_avatar(name, 0) for name in player.names]
+    ticks_per_second = 1000.0 / player.timestep_ms if player.timestep_ms else 60
+    clock = RealTimeClock(round(ticks_per_second))
+
+    def draw_replay_info(screen, tick, events):
+        lines = [f"Tick {tick + 1}/{len(player)}" + ("  (pausado)" if paused else "")]
+        lines += [f"{event['kind']}: {event['fields']}" for event in events[-5:]]
+        return [screen.blit(render_text(line, text_color), (10, 10 + i * 20)) for i, line in enumerate(lines)]
+
+    tick = max(0, min(start_tick, len(player) - 1))
+    paused = False
+    recent_events = []
+    running = len(player) > 0
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                step = 10 if event.mod & pygame.KMOD_SHIFT else 1
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    tick += step
+                elif event.key == pygame.K_LEFT:
+                    tick -= step
+                elif event.key == pygame.K_UP:
+                    tick += int(10 * ticks_per_second)
+                elif event.key == pygame.K_DOWN:
+                    tick -= int(10 * ticks_per_second)
+                elif event.key == pygame.K_HOME:
+                    tick = 0
+                elif event.key == pygame.K_END:
+                    tick = len(player) - 1
+                tick = max(0, min(tick, len(player) - 1))
+
+        player.apply(tick, avatars)
+        tick_events = player.events(tick)
+        if tick_events:
+            recent_events = (recent_events + tick_events)[-5:]
+
+        renderer.begin_frame()
+        for avatar in avatars:
+            renderer.draw(avatar.draw)
+        renderer.draw(draw_replay_info, tick, recent_events)
+        renderer.end_frame()
+
+        if not paused and tick < len(player) - 1:
+            tick += 1
+        clock.tick()
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python replay.py <arquivo.replay> [tick inicial]")
+    else:
+        view_replay(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 0)
@@ -0,0 +1,114 @@
+import abc
+import math
+import time
+
+import pygame
+
+# Passo padrão da simulação (equivalente a 60 FPS)
+DEFAULT_FPS = 60
+FIXED_TIMESTEP_MS = 1000 / DEFAULT_FPS
+
+
+# ----- Relógios da Simulação -----
+class SimulationClock(abc.ABC):
+    """
+    Interface comum dos relógios usados pela simulação.
+
+    now() retorna o tempo atual da simulação em ms inteiros (como
+    pygame.time.get_ticks) e tick() avança um quadro, retornando o passo em ms.
+    Todo código de temporização (animações, ataques) lê o tempo daqui.
+    """
+
+    @abc.abstractmethod
+    def now(self):
+        """Tempo atual da simulação em ms inteiros."""
+
+    @abc.abstractmethod
+    def tick(self):
+        """Avança um quadro; retorna o passo em ms."""
+
+    def align(self, time_ms):
+        """Primeiro instante >= time_ms que now() vai retornar (sem previsão: o próprio time_ms)."""
+        return time_ms
+
+
+class RealTimeClock(SimulationClock):
+    """Tempo de parede do pygame, limitado a 'fps' quadros por segundo."""
+
+    def __init__(self, fps=DEFAULT_FPS):
+        self.fps = fps
+        self._clock = None
+
+    def now(self):
+        return pygame.time.get_ticks()
+
+    def tick(self):
+        if self._clock is None:
+            self._clock = pygame.time.Clock()
+        return self._clock.tick(self.fps)
+
+
+class FixedStepClock(SimulationClock):
+    """
+    Passo fixo e determinístico: cada tick avança exatamente 'step_ms'.
+
+    Com realtime=True o tick espera o tempo de parede correspondente, para
+    visualização; com realtime=False roda o mais rápido possível.
+    O tempo é calculado a partir do número de ticks, sem acumular erro.
+    """
+
+    def __init__(self, step_ms=FIXED_TIMESTEP_MS, realtime=True):
+        self.step_ms = step_ms
+        self.realtime = realtime
+        self.ticks = 0
+        self._wall_start = None
+
+    @property
+    def now_ms(self):
+        return self.ticks * self.step_ms
+
+    def now(self):
+        return int(self.ticks * self.step_ms)
+
+    def align(self, time_ms):
+        ticks = max(0, math.ceil(time_ms / self.step_ms) - 1)
+        while int(ticks * self.step_ms) < time_ms:
+            ticks += 1
+        return int(ticks * self.step_ms)
+
+    def tick(self):
+        self.ticks += 1
+        if self.realtime:
+            if self._wall_start is None:
+                # Referência de parede alinhada ao tick atual (que pode não ser 1, após seek)
+                self._wall_start = time.perf_counter() - (self.now_ms - self.step_ms) / 1000
+            delay = self._wall_start + self.now_ms / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return self.step_ms
+
+    def reset(self):
+        self.seek(0)
+
+    def seek(self, ticks):
+        """Leva o relógio ao tick 'ticks' (ex.: ao restaurar um snapshot); a espera em tempo real recomeça daqui."""
+        self.ticks = ticks
+        self._wall_start = None
+
+
+class FastClock(FixedStepClock):
+    """Passo fixo sem espera: simula o mais rápido possível."""
+
+    def __init__(self, step_ms=FIXED_TIMESTEP_MS):
+        super().__init__(step_ms, realtime=False)
+
+
+def create_clock(mode="realtime", fps=DEFAULT_FPS):
+    """Cria o relógio para o modo 'realtime', 'fixed' ou 'fast'."""
+    if mode == "realtime":
+        return RealTimeClock(fps)
+    if mode == "fixed":
+        return FixedStepClock(1000 / fps)
+    if mode == "fast":
+        return FastClock(1000 / fps)
+    raise ValueError(f"Modo de relógio desconhecido: {mode!r}")
@@ -0,0 +1,202 @@
+import pickle
+from collections import namedtuple
+
+import py_trees
+
+from compiled_tree import CompiledTree, STATUSES, STATUS_CODES, NO_CHILD
+from batched_tree import BatchedTree
+
+# Campos simples do FuzzyAvatar que mudam durante a partida
+# (rect, animação atual, last_update e target são tratados à parte)
+AVATAR_FIELDS = (
+    'hp', 'max_hp', 'attack_damage', 'anger', 'berserk_mode',
+    'times_hit', 'successful_attacks', 'consecutive_hits', 'consecutive_misses', 'last_damage_received',
+    'current_frame', 'facing_right', 'is_attacking', 'is_moving', 'has_dealt_damage', 'attack_finished',
+)
+
+# Animações possíveis (current_frames é gravado como o índice nesta tupla)
+ANIMATIONS = ('idle_frames', 'run_frames', 'attack_frames')
+
+NO_TARGET = -1
+
+# Estado completo de uma partida: ticks do relógio de passo fixo (None para
+# tempo real), uma tupla por avatar, o estado de cada árvore e os eventos
+# pendentes do EventScheduler (None sem scheduler)
+Snapshot = namedtuple('Snapshot', ['clock_ticks', 'avatars', 'trees', 'events'], defaults=(None,))
+
+
+def _animation_index(avatar):
+    frames = avatar.current_frames
+    for index, animation in enumerate(ANIMATIONS):
+        if frames is getattr(avatar, animation):
+            return index
+    return 0
+
+
+def _preorder(node):
+    nodes = [node]
+    for child in getattr(node, 'children', ()):
+        nodes.extend(_preorder(child))
+    return nodes
+
+
+def _leaf_fields(behaviour):
+    # Estado interno declarado pelos nós folha (ex.: AIAttack.attack_in_progress)
+    return getattr(behaviour, 'state_fields', ())
+
+
+# ----- Estado das Árvores -----
+class _PyTreesState:
+    """Status e filho atual de cada nó de uma árvore py_trees, mais os campos das folhas."""
+
+    def __init__(self, root):
+        self.nodes = _preorder(root)
+        self.fields = [_leaf_fields(node) for node in self.nodes]
+
+    def capture(self):
+        state = []
+        for node, fields in zip(self.nodes, self.fields):
+            current_child = getattr(node, 'current_child', None)
+            child_index = NO_CHILD if current_child is None else node.children.index(current_child)
+            state.append((STATUS_CODES[node.status], child_index,
+                          tuple(getattr(node, field) for field in fields)))
+        return tuple(state)
+
+    def restore(self, state):
+        for node, fields, (status, child_index, values) in zip(self.nodes, self.fields, state):
+            node.status = STATUSES[status]
+            if hasattr(node, 'current_child'):
+                node.current_child = None if child_index == NO_CHILD else node.children[child_index]
+            for field, value in zip(fields, values):
+                setattr(node, field, value)
+
+
+class _CompiledTreeState:
+    """Listas de status/filho atual de CompiledTree, mais os campos das folhas."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.leaves = [(behaviour, _leaf_fields(behaviour)) for behaviour in tree.structure.behaviours
+                       if _leaf_fields(behaviour)]
+
+    def capture(self):
+        return (tuple(self.tree.status), tuple(self.tree.current_child),
+                tuple(tuple(getattr(behaviour, field) for field in fields) for behaviour, fields in self.leaves))
+
+    def restore(self, state):
+        status, current_child, leaf_values = state
+        self.tree.status[:] = status
+        self.tree.current_child[:] = current_child
+        for (behaviour, fields), values in zip(self.leaves, leaf_values):
+            for field, value in zip(fields, values):
+                setattr(behaviour, field, value)
+
+
+class _BatchedTreeState:
+    """Arrays (nós x agentes) de BatchedTree e os arrays de estado das folhas."""
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def capture(self):
+        return (self.tree.status.copy(), self.tree.current_child.copy(),
+                tuple(None if leaf_state is None else {key: array.copy() for key, array in leaf_state.items()}
+                      for leaf_state in self.tree.leaf_state))
+
+    def restore(self, state):
+        status, current_child, leaf_states = state
+        self.tree.status[...] = status
+        self.tree.current_child[...] = current_child
+        for leaf_state, saved in zip(self.tree.leaf_state, leaf_states):
+            if leaf_state is not None:
+                for key, array in leaf_state.items():
+                    array[...] = saved[key]
+
+
+def _tree_state(tree):
+    if isinstance(tree, CompiledTree):
+        return _CompiledTreeState(tree)
+    if isinstance(tree, BatchedTree):
+        return _BatchedTreeState(tree)
+    if isinstance(tree, py_trees.behaviour.Behaviour):
+        return _PyTreesState(tree)
+    raise TypeError(f"Árvore não suportada pelo snapshot: {type(tree).__name__}")
+
+
+# ----- Snapshot da Partida -----
+class SimulationState:
+    """
+    Salva e restaura o estado completo de uma partida: todos os campos
+    dinâmicos dos avatares (HP, raiva, contadores, posição, animação,
+    alvo), o estado de cada nó das árvores (status, filho em execução dos
+    compostos e campos das folhas, como AIAttack.attack_in_progress) e o
+    tempo do relógio de passo fixo.
+
+    Os objetos (avatares, árvores, relógio) são ligados uma vez no
+    construtor; capture() devolve um Snapshot imutável, feito só de tuplas
+    e números, e restore() recoloca esses valores nos mesmos objetos, sem
+    recriar nada - barato o bastante para ramificar a partida centenas de
+    vezes por segundo (lookahead, simulações "e se").
+    Com um relógio de tempo real, last_update é restaurado relativo ao
+    instante atual, então as animações seguem do mesmo ponto.
+    Avatares retirados de um SpatialIndex não são reinseridos por restore().
+    Com um EventScheduler (golpes agendados), os eventos pendentes também
+    entram no snapshot; eles referenciam os nós da árvore, então esse
+    snapshot só vale em memória (snapshot_to_bytes não o serializa).
+    """
+
+    def __init__(self, avatars, trees=(), clock=None, scheduler=None):
+        self.avatars = list(avatars)
+        self.clock = clock
+        self.scheduler = scheduler
+        self._positions = {id(avatar): index for index, avatar in enumerate(self.avatars)}
+        self._trees = [_tree_state(tree) for tree in trees]
+
+    def capture(self):
+        clock = self.clock
+        clock_ticks = getattr(clock, 'ticks', None)
+        avatars = []
+        for avatar in self.avatars:
+            target = avatar.target
+            if target is None:
+                target_index = NO_TARGET
+            elif id(target) in self._positions:
+                target_index = self._positions[id(target)]
+            else:
+                raise ValueError(f"Alvo de {avatar.name} ({target.name}) não faz parte do snapshot")
+            avatars.append((
+                tuple(getattr(avatar, field) for field in AVATAR_FIELDS),
+                avatar.rect.x, avatar.rect.y, _animation_index(avatar),
+                avatar.clock.now() - avatar.last_update, target_index,
+            ))
+        events = self.scheduler.capture() if self.scheduler is not None else None
+        return Snapshot(clock_ticks, tuple(avatars), tuple(tree.capture() for tree in self._trees), events)
+
+    def restore(self, snapshot):
+        if snapshot.clock_ticks is not None:
+            self.clock.seek(snapshot.clock_ticks)
+        for avatar, (values, x, y, animation, update_age, target_index) in zip(self.avatars, snapshot.avatars):
+            for field, value in zip(AVATAR_FIELDS, values):
+                setattr(avatar, field, value)
+            avatar.rect.x = x
+            avatar.rect.y = y
+            avatar.current_frames = getattr(avatar, ANIMATIONS[animation])
+            avatar.last_update = avatar.clock.now() - update_age
+            avatar.target = None if target_index == NO_TARGET else self.avatars[target_index]
+            if avatar.spatial_index is not None and avatar in avatar.spatial_index:
+                avatar.spatial_index.update(avatar)
+            if avatar.animation_scheduler is not None:
+                avatar.animation_scheduler.reschedule(avatar)
+        for tree, state in zip(self._trees, snapshot.trees):
+            tree.restore(state)
+        if self.scheduler is not None:
+            self.scheduler.restore(snapshot.events)
+
+
+def snapshot_to_bytes(snapshot):
+    """Serializa um Snapshot (ex.: para guardar em disco ou enviar a outro processo)."""
+    return pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def snapshot_from_bytes(data):
+    return pickle.loads(data)
@@ -0,0 +1,82 @@
+from bisect import bisect_left, insort
+
+
+# ----- Índice Espacial (varredura ordenada em x) -----
+class SpatialIndex:
+    """
+    Índice espacial dos avatares por posição horizontal (rect.centerx).
+
+    Cada equipe guarda uma lista ordenada de (x, ordem de inserção), então o
+    inimigo mais próximo de um ponto sai de uma busca binária por equipe
+    inimiga (os vizinhos à esquerda e à direita de x), em vez de comparar
+    todos os pares. Como o duelo só se move em x, a lista ordenada não
+    degrada quando muitos avatares se amontoam no mesmo ponto, como
+    aconteceria com as células de uma grade uniforme.
+    Quando um avatar se move, update() reposiciona só a entrada dele.
+    """
+
+    def __init__(self):
+        self._keys = {}  # {equipe: [(x, ordem), ...] ordenada}
+        self._avatars = {}  # {ordem: avatar}
+        self._entries = {}  # {avatar: (equipe, x, ordem)}
+        self._inserted = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, avatar):
+        return avatar in self._entries
+
+    def insert(self, avatar, team):
+        """Adiciona o avatar ao índice como membro de 'team'."""
+        if avatar in self._entries:
+            self.remove(avatar)
+        order = self._inserted
+        self._inserted += 1
+        x = avatar.rect.centerx
+        insort(self._keys.setdefault(team, []), (x, order))
+        self._avatars[order] = avatar
+        self._entries[avatar] = (team, x, order)
+        avatar.team = team
+        avatar.spatial_index = self
+
+    def remove(self, avatar):
+        """Retira o avatar do índice (ex.: quando é derrotado)."""
+        team, x, order = self._entries.pop(avatar)
+        keys = self._keys[team]
+        del keys[bisect_left(keys, (x, order))]
+        del self._avatars[order]
+        avatar.spatial_index = None
+
+    def update(self, avatar):
+        """Atualiza a posição do avatar depois de uma mudança em rect.x."""
+        team, x, order = self._entries[avatar]
+        new_x = avatar.rect.centerx
+        if new_x == x:
+            return
+        keys = self._keys[team]
+        del keys[bisect_left(keys, (x, order))]
+        insort(keys, (new_x, order))
+        self._entries[avatar] = (team, new_x, order)
+
+    def nearest_enemy(self, avatar):
+        """Avatar de outra equipe mais próximo em x (o mais antigo no índice, em caso de empate)."""
+        x = avatar.rect.centerx
+        best_key = None
+        for team, keys in self._keys.items():
+            if team == avatar.team or not keys:
+                continue
+            # Primeiro à direita (x' >= x) e o mais antigo do grupo mais próximo à esquerda
+            i = bisect_left(keys, (x, -1))
+            if i < len(keys):
+                right_x, order = keys[i]
+                key = (right_x - x, order)
+                if best_key is None or key < best_key:
+                    best_key = key
+            if i > 0:
+                left_x = keys[i - 1][0]
+                order = keys[bisect_left(keys, (left_x, -1))][1]
+                key = (x - left_x, order)
+                if best_key is None or key < best_key:
+                    best_key = key
+        return None if best_key is None else self._avatars[best_key[1]]
@@ -0,0 +1,49 @@
+import pygame
+
+# Brilho vermelho semitransparente do modo berserk
+BERSERK_TINT = (255, 0, 0, 30)
+
+
+def tint_frame(frame, color=BERSERK_TINT):
+    """Cópia do quadro com uma camada de cor semitransparente por cima."""
+    overlay = pygame.Surface(frame.get_size(), pygame.SRCALPHA)
+    overlay.fill(color)
+    tinted = frame.copy()
+    tinted.blit(overlay, (0, 0))
+    return tinted
+
+
+# ----- Cache de Variações dos Quadros -----
+class SpriteFrameCache:
+    """
+    Guarda, para cada animação, as quatro variações de cada quadro:
+    original, espelhado, com brilho berserk e espelhado com brilho.
+
+    As variações são criadas uma única vez (no carregamento), então desenhar
+    um quadro vira um único blit, sem flip nem Surface temporária por quadro.
+    """
+
+    def __init__(self, animations=()):
+        self._variants = {}
+        for frames in animations:
+            self.add(frames)
+
+    def add(self, frames):
+        flipped = [pygame.transform.flip(frame, True, False) for frame in frames]
+        # A entrada guarda a própria lista: enquanto ela existir, seu id não é
+        # reaproveitado, e get() confere a identidade antes de usar a entrada
+        self._variants[id(frames)] = (frames, {
+            (False, False): list(frames),
+            (True, False): flipped,
+            (False, True): [tint_frame(frame) for frame in frames],
+            (True, True): [tint_frame(frame) for frame in flipped],
+        })
+
+    def get(self, frames, index, flipped=False, tinted=False):
+        """Quadro 'index' da animação 'frames' na variação pedida."""
+        entry = self._variants.get(id(frames))
+        if entry is None or entry[0] is not frames:
+            # Animação não registrada no carregamento: cria as variações agora
+            self.add(frames)
+            entry = self._variants[id(frames)]
+        return entry[1][(flipped, tinted)][index]
@@ -0,0 +1,239 @@
+import json
+import re
+import socket
+import threading
+import time
+from collections import deque
+
+import py_trees
+from py_trees.common import Status
+
+from compiled_tree import CompiledTree, INVALID, NO_CHILD
+from event_log import EventLog, event_log, DEBUG, INFO, DAMAGE_RECEIVED, TICK_SAMPLE
+
+# Tamanho máximo de um datagrama statsd (cabe num pacote Ethernet sem fragmentar)
+STATSD_MAX_PACKET = 1432
+
+
+def decision_path(tree):
+    """
+    Caminho de decisão do último tick: nomes dos nós da raiz até a folha,
+    seguindo o filho atual de cada composto (ex.: AI Root > AttackSelector >
+    NormalAttackSeq > AIAttack). Funciona com árvores py_trees e CompiledTree.
+    """
+    path = []
+    if isinstance(tree, CompiledTree):
+        names, status, current_child = tree.structure.names, tree.status, tree.current_child
+        index = 0
+        while index != NO_CHILD and status[index] != INVALID:
+            path.append(names[index])
+            index = current_child[index]
+    elif isinstance(tree, py_trees.behaviour.Behaviour):
+        node = tree
+        while node is not None and node.status != Status.INVALID:
+            path.append(node.name)
+            node = getattr(node, 'current_child', None)
+    else:
+        raise TypeError(f"Árvore não suportada pela telemetria: {type(tree).__name__}")
+    return path
+
+
+# ----- Destinos da Telemetria -----
+# Mesma interface dos destinos do event_log (write_events), então também
+# podem ser ligados ao registro compartilhado com event_log.add_sink()
+class RingBufferSink:
+    """Guarda os últimos 'capacity' eventos em memória (ex.: para inspecionar uma simulação longa)."""
+
+    def __init__(self, capacity=4096):
+        self._events = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def write_events(self, events):
+        with self._lock:
+            self._events.extend(events)
+
+    def samples(self):
+        """Campos (dicts) dos eventos guardados, do mais antigo ao mais recente."""
+        with self._lock:
+            return [event.fields for event in self._events]
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+
+class NDJSONSink:
+    """Escreve um objeto JSON por linha (kind, time e os campos do evento) num arquivo ou stream."""
+
+    def __init__(self, target):
+        if isinstance(target, str):
+            self.stream = open(target, 'w', encoding='utf-8')
+            self._owns_stream = True
+        else:
+            self.stream = target
+            self._owns_stream = False
+
+    def write_events(self, events):
+        dumps = json.dumps
+        self.stream.write("".join(dumps({'kind': event.kind, 'time': event.time, **event.fields}, default=str)
+                                  + "\n" for event in events))
+        self.stream.flush()
+
+    def close(self):
+        if self._owns_stream and not self.stream.closed:
+            self.stream.close()
+
+
+def _metric_name(name):
+    return re.sub(r'[^A-Za-z0-9_]+', '_', str(name)).strip('_')
+
+
+class StatsdSink:
+    """
+    Envia as amostras como métricas statsd por UDP (padrão: 127.0.0.1:8125):
+    gauges de distância, HP, raiva e berserk de cada avatar, o tempo do
+    quadro (ms), o dano recebido (contador) e a folha escolhida por cada
+    árvore. Outros eventos viram o contador <prefixo>.events.<tipo>.
+    As linhas são agrupadas em datagramas de até STATSD_MAX_PACKET bytes; o
+    socket não bloqueia e datagramas que falham são só contados em 'dropped'.
+    """
+
+    def __init__(self, address=('127.0.0.1', 8125), prefix='duel', max_packet=STATSD_MAX_PACKET):
+        self.address = address
+        self.prefix = _metric_name(prefix)
+        self.max_packet = max_packet
+        self.dropped = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def metrics(self, event):
+        """Linhas statsd de um evento."""
+        prefix = self.prefix
+        if event.kind != TICK_SAMPLE:
+            return [f"{prefix}.events.{_metric_name(event.kind)}:1|c"]
+        fields = event.fields
+        lines = []
+        if fields['distance'] is not None:
+            lines.append(f"{prefix}.distance:{fields['distance']}|g")
+        if fields['frame_ms'] is not None:
+            lines.append(f"{prefix}.frame_ms:{fields['frame_ms']:.3f}|ms")
+        for avatar in fields['avatars']:
+            name = f"{prefix}.{_metric_name(avatar['name'])}"
+            lines.append(f"{name}.hp:{avatar['hp']}|g")
+            lines.append(f"{name}.anger:{avatar['anger']:.3f}|g")
+            lines.append(f"{name}.berserk:{int(avatar['berserk'])}|g")
+        for damage in fields['damage']:
+            lines.append(f"{prefix}.{_metric_name(damage['avatar'])}.damage:{damage['damage']}|c")
+        for tree, path in enumerate(fields['paths']):
+            if path:
+                lines.append(f"{prefix}.decision.{tree}.{_metric_name(path[-1])}:1|c")
+        return lines
+
+    def write_events(self, events):
+        packet = []
+        size = 0
+        for event in events:
+            for line in self.metrics(event):
+                if packet and size + len(line) + 1 > self.max_packet:
+                    self._send(packet)
+                    packet = []
+                    size = 0
+                packet.append(line)
+                size += len(line) + 1
+        if packet:
+            self._send(packet)
+
+    def _send(self, lines):
+        try:
+            self._socket.sendto("\n".join(lines).encode(), self.address)
+        except OSError:
+            self.dropped += 1
+
+    def close(self):
+        self._socket.close()
+
+
+# ----- Telemetria por Tick -----
+class Telemetry:
+    """
+    Amostras de telemetria do combate, uma por tick (ou a cada 'every'
+    ticks): distância entre os dois primeiros avatares, HP, raiva e berserk
+    de cada um, os eventos de dano de receive_damage desde a última amostra,
+    o caminho de decisão de cada árvore e o tempo do quadro.
+
+    record_tick() só monta a amostra e a coloca no buffer de um EventLog
+    próprio (evento TICK_SAMPLE); a thread desse registro entrega as
+    amostras em lotes aos destinos ('sinks': RingBufferSink, NDJSONSink,
+    StatsdSink ou qualquer objeto com write_events), então o loop nunca
+    espera pela escrita. Se os destinos não acompanharem, as amostras mais
+    antigas do buffer são descartadas e contadas em 'dropped'.
+    Serve tanto para o loop do pygame quanto para partidas headless.
+    """
+
+    def __init__(self, avatars, trees=(), sinks=None, every=1, capacity=8192, flush_interval=0.25):
+        self.avatars = list(avatars)
+        self.trees = list(trees)
+        self.sinks = [RingBufferSink()] if sinks is None else list(sinks)
+        self.every = every
+        self.ticks = 0
+        self.stream = EventLog(level=INFO, capacity=capacity, flush_interval=flush_interval, sinks=self.sinks)
+        for tree in self.trees:
+            decision_path(tree)  # Falha já aqui para árvores não suportadas
+        self._damage = []
+        self._last_tick_time = None
+        self._closed = False
+        event_log.add_listener(self._on_event, DEBUG)
+
+    @property
+    def dropped(self):
+        return self.stream.dropped
+
+    def _on_event(self, event):
+        if event.kind == DAMAGE_RECEIVED:
+            fields = event.fields
+            self._damage.append({'avatar': fields['avatar'], 'damage': fields['damage'], 'hp': fields['hp']})
+
+    def record_tick(self, frame_ms=None):
+        """
+        Registra o tick atual. 'frame_ms' é o tempo do quadro; por padrão, o
+        tempo de parede desde a chamada anterior (None na primeira).
+        """
+        now = time.perf_counter()
+        if frame_ms is None and self._last_tick_time is not None:
+            frame_ms = (now - self._last_tick_time) * 1000
+        self._last_tick_time = now
+        self.ticks += 1
+        if self.ticks % self.every:
+            return
+
+        avatars = self.avatars
+        damage, self._damage = self._damage, []
+        self.stream.emit(
+            INFO, TICK_SAMPLE, tick=self.ticks, time_ms=avatars[0].clock.now(), frame_ms=frame_ms,
+            distance=abs(avatars[0].rect.centerx - avatars[1].rect.centerx) if len(avatars) > 1 else None,
+            avatars=[{'name': avatar.name, 'hp': avatar.hp, 'anger': avatar.anger, 'berserk': avatar.berserk_mode}
+                     for avatar in avatars],
+            damage=damage, paths=[decision_path(tree) for tree in self.trees],
+        )
+
+    def flush(self):
+        """Entrega já aos destinos as amostras pendentes."""
+        self.stream.flush()
+
+    def close(self):
+        """Para de ouvir o event_log, entrega o que falta e fecha os destinos."""
+        if self._closed:
+            return
+        self._closed = True
+        event_log.remove_listener(self._on_event)
+        self.stream.close()
+        for sink in self.sinks:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+
+import pygame
+
+# Tamanhos de fonte usados pelo jogo (HUD, tela de vitória e instruções)
+HUD_FONT_SIZE = 24
+VICTORY_FONT_SIZE = 72
+RESTART_FONT_SIZE = 36
+
+_fonts = {}
+
+
+def get_font(size=HUD_FONT_SIZE):
+    """Fonte padrão no tamanho pedido, criada uma única vez por tamanho."""
+    font = _fonts.get(size)
+    if font is None:
+        pygame.font.init()
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+def preload_fonts():
+    """Cria antecipadamente todas as fontes usadas pelo jogo."""
+    for size in (HUD_FONT_SIZE, VICTORY_FONT_SIZE, RESTART_FONT_SIZE):
+        get_font(size)
+
+
+# ----- Cache de Textos Renderizados -----
+class TextCache:
+    """
+    Cache LRU de textos renderizados, indexado por (fonte, texto, cor).
+
+    Um texto só é rasterizado de novo quando o valor exibido muda (ex.: o HP
+    depois de um golpe); nos demais quadros a mesma Surface é reaproveitada.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+# Cache compartilhado por HUD, barras de vida e informações de debug
+text_cache = TextCache()
+
+
+def render_text(text, color, size=HUD_FONT_SIZE):
+    """Renderiza 'text' com a fonte padrão de tamanho 'size', usando o cache compartilhado."""
+    return text_cache.render(get_font(size), text, color)
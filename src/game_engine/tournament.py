@@ -0,0 +1,145 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from headless import run_headless_match
+
+# Largura das faixas dos histogramas de dano (pontos) e de duração (ticks)
+DAMAGE_BIN = 10
+LENGTH_BIN = 60
+
+
+# ----- Agregação Incremental -----
+class TournamentStats:
+    """
+    Estatísticas agregadas de um conjunto de partidas.
+
+    Guarda apenas contadores e histogramas, então cada processo agrega seu
+    lote localmente e os parciais são combinados com merge() conforme chegam.
+    """
+
+    def __init__(self):
+        self.matches = 0
+        self.wins = Counter()  # Vitórias por nome de avatar
+        self.timeouts = 0  # Partidas que atingiram max_ticks sem vencedor
+        self.total_ticks = 0
+        self.min_ticks = None
+        self.max_ticks = None
+        self.length_histogram = Counter()  # Faixa de ticks -> partidas
+        self.hits = 0
+        self.total_damage = 0
+        self.damage_taken = Counter()  # Dano total recebido por avatar
+        self.damage_histogram = Counter()  # Faixa de dano -> golpes
+
+    def add(self, result):
+        """Acumula um MatchResult."""
+        self.matches += 1
+        if result.winner is None:
+            self.timeouts += 1
+        else:
+            self.wins[result.winner] += 1
+
+        self.total_ticks += result.ticks
+        self.min_ticks = result.ticks if self.min_ticks is None else min(self.min_ticks, result.ticks)
+        self.max_ticks = result.ticks if self.max_ticks is None else max(self.max_ticks, result.ticks)
+        self.length_histogram[result.ticks // LENGTH_BIN * LENGTH_BIN] += 1
+
+        for _tick, target, damage in result.hits:
+            self.hits += 1
+            self.total_damage += damage
+            self.damage_taken[target] += damage
+            self.damage_histogram[damage // DAMAGE_BIN * DAMAGE_BIN] += 1
+
+    def merge(self, other):
+        """Combina as estatísticas de outro lote nestas."""
+        self.matches += other.matches
+        self.wins.update(other.wins)
+        self.timeouts += other.timeouts
+        self.total_ticks += other.total_ticks
+        if other.min_ticks is not None:
+            self.min_ticks = other.min_ticks if self.min_ticks is None else min(self.min_ticks, other.min_ticks)
+            self.max_ticks = other.max_ticks if self.max_ticks is None else max(self.max_ticks, other.max_ticks)
+        self.length_histogram.update(other.length_histogram)
+        self.hits += other.hits
+        self.total_damage += other.total_damage
+        self.damage_taken.update(other.damage_taken)
+        self.damage_histogram.update(other.damage_histogram)
+        return self
+
+    def win_rate(self, name):
+        return self.wins[name] / self.matches if self.matches else 0.0
+
+    @property
+    def mean_ticks(self):
+        return self.total_ticks / self.matches if self.matches else 0.0
+
+    @property
+    def mean_damage(self):
+        return self.total_damage / self.hits if self.hits else 0.0
+
+    def summary(self):
+        """Resumo em dicionário (serializável em JSON)."""
+        return {
+            'matches': self.matches,
+            'win_rates': {name: self.win_rate(name) for name in sorted(self.wins)},
+            'timeouts': self.timeouts,
+            'ticks': {'mean': self.mean_ticks, 'min': self.min_ticks, 'max': self.max_ticks},
+            'length_histogram': dict(sorted(self.length_histogram.items())),
+            'hits': self.hits,
+            'mean_damage': self.mean_damage,
+            'damage_taken': dict(self.damage_taken),
+            'damage_histogram': dict(sorted(self.damage_histogram.items())),
+        }
+
+
+# ----- Execução em Lotes -----
+def run_match_chunk(seeds, match_kwargs):
+    """Roda um lote de partidas (uma por semente) e retorna o parcial agregado."""
+    stats = TournamentStats()
+    for seed in seeds:
+        stats.add(run_headless_match(seed=seed, record_stats=False, **match_kwargs))
+    return stats
+
+
+def iter_tournament(matches, base_seed=0, chunk_size=64, max_workers=None, **match_kwargs):
+    """
+    Roda 'matches' partidas headless em paralelo (ProcessPoolExecutor).
+
+    A partida i usa a semente base_seed + i, então o resultado agregado é
+    reproduzível independente do número de processos. O trabalho é dividido
+    em lotes de 'chunk_size' partidas; a cada lote concluído é produzido o
+    agregado parcial (TournamentStats) acumulado até o momento.
+    Os demais argumentos vão para run_headless_match().
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    total = TournamentStats()
+    chunks = [range(start, min(start + chunk_size, matches))
+              for start in range(0, matches, chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_match_chunk, [base_seed + i for i in chunk], match_kwargs)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            total.merge(future.result())
+            yield total
+
+
+def run_tournament(matches, base_seed=0, chunk_size=64, max_workers=None, on_progress=None,
+                   **match_kwargs):
+    """Versão bloqueante de iter_tournament(); on_progress(stats) é chamado a cada lote."""
+    stats = TournamentStats()
+    for stats in iter_tournament(matches, base_seed, chunk_size, max_workers, **match_kwargs):
+        if on_progress is not None:
+            on_progress(stats)
+    return stats
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    total_matches = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    result = run_tournament(total_matches)
+    print(json.dumps(result.summary(), indent=2))
@@ -0,0 +1,235 @@
+import time
+
+import py_trees
+
+from compiled_tree import CompiledTree, STATUS_CODES, STATUSES
+from event_log import event_log, INFO, TREE_PROFILE
+
+
+def _preorder(node, depth=0):
+    nodes = [(node, depth)]
+    for child in getattr(node, 'children', ()):
+        nodes.extend(_preorder(child, depth + 1))
+    return nodes
+
+
+# ----- Estatísticas por Nó -----
+class NodeStats:
+    """Contadores de um nó: chamadas, tempo acumulado (s, com a subárvore) e status retornados."""
+
+    __slots__ = ('name', 'kind', 'depth', 'children', 'calls', 'total_time', 'statuses')
+
+    def __init__(self, name, kind, depth, children):
+        self.name = name
+        self.kind = kind
+        self.depth = depth
+        self.children = children  # Índices dos filhos (pré-ordem)
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.statuses = [0] * len(STATUSES)
+
+
+# ----- Perfil da Árvore -----
+class TreeProfiler:
+    """
+    Instrumentação opcional do tick de uma árvore de comportamento: para
+    cada nó conta as chamadas, o tempo acumulado e a distribuição dos status
+    retornados.
+
+    Funciona com árvores py_trees (create_fuzzy_ai_tree, create_tree) e com
+    CompiledTree. enable() troca o tick de cada nó por uma versão medida (o
+    método tick da instância py_trees, ou a entrada de _tickers na árvore
+    compilada) e disable() devolve os originais, então a árvore sem perfil
+    roda exatamente o código de sempre, sem nenhum custo extra.
+
+    O tempo de cada nó inclui a subárvore (custo acumulado por subárvore);
+    o tempo próprio é esse total menos o dos filhos. Funções fora da árvore
+    (ex.: calculate_fuzzy_damage de um avatar) podem ser medidas junto com
+    add_function(). O relatório sai de report() a qualquer momento ou, com
+    report_interval (s), periodicamente por on_report(profiler) - por
+    padrão um evento TREE_PROFILE no event_log.
+    """
+
+    def __init__(self, tree, name=None, report_interval=None, on_report=None):
+        self.tree = tree
+        if isinstance(tree, CompiledTree):
+            structure = tree.structure
+            depths = [0] * len(structure)
+            for index, children in enumerate(structure.children):
+                for child in children:
+                    depths[child] = depths[index] + 1
+            self.nodes = [NodeStats(name, type(behaviour).__name__, depth, children)
+                          for name, behaviour, depth, children in zip(structure.names, structure.behaviours,
+                                                                      depths, structure.children)]
+        elif isinstance(tree, py_trees.behaviour.Behaviour):
+            nodes = _preorder(tree)
+            positions = {id(node): index for index, (node, _) in enumerate(nodes)}
+            self.nodes = [NodeStats(node.name, type(node).__name__, depth,
+                                    tuple(positions[id(child)] for child in getattr(node, 'children', ())))
+                          for node, depth in nodes]
+            self._behaviours = [node for node, _ in nodes]
+        else:
+            raise TypeError(f"Árvore não suportada pelo perfil: {type(tree).__name__}")
+
+        self.name = name if name is not None else self.nodes[0].name
+        self.report_interval = report_interval
+        self.on_report = on_report if on_report is not None else emit_report
+        self.functions = []  # [(dono, atributo, NodeStats)]
+        self.enabled = False
+        self._original_tickers = None
+        self._last_report = None
+
+    # ----- Ligar / desligar -----
+    def enable(self):
+        if self.enabled:
+            return self
+        if isinstance(self.tree, CompiledTree):
+            self._original_tickers = list(self.tree._tickers)
+            self.tree._tickers[:] = [self._measure_compiled(index, ticker)
+                                     for index, ticker in enumerate(self._original_tickers)]
+        else:
+            for index, node in enumerate(self._behaviours):
+                node.tick = self._measure_py_trees(index, node, node.tick)
+        for owner, attribute, stats in self.functions:
+            setattr(owner, attribute, self._measure_function(stats, getattr(owner, attribute)))
+        self._last_report = time.perf_counter()
+        self.enabled = True
+        return self
+
+    def disable(self):
+        if not self.enabled:
+            return self
+        if isinstance(self.tree, CompiledTree):
+            self.tree._tickers[:] = self._original_tickers
+            self._original_tickers = None
+        else:
+            for node in self._behaviours:
+                del node.tick
+        for owner, attribute, stats in self.functions:
+            delattr(owner, attribute)
+        self.enabled = False
+        return self
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def add_function(self, owner, attribute, label=None):
+        """Mede também owner.attribute (método de instância), ex.: (avatar, 'calculate_fuzzy_damage')."""
+        if attribute in vars(owner):
+            raise ValueError(f"{attribute} já foi substituído na instância")
+        stats = NodeStats(label or f"{getattr(owner, 'name', type(owner).__name__)}.{attribute}",
+                          'function', 0, ())
+        self.functions.append((owner, attribute, stats))
+        if self.enabled:
+            setattr(owner, attribute, self._measure_function(stats, getattr(owner, attribute)))
+        return stats
+
+    def reset(self):
+        for stats in self.nodes:
+            stats.reset()
+        for _, _, stats in self.functions:
+            stats.reset()
+
+    # ----- Versões medidas -----
+    def _measure_py_trees(self, index, node, tick):
+        stats = self.nodes[index]
+        perf_counter = time.perf_counter
+        is_root = index == 0
+
+        def measured_tick():
+            # O nó termina o tick ao produzir a si mesmo (o pai pode parar de iterar logo depois)
+            start = perf_counter()
+            for visited in tick():
+                if visited is node:
+                    stats.total_time += perf_counter() - start
+                    stats.calls += 1
+                    stats.statuses[STATUS_CODES[node.status]] += 1
+                    if is_root and self.report_interval is not None:
+                        self._maybe_report()
+                yield visited
+        return measured_tick
+
+    def _measure_compiled(self, index, ticker):
+        stats = self.nodes[index]
+        perf_counter = time.perf_counter
+        is_root = index == 0
+
+        def measured_ticker(node_index):
+            start = perf_counter()
+            status = ticker(node_index)
+            stats.total_time += perf_counter() - start
+            stats.calls += 1
+            stats.statuses[status] += 1
+            if is_root and self.report_interval is not None:
+                self._maybe_report()
+            return status
+        return measured_ticker
+
+    @staticmethod
+    def _measure_function(stats, function):
+        perf_counter = time.perf_counter
+
+        def measured_function(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.total_time += perf_counter() - start
+                stats.calls += 1
+        return measured_function
+
+    def _maybe_report(self):
+        now = time.perf_counter()
+        if now - self._last_report >= self.report_interval:
+            self._last_report = now
+            self.on_report(self)
+
+    # ----- Relatório -----
+    def self_time(self, index):
+        """Tempo do nó sem o dos filhos (s)."""
+        stats = self.nodes[index]
+        return stats.total_time - sum(self.nodes[child].total_time for child in stats.children)
+
+    def rows(self):
+        """Uma linha (dict) por nó em pré-ordem, mais uma por função de add_function()."""
+        rows = []
+        for index, stats in enumerate(self.nodes):
+            rows.append({
+                'name': stats.name, 'kind': stats.kind, 'depth': stats.depth, 'calls': stats.calls,
+                'total_s': stats.total_time, 'self_s': self.self_time(index),
+                'statuses': {STATUSES[code].name: count for code, count in enumerate(stats.statuses) if count},
+            })
+        for _, _, stats in self.functions:
+            rows.append({'name': stats.name, 'kind': stats.kind, 'depth': 0, 'calls': stats.calls,
+                         'total_s': stats.total_time, 'self_s': stats.total_time, 'statuses': {}})
+        return rows
+
+    def report(self):
+        """Tabela de texto com o perfil de cada nó (indentado pela profundidade)."""
+        lines = [f"Perfil da árvore {self.name}",
+                 f"{'nó':40} {'chamadas':>9} {'total ms':>10} {'próprio ms':>11} {'us/chamada':>11}"
+                 f" {'SUCCESS':>8} {'FAILURE':>8} {'RUNNING':>8}"]
+        for row in self.rows():
+            label = ("  " * row['depth'] + row['name'])[:40]
+            per_call = row['total_s'] / row['calls'] * 1e6 if row['calls'] else 0.0
+            statuses = row['statuses']
+            lines.append(f"{label:40} {row['calls']:>9} {row['total_s'] * 1e3:>10.2f} {row['self_s'] * 1e3:>11.2f}"
+                         f" {per_call:>11.2f} {statuses.get('SUCCESS', 0):>8} {statuses.get('FAILURE', 0):>8}"
+                         f" {statuses.get('RUNNING', 0):>8}")
+        return "\n".join(lines)
+
+
+def emit_report(profiler):
+    """Envia o relatório do perfil ao event_log (evento TREE_PROFILE, nível INFO)."""
+    event_log.emit(INFO, TREE_PROFILE, tree=profiler.name, report=profiler.report())
+
+
+def profile_tree(tree, name=None, report_interval=None, on_report=None):
+    """Cria e liga um TreeProfiler para a árvore."""
+    return TreeProfiler(tree, name, report_interval, on_report).enable()
@@ -0,0 +1,384 @@
+import json
+import math
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from fuzzy_damage import (FuzzyDamageController, ANGER_RANGE, HP_PERCENTAGE_RANGE, DAMAGE_UNIVERSE,
+                          ANGER_TERMS, HP_PERCENTAGE_TERMS, DAMAGE_TERMS)
+from fuzzy_avatar import ANGER_PARAMETERS
+from headless import run_headless_match
+from tournament import TournamentStats
+
+# Variáveis fuzzy ajustáveis: nome -> (triângulos padrão, faixa do universo)
+FUZZY_VARIABLES = {
+    'anger': (ANGER_TERMS, ANGER_RANGE),
+    'hp_percentage': (HP_PERCENTAGE_TERMS, HP_PERCENTAGE_RANGE),
+    'damage': (DAMAGE_TERMS, (float(DAMAGE_UNIVERSE[0]), float(DAMAGE_UNIVERSE[-1]))),
+}
+
+# Casas decimais guardadas nas configurações (e nas chaves do cache)
+CONFIG_DECIMALS = 3
+
+
+# ----- Espaço de Parâmetros -----
+Parameter = namedtuple('Parameter', ['name', 'low', 'high'])
+Parameter.__doc__ = "Parâmetro ajustável e a faixa em que a busca o sorteia."
+
+TuningResult = namedtuple('TuningResult', ['config', 'score', 'summary'])
+TuningResult.__doc__ = "Configuração avaliada, sua nota (menor é melhor) e o resumo do torneio."
+
+
+def fuzzy_parameters(spread=0.2):
+    """
+    Vértices dos triângulos de pertinência como parâmetros
+    '<variável>.<termo>.<índice>' (ex.: 'anger.high.1'), cada um variando
+    +-spread da largura do universo em torno do valor padrão. Os vértices
+    nas bordas do universo ficam fixos, então os termos extremos continuam
+    cobrindo as entradas extremas.
+    """
+    parameters = []
+    for variable, (terms, (low, high)) in FUZZY_VARIABLES.items():
+        width = (high - low) * spread
+        for term, abc in terms.items():
+            for index, value in enumerate(abc):
+                if value in (low, high):
+                    continue
+                parameters.append(Parameter(f"{variable}.{term}.{index}",
+                                            max(low, value - width), min(high, value + width)))
+    return parameters
+
+
+# Ganhos de raiva: de metade ao dobro do valor original; limiares do berserk em faixas próprias
+ANGER_PARAMETER_SPACE = [
+    Parameter(name, value / 2, value * 2) for name, value in ANGER_PARAMETERS.items()
+    if name not in ('berserk_enter_anger', 'berserk_exit_anger')
+] + [
+    Parameter('berserk_enter_anger', 7.0, 13.0),
+    Parameter('berserk_exit_anger', 2.0, 8.0),
+]
+
+DEFAULT_SPACE = fuzzy_parameters() + ANGER_PARAMETER_SPACE
+
+
+def default_config():
+    """Configuração original do jogo: todos os vértices e parâmetros de raiva ajustáveis."""
+    config = {}
+    for variable, (terms, (low, high)) in FUZZY_VARIABLES.items():
+        for term, abc in terms.items():
+            for index, value in enumerate(abc):
+                if value not in (low, high):
+                    config[f"{variable}.{term}.{index}"] = float(value)
+    config.update((name, float(value)) for name, value in ANGER_PARAMETERS.items())
+    return config
+
+
+def split_config(config):
+    """Separa uma configuração em ({variável: triângulos}, parâmetros de raiva)."""
+    terms = {variable: {term: list(abc) for term, abc in default_terms.items()}
+             for variable, (default_terms, _) in FUZZY_VARIABLES.items()}
+    anger_params = {}
+    for name, value in config.items():
+        if name in ANGER_PARAMETERS:
+            anger_params[name] = value
+            continue
+        variable, _, rest = name.partition('.')
+        term, _, index = rest.partition('.')
+        if variable not in terms or term not in terms[variable] or index not in ('0', '1', '2'):
+            raise ValueError(f"Parâmetro de tuning desconhecido: {name}")
+        terms[variable][term][int(index)] = value
+    return terms, anger_params
+
+
+def normalize_config(config):
+    """
+    Configuração completa e válida: parte da original, arredonda os valores,
+    ordena os vértices de cada triângulo (a <= b <= c) e mantém o limiar de
+    saída do berserk abaixo do de entrada.
+    """
+    normalized = default_config()
+    normalized.update((name, round(float(value), CONFIG_DECIMALS)) for name, value in config.items())
+    terms, _ = split_config(normalized)
+    for variable, variable_terms in terms.items():
+        for term, abc in variable_terms.items():
+            for index, value in enumerate(sorted(abc)):
+                name = f"{variable}.{term}.{index}"
+                if name in normalized:
+                    normalized[name] = value
+    if normalized['berserk_exit_anger'] > normalized['berserk_enter_anger']:
+        normalized['berserk_exit_anger'], normalized['berserk_enter_anger'] = (
+            normalized['berserk_enter_anger'], normalized['berserk_exit_anger'])
+    return normalized
+
+
+def load_config(path):
+    """Lê uma configuração salva em JSON (ex.: a saída de python tuning.py --output)."""
+    with open(path, encoding='utf-8') as config_file:
+        return normalize_config(json.load(config_file))
+
+
+# ----- Partidas com uma Configuração -----
+class TunedDamage:
+    """
+    damage_table com os triângulos de uma configuração (FuzzyDamageController
+    próprio). Entradas sem nenhuma regra ativa, possíveis com triângulos que
+    não se sobrepõem, recebem o menor dano do universo.
+    """
+
+    def __init__(self, terms):
+        self.controller = FuzzyDamageController(anger_terms=terms['anger'],
+                                                hp_percentage_terms=terms['hp_percentage'],
+                                                damage_terms=terms['damage'])
+
+    def compute(self, anger, hp_percentage):
+        damage = self.controller.compute(anger, hp_percentage)
+        return FUZZY_VARIABLES['damage'][1][0] if math.isnan(damage) else damage
+
+
+def match_setup(config):
+    """Argumentos de run_headless_match() para a configuração: damage_table e anger_params."""
+    terms, anger_params = split_config(normalize_config(config))
+    return {'damage_table': TunedDamage(terms), 'anger_params': anger_params}
+
+
+def run_config_chunk(config, seeds, match_kwargs):
+    """Roda um lote de partidas com a configuração e retorna o parcial agregado (TournamentStats)."""
+    setup = match_setup(config)
+    stats = TournamentStats()
+    for seed in seeds:
+        stats.add(run_headless_match(seed=seed, record_stats=False, **setup, **match_kwargs))
+    return stats
+
+
+# ----- Objetivos (menor é melhor) -----
+def match_length_objective(target_ticks):
+    """Distância relativa entre a duração média das partidas e 'target_ticks'."""
+    def objective(summary):
+        return abs(summary['ticks']['mean'] - target_ticks) / target_ticks
+    return objective
+
+
+def win_parity_objective(summary):
+    """Diferença entre as taxas de vitória de avatarA e avatarB (0 = equilíbrio)."""
+    win_rates = summary['win_rates']
+    return abs(win_rates.get('avatarA', 0.0) - win_rates.get('avatarB', 0.0))
+
+
+def combined_objective(target_ticks=None, parity_weight=1.0, length_weight=1.0, timeout_weight=1.0):
+    """Soma ponderada de paridade, duração (se 'target_ticks') e fração de partidas sem vencedor."""
+    length = match_length_objective(target_ticks) if target_ticks is not None else None
+
+    def objective(summary):
+        score = parity_weight * win_parity_objective(summary)
+        if length is not None:
+            score += length_weight * length(summary)
+        if summary['matches']:
+            score += timeout_weight * summary['timeouts'] / summary['matches']
+        return score
+    return objective
+
+
+# ----- Cache de Avaliações -----
+class EvaluationCache:
+    """
+    Resumos de torneio já calculados, por configuração e condições das
+    partidas (quantidade, semente base e argumentos de run_headless_match).
+    Com 'path' o cache é lido de e gravado num arquivo JSON, então buscas
+    repetidas ou retomadas não rodam de novo as mesmas partidas.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.hits = 0
+        self._entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as cache_file:
+                self._entries = json.load(cache_file)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(config, settings):
+        return json.dumps({'config': config, 'settings': settings}, sort_keys=True, default=str)
+
+    def get(self, key):
+        summary = self._entries.get(key)
+        if summary is not None:
+            self.hits += 1
+        return summary
+
+    def put(self, key, summary):
+        self._entries[key] = summary
+
+    def save(self):
+        if self.path is None:
+            return
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(self._entries, cache_file)
+        os.replace(temporary_path, self.path)
+
+
+# ----- Busca -----
+class Tuner:
+    """
+    Busca configurações (vértices das funções de pertinência, ganhos de
+    raiva e limiares do berserk) que minimizam 'objective(summary)', onde
+    summary é o resumo (TournamentStats.summary) de 'matches' partidas
+    headless com as sementes base_seed, base_seed + 1, ...
+
+    As configurações de cada rodada são avaliadas juntas: todos os lotes
+    (configuração x 'chunk_size' partidas) vão para o mesmo
+    ProcessPoolExecutor e os resumos ficam no EvaluationCache, então uma
+    configuração repetida não é jogada de novo. Com max_workers=1 tudo roda
+    no próprio processo. Os demais argumentos vão para run_headless_match()
+    (padrão: compiled_trees=True, mesmo resultado do py_trees).
+    """
+
+    def __init__(self, objective, space=None, matches=64, base_seed=0, chunk_size=16, max_workers=None,
+                 cache=None, **match_kwargs):
+        self.objective = objective
+        self.space = list(DEFAULT_SPACE if space is None else space)
+        self.matches = matches
+        self.base_seed = base_seed
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.cache = cache if cache is not None else EvaluationCache()
+        match_kwargs.setdefault('compiled_trees', True)
+        self.match_kwargs = match_kwargs
+        self.settings = {'matches': matches, 'base_seed': base_seed, 'match_kwargs': match_kwargs}
+        self.history = []  # TuningResult de cada avaliação, na ordem
+        self.best = None
+
+    # ----- Avaliação -----
+    def evaluate(self, configs):
+        """Avalia as configurações (em paralelo, com cache); retorna um TuningResult por configuração."""
+        configs = [normalize_config(config) for config in configs]
+        keys = [EvaluationCache.key(config, self.settings) for config in configs]
+        summaries = {}
+        pending = {}
+        for key, config in zip(keys, configs):
+            if key not in summaries and key not in pending:
+                summary = self.cache.get(key)
+                if summary is None:
+                    pending[key] = config
+                else:
+                    summaries[key] = summary
+
+        if pending:
+            seeds = [self.base_seed + i for i in range(self.matches)]
+            chunks = [seeds[start:start + self.chunk_size] for start in range(0, self.matches, self.chunk_size)]
+            stats = {key: TournamentStats() for key in pending}
+            if self.max_workers == 1:
+                for key, config in pending.items():
+                    for chunk in chunks:
+                        stats[key].merge(run_config_chunk(config, chunk, self.match_kwargs))
+            else:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    futures = {executor.submit(run_config_chunk, config, chunk, self.match_kwargs): key
+                               for key, config in pending.items() for chunk in chunks}
+                    for future in as_completed(futures):
+                        stats[futures[future]].merge(future.result())
+            for key, key_stats in stats.items():
+                # Ida e volta pelo JSON: o mesmo formato dos resumos lidos do arquivo do cache
+                summaries[key] = json.loads(json.dumps(key_stats.summary()))
+                self.cache.put(key, summaries[key])
+            self.cache.save()
+
+        results = []
+        for key, config in zip(keys, configs):
+            result = TuningResult(config, self.objective(summaries[key]), summaries[key])
+            results.append(result)
+            self.history.append(result)
+            if self.best is None or result.score < self.best.score:
+                self.best = result
+        return results
+
+    # ----- Coordenadas normalizadas (0 a 1 em cada parâmetro do espaço) -----
+    def to_unit(self, config):
+        return [min(1.0, max(0.0, (config[p.name] - p.low) / (p.high - p.low))) if p.high > p.low else 0.5
+                for p in self.space]
+
+    def from_unit(self, point):
+        config = default_config()
+        for parameter, value in zip(self.space, point):
+            config[parameter.name] = parameter.low + min(1.0, max(0.0, value)) * (parameter.high - parameter.low)
+        return config
+
+    # ----- Otimizadores -----
+    def random_search(self, iterations, batch_size=8, seed=0, include_default=True):
+        """
+        Sorteia 'iterations' configurações uniformemente no espaço, avaliadas
+        em rodadas de 'batch_size'; retorna a melhor (TuningResult).
+        """
+        rng = random.Random(seed)
+        candidates = [default_config()] if include_default else []
+        candidates += [self.from_unit([rng.random() for _ in self.space]) for _ in range(iterations)]
+        for start in range(0, len(candidates), batch_size):
+            self.evaluate(candidates[start:start + batch_size])
+        return self.best
+
+    def evolve(self, generations, population=8, elite=None, sigma=0.2, min_sigma=0.02, learning_rate=0.5,
+               seed=0):
+        """
+        Estratégia evolutiva (mu, lambda) com passo adaptado por parâmetro,
+        uma versão diagonal simplificada do CMA-ES: a cada geração sorteia
+        'population' configurações em torno da média atual (gaussiana com
+        desvio sigma por coordenada normalizada), avalia todas juntas, move a
+        média para a dos 'elite' melhores e ajusta cada sigma pela dispersão
+        da elite. Começa na configuração original; retorna a melhor.
+        """
+        rng = random.Random(seed)
+        elite = elite if elite is not None else max(1, population // 4)
+        mean = self.to_unit(default_config())
+        sigmas = [sigma] * len(mean)
+        self.evaluate([default_config()])
+        for _ in range(generations):
+            points = [[min(1.0, max(0.0, m + s * rng.gauss(0.0, 1.0))) for m, s in zip(mean, sigmas)]
+                      for _ in range(population)]
+            results = self.evaluate([self.from_unit(point) for point in points])
+            ranked = [point for _, point in sorted(zip(results, points), key=lambda pair: pair[0].score)][:elite]
+            new_mean = [sum(point[i] for point in ranked) / elite for i in range(len(mean))]
+            for i, old in enumerate(mean):
+                spread = math.sqrt(sum((point[i] - old) ** 2 for point in ranked) / elite)
+                sigmas[i] = max(min_sigma, (1 - learning_rate) * sigmas[i] + learning_rate * spread)
+            mean = new_mean
+        return self.best
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ajuste dos parâmetros fuzzy por partidas headless.")
+    parser.add_argument('--method', choices=('random', 'evolve'), default='random')
+    parser.add_argument('--iterations', type=int, default=32,
+                        help="configurações sorteadas (random) ou gerações (evolve)")
+    parser.add_argument('--population', type=int, default=8, help="tamanho da rodada/geração")
+    parser.add_argument('--matches', type=int, default=64, help="partidas por configuração")
+    parser.add_argument('--target-ticks', type=float, default=None, help="duração média desejada")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache', default=None, help="arquivo JSON do cache de avaliações")
+    parser.add_argument('--output', default=None, help="grava a melhor configuração neste JSON")
+    args = parser.parse_args()
+
+    tuner = Tuner(combined_objective(args.target_ticks), matches=args.matches, base_seed=args.seed,
+                  max_workers=args.workers, cache=EvaluationCache(args.cache))
+    if args.method == 'random':
+        best = tuner.random_search(args.iterations, batch_size=args.population, seed=args.seed)
+    else:
+        best = tuner.evolve(args.iterations, population=args.population, seed=args.seed)
+
+    original = tuner.history[0]
+    print(f"{len(tuner.history)} avaliações ({tuner.cache.hits} do cache)")
+    print(f"original: nota {original.score:.4f}, {original.summary['ticks']['mean']:.1f} ticks, "
+          f"vitórias {original.summary['win_rates']}")
+    print(f"melhor:   nota {best.score:.4f}, {best.summary['ticks']['mean']:.1f} ticks, "
+          f"vitórias {best.summary['win_rates']}")
+    changed = {name: value for name, value in best.config.items() if value != default_config()[name]}
+    print(json.dumps(changed, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(best.config, output_file, indent=2)